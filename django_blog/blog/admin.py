@@ -12,7 +12,7 @@ class PostAdmin(admin.ModelAdmin):
     - Displays specific fields in the list view.
     - Adds search and filter functionality.
     """
-    list_display = ('title', 'author', 'published_date')  # Columns to display in the admin list view
+    list_display = ('title', 'author', 'published_date', 'comment_count', 'last_comment_at')  # Columns to display in the admin list view (counters are sortable)
     list_filter = ('published_date', 'author', 'tags')  # Filters for the sidebar
     search_fields = ('title', 'content')  # Enables search by title and content
     ordering = ('-published_date',)  # Orders posts by most recent first
@@ -0,0 +1,134 @@
+import calendar  # Month names for the sidebar
+from collections import Counter  # New posts per month in bulk imports
+from datetime import datetime  # Month boundaries
+
+from django.core.cache import cache  # Cache for the sidebar data
+from django.db.models import Case, Count, F, IntegerField, Q, Value, When  # Grouped rebuild and in-place updates
+from django.db.models.functions import Greatest, TruncMonth  # Clamp decrements; month buckets for the rebuild
+from django.utils import timezone  # Site-time-zone month boundaries
+
+from . import replicas  # The sidebar is always built from the primary
+from .models import MonthArchive, Post  # The rollup table and the posts it counts
+
+# ----------------------------------------
+# Date Archive (month buckets)
+# ----------------------------------------
+
+ARCHIVE_CACHE_KEY = 'blog:archive-months'  # Cache key of the sidebar data
+ARCHIVE_TIMEOUT = 60 * 60  # Safety expiry; the entry is dropped on every change anyway
+
+
+def month_of(published_date):
+    """ (year, month) bucket of a publication date, in the site's time zone. """
+    local = timezone.localtime(published_date)
+    return local.year, local.month
+
+
+def month_range(year, month):
+    """
+    [start, end) datetimes of a calendar month in the site's time zone.
+    - Filtering `published_date` on this range lets the database use its index, unlike
+      `__year` / `__month` lookups which wrap the column in a function.
+    """
+    start = timezone.make_aware(datetime(year, month, 1))
+    end = timezone.make_aware(datetime(year + month // 12, month % 12 + 1, 1))
+    return start, end
+
+
+def post_created(published_date):
+    """ Count a new post in its month (creates the bucket on first use). """
+    year, month = month_of(published_date)
+    MonthArchive.objects.bulk_create([MonthArchive(year=year, month=month)], ignore_conflicts=True)
+    MonthArchive.objects.filter(year=year, month=month).update(post_count=F('post_count') + 1)
+    invalidate_archive()
+
+
+def posts_created(published_dates):
+    """
+    Bulk form of `post_created` for writers that bypass signals (the importer): count many
+    new posts with one UPDATE over the months they fall in.
+    """
+    counts = Counter(month_of(published_date) for published_date in published_dates)
+    if not counts:
+        return
+    MonthArchive.objects.bulk_create(
+        [MonthArchive(year=year, month=month) for year, month in counts], ignore_conflicts=True,
+    )
+    buckets = Q()
+    for year, month in counts:
+        buckets |= Q(year=year, month=month)
+    increment = Case(
+        *(When(year=year, month=month, then=Value(posts)) for (year, month), posts in counts.items()),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    MonthArchive.objects.filter(buckets).update(post_count=F('post_count') + increment)
+    invalidate_archive()
+
+
+def post_deleted(published_date):
+    """ Remove a deleted post from its month; empty buckets are dropped. """
+    year, month = month_of(published_date)
+    buckets = MonthArchive.objects.filter(year=year, month=month)
+    buckets.update(post_count=Greatest(F('post_count') - 1, 0))
+    buckets.filter(post_count=0).delete()
+    invalidate_archive()
+
+
+def rebuild_archive():
+    """
+    Recompute every bucket from the Post table with a single grouped query.
+    - Returns the number of months with posts.
+    """
+    rows = (
+        Post.objects.annotate(bucket=TruncMonth('published_date'))
+        .values('bucket')
+        .annotate(post_count=Count('id'))
+    )
+    buckets = [
+        MonthArchive(year=row['bucket'].year, month=row['bucket'].month, post_count=row['post_count'])
+        for row in rows
+    ]
+    MonthArchive.objects.all().delete()
+    MonthArchive.objects.bulk_create(buckets, batch_size=500)
+    invalidate_archive()
+    return len(buckets)
+
+
+def invalidate_archive():
+    cache.delete(ARCHIVE_CACHE_KEY)
+
+
+def _archive_entries(buckets):
+    return [
+        {
+            'year': bucket.year,
+            'month': bucket.month,
+            'label': f'{calendar.month_name[bucket.month]} {bucket.year}',
+            'post_count': bucket.post_count,
+        }
+        for bucket in buckets
+    ]
+
+
+def _build_archive():
+    with replicas.primary_reads():  # Cached for long; must not be refilled from a lagging replica
+        return _archive_entries(MonthArchive.objects.filter(post_count__gt=0))
+
+
+def get_archive_months():
+    """
+    Months with posts as dicts with `year`, `month`, `label` and `post_count`, newest first.
+    - Served from the cache; rebuilt from the rollup table (one small query) after changes.
+    """
+    return cache.get_or_set(ARCHIVE_CACHE_KEY, _build_archive, ARCHIVE_TIMEOUT)
+
+
+async def aget_archive_months():
+    """ Async form of `get_archive_months` for the async views. """
+    months = await cache.aget(ARCHIVE_CACHE_KEY)
+    if months is None:
+        with replicas.primary_reads():
+            months = _archive_entries([bucket async for bucket in MonthArchive.objects.filter(post_count__gt=0)])
+        await cache.aset(ARCHIVE_CACHE_KEY, months, ARCHIVE_TIMEOUT)
+    return months
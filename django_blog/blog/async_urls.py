@@ -0,0 +1,25 @@
+from django.urls import path  # Import the path function to define URL patterns
+from .replicas import reads_from_replica  # Send a view's reads to a read replica (when configured)
+from .urls import urlpatterns as sync_urlpatterns  # The blog's URL patterns with the sync views
+from .views import (  # Async versions of the busiest read views
+    AsyncPostListView,    # Async view to list all blog posts
+    AsyncPostDetailView,  # Async view to display a single blog post
+    AsyncTagPostListView, # Async view to display posts filtered by tags
+    async_search_posts,   # Async view to handle search functionality
+)
+
+# Views replacing the sync ones, by URL name
+ASYNC_READ_VIEWS = {
+    'post-list': reads_from_replica(AsyncPostListView.as_view()),
+    'post-detail': reads_from_replica(AsyncPostDetailView.as_view()),
+    'tagged-posts': reads_from_replica(AsyncTagPostListView.as_view()),
+    'search-posts': reads_from_replica(async_search_posts),
+}
+
+# The blog's URL patterns with the read pages served by the async views (used under ASGI
+# when BLOG_ASYNC_VIEWS is on); every other route is shared with blog/urls.py
+urlpatterns = [
+    path(str(pattern.pattern), ASYNC_READ_VIEWS[pattern.name], pattern.default_args, name=pattern.name)
+    if pattern.name in ASYNC_READ_VIEWS else pattern
+    for pattern in sync_urlpatterns
+]
@@ -0,0 +1,235 @@
+import threading  # Guards the shared in-process indexes
+import time  # Refresh intervals
+from bisect import bisect_left, insort  # Binary search over the sorted key array
+from collections import OrderedDict  # Insertion order doubles as eviction order
+
+from django.db.models import Max  # Watermarks for incremental reloads
+from django.urls import reverse  # URLs of the suggestions
+from taggit.models import Tag  # Tag names are suggested next to post titles
+
+from .models import Post  # Post titles are the main suggestions
+
+# ----------------------------------------
+# Autocomplete (in-process prefix index)
+# ----------------------------------------
+
+AUTOCOMPLETE_MAX_ENTRIES = 500_000  # Memory bound per index; the oldest entries are evicted first
+AUTOCOMPLETE_KEY_LENGTH = 64  # Only this many leading characters are indexed
+AUTOCOMPLETE_LIMIT = 10  # Default number of suggestions per kind
+AUTOCOMPLETE_MAX_LIMIT = 20  # Upper bound for the `limit` parameter
+REFRESH_INTERVAL = 30  # Seconds between polls for writes made by other processes
+FULL_RELOAD_INTERVAL = 60 * 60  # Seconds between full reloads (drops entries deleted elsewhere)
+
+
+def normalize(text):
+    """ Index/query form of a string: case-folded, whitespace collapsed, truncated. """
+    return ' '.join(text.casefold().split())[:AUTOCOMPLETE_KEY_LENGTH]
+
+
+class PrefixIndex:
+    """
+    Sorted array of normalized keys searched with bisect.
+    - A lookup is one binary search plus a scan over the matches it returns: O(log n + limit).
+    - Entries are (id, text) pairs; adding an id again replaces its previous text.
+    - Holds at most `max_entries` entries; beyond that the least recently added ones are evicted.
+    - Lookups take no lock. Writers must be serialized by the caller (BlogAutocomplete.lock).
+      `load()` publishes the new keys and entries together in a single assignment. A lookup
+      that runs during `add()` or `remove()` skips keys whose entry is missing or has changed.
+    """
+
+    def __init__(self, max_entries=AUTOCOMPLETE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        # (sorted "key\0id" strings, so equal titles keep distinct, stable slots;
+        #  id -> (sort key, display text), oldest first)
+        self._state = ([], OrderedDict())
+
+    def __len__(self):
+        return len(self._state[1])
+
+    @staticmethod
+    def _sort_key(entry_id, text):
+        return f'{normalize(text)}\0{entry_id}'
+
+    def load(self, pairs):
+        """ Replace the contents with `pairs` ((id, text), oldest first) using a single sort. """
+        entries = OrderedDict()
+        for entry_id, text in pairs:
+            entries[entry_id] = (self._sort_key(entry_id, text), text)
+            entries.move_to_end(entry_id)
+        while self.max_entries is not None and len(entries) > self.max_entries:
+            entries.popitem(last=False)
+        self._state = (sorted(key for key, _ in entries.values()), entries)  # Readers see old or new, never a mix
+
+    def add(self, entry_id, text):
+        """ Insert or replace one entry (O(n) memmove of pointers, fine for single writes). """
+        self.remove(entry_id)
+        keys, entries = self._state
+        key = self._sort_key(entry_id, text)
+        entries[entry_id] = (key, text)
+        insort(keys, key)
+        if self.max_entries is not None and len(entries) > self.max_entries:
+            self.remove(next(iter(entries)))
+
+    def remove(self, entry_id):
+        keys, entries = self._state
+        entry = entries.pop(entry_id, None)
+        if entry is None:
+            return
+        position = bisect_left(keys, entry[0])
+        if position < len(keys) and keys[position] == entry[0]:
+            del keys[position]
+
+    def search(self, prefix, limit=AUTOCOMPLETE_LIMIT):
+        """ Up to `limit` (id, text) pairs whose normalized text starts with `prefix`, in key order. """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        keys, entries = self._state  # One consistent snapshot, even while `load()` runs
+        results = []
+        position = bisect_left(keys, prefix)
+        for key in keys[position:position + limit]:
+            if not key.startswith(prefix):
+                break
+            entry_id = int(key.rpartition('\0')[2])
+            entry = entries.get(entry_id)
+            if entry is not None and entry[0] == key:  # Not removed or replaced by a concurrent write
+                results.append((entry_id, entry[1]))
+        return results
+
+
+class BlogAutocomplete:
+    """
+    Title and tag indexes for the blog, shared by all threads of a process.
+    - Writes in this process are applied immediately through signals (see blog.signals).
+    - Writes made by other processes are picked up every REFRESH_INTERVAL seconds: posts by
+      their `updated_at` watermark, tags by their id watermark. Deletions made elsewhere
+      disappear at the next full reload.
+    """
+
+    def __init__(self, max_entries=AUTOCOMPLETE_MAX_ENTRIES):
+        self.titles = PrefixIndex(max_entries)
+        self.tags = PrefixIndex(max_entries)
+        self.lock = threading.Lock()
+        self.loaded_at = None  # Monotonic time of the last full load
+        self.checked_at = None  # Monotonic time of the last incremental poll
+        self.posts_watermark = None  # Newest Post.updated_at seen
+        self.tags_watermark = 0  # Highest Tag.id seen
+
+    def reload(self):
+        """ Full load: the newest `max_entries` posts and tags, each with a single query. """
+        with self.lock:
+            self._reload()
+
+    def _reload(self):
+        marks = Post.objects.aggregate(updated=Max('updated_at'))
+        tag_mark = Tag.objects.aggregate(last=Max('id'))['last'] or 0
+        posts = Post.objects.order_by('-published_date', '-id').values_list('id', 'title')
+        tags = Tag.objects.order_by('-id').values_list('id', 'name')
+        if self.titles.max_entries is not None:
+            posts = posts[:self.titles.max_entries]
+            tags = tags[:self.tags.max_entries]
+        self.titles.load(reversed(list(posts)))  # Oldest first, so eviction drops old posts
+        self.tags.load(reversed(list(tags)))
+        self.posts_watermark = marks['updated']
+        self.tags_watermark = tag_mark
+        self.checked_at = self.loaded_at = time.monotonic()  # checked_at first: readers test loaded_at
+
+    def refresh(self):
+        """ Apply rows written since the last poll (by any process). """
+        with self.lock:
+            self._refresh()
+
+    def _refresh(self):
+        posts = Post.objects.order_by('updated_at')
+        if self.posts_watermark is not None:
+            posts = posts.filter(updated_at__gt=self.posts_watermark)
+        for post_id, title, updated_at in posts.values_list('id', 'title', 'updated_at'):
+            self.titles.add(post_id, title)
+            self.posts_watermark = updated_at
+        for tag_id, name in Tag.objects.filter(id__gt=self.tags_watermark).values_list('id', 'name'):
+            self.tags.add(tag_id, name)
+            self.tags_watermark = max(self.tags_watermark, tag_id)
+        self.checked_at = time.monotonic()
+
+    def _needs_reload(self):
+        return self.loaded_at is None or time.monotonic() - self.loaded_at > FULL_RELOAD_INTERVAL
+
+    def _needs_refresh(self):
+        return time.monotonic() - self.checked_at > REFRESH_INTERVAL
+
+    def ensure_fresh(self):
+        """
+        Reload or poll when due; staleness is checked again under the lock, so only one
+        thread does the work.
+        - Once the index is loaded, other threads keep answering from it instead of waiting.
+        """
+        if not self._needs_reload() and not self._needs_refresh():
+            return
+        if not self.lock.acquire(blocking=self.loaded_at is None):
+            return  # Another thread is already updating a usable index
+        try:
+            if self._needs_reload():
+                self._reload()
+            elif self._needs_refresh():
+                self._refresh()
+        finally:
+            self.lock.release()
+
+    def suggest(self, query, limit=AUTOCOMPLETE_LIMIT):
+        """ Title and tag suggestions for `query` as JSON-ready dicts. """
+        self.ensure_fresh()
+        return {
+            'posts': [
+                {'id': post_id, 'title': title, 'url': reverse('post-detail', args=[post_id])}
+                for post_id, title in self.titles.search(query, limit)
+            ],
+            'tags': [
+                {'name': name, 'url': reverse('tagged-posts', args=[name])}
+                for _, name in self.tags.search(query, limit)
+            ],
+        }
+
+
+_index = None  # Process-wide BlogAutocomplete, built on first use
+_index_lock = threading.Lock()
+
+
+def get_index():
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = BlogAutocomplete()
+    return _index
+
+
+def reset_index():
+    """ Forget the process-wide index (it is rebuilt on the next lookup). """
+    global _index
+    _index = None
+
+
+# Incremental updates used by signal handlers; no-ops until the index has been built
+
+def post_saved(post):
+    if _index is not None and _index.loaded_at is not None:
+        with _index.lock:
+            _index.titles.add(post.pk, post.title)
+
+
+def post_deleted(post_id):
+    if _index is not None and _index.loaded_at is not None:
+        with _index.lock:
+            _index.titles.remove(post_id)
+
+
+def tag_saved(tag):
+    if _index is not None and _index.loaded_at is not None:
+        with _index.lock:
+            _index.tags.add(tag.pk, tag.name)
+
+
+def tag_deleted(tag_id):
+    if _index is not None and _index.loaded_at is not None:
+        with _index.lock:
+            _index.tags.remove(tag_id)
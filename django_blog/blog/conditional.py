@@ -0,0 +1,90 @@
+import hashlib  # Hashing validator inputs into compact ETags
+from calendar import timegm  # Datetime -> Unix timestamp for Last-Modified
+
+from django.utils.cache import get_conditional_response, patch_vary_headers  # Conditional GET helpers
+from django.utils.http import http_date, quote_etag  # Header formatting
+
+# ----------------------------------------
+# Conditional GET (ETag / Last-Modified)
+# ----------------------------------------
+
+def http_timestamp(last_modified):
+    """ Datetime -> Unix timestamp as used by Last-Modified (None stays None). """
+    return timegm(last_modified.utctimetuple()) if last_modified else None
+
+
+def make_etag(*parts):
+    """ Strong ETag from arbitrary validator parts (versions, counts, the viewer's user id). """
+    raw = '|'.join(str(part) for part in parts)
+    return quote_etag(hashlib.sha1(raw.encode()).hexdigest())
+
+
+class ConditionalGetMixin:
+    """
+    Mixin for class-based views that answers If-None-Match / If-Modified-Since with 304.
+    - Subclasses implement `get_validators()` returning `(last_modified, version)` from a cheap
+      aggregate query; it runs before any object loading or template rendering.
+    - Pages embed the viewer's name and links, so the ETag includes the user id and the
+      response varies on Cookie.
+    - Returning None from `get_validators()` skips the check (e.g. so a 404 is still raised).
+    - The validators are kept on `self.validators` so views can reuse them as cache versions.
+    """
+    validators = None
+
+    def get_validators(self):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        validators = self.validators = self.get_validators()
+        if validators is None:
+            return super().get(request, *args, **kwargs)
+
+        etag, timestamp = validator_headers(validators, request.user.pk)
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        return finish_conditional(response, etag, timestamp)
+
+
+def validator_headers(validators, user_id):
+    """ (ETag, Last-Modified timestamp) for `(last_modified, version)` validators. """
+    last_modified, version = validators
+    return make_etag(version, user_id), http_timestamp(last_modified)
+
+
+def finish_conditional(response, etag, timestamp):
+    """ Add the validator headers to a response (a 304 or a rendered page). """
+    response.headers.setdefault('ETag', etag)
+    if timestamp is not None:
+        response.headers.setdefault('Last-Modified', http_date(timestamp))
+    patch_vary_headers(response, ['Cookie'])
+    return response
+
+
+class AsyncConditionalGetMixin:
+    """
+    Async form of ConditionalGetMixin for views running on the event loop under ASGI.
+    - Subclasses implement the coroutines `aget_validators()` and `arender()`; the latter
+      builds the page only when the client's copy is stale.
+    - The user is resolved with `request.auser()` first, so neither the ETag nor the
+      templates touch the session synchronously.
+    """
+    validators = None
+
+    async def aget_validators(self):
+        raise NotImplementedError
+
+    async def arender(self):
+        raise NotImplementedError
+
+    async def get(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        validators = self.validators = await self.aget_validators()
+        if validators is None:
+            return await self.arender()
+
+        etag, timestamp = validator_headers(validators, request.user.pk)
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = await self.arender()
+        return finish_conditional(response, etag, timestamp)
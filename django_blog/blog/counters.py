@@ -0,0 +1,123 @@
+import threading  # Guards the in-process view buffer
+import time  # Flush interval bookkeeping
+
+from asgiref.sync import sync_to_async  # Flushes from async views run in a thread
+from django.db.models import Case, F, FloatField, IntegerField, OuterRef, Subquery, Value, When  # Expressions evaluated inside the UPDATE
+from django.db.models.functions import Greatest  # Keeps counters from going negative
+from django.utils import timezone  # Time of a flush (the views' event time)
+from . import trending  # Views and comments also feed the trending score
+from .models import Post, Comment  # Models whose counters are maintained
+
+# ----------------------------------------
+# Denormalized Comment Counters
+# ----------------------------------------
+
+def comment_added(post_id, created_at):
+    """
+    Record a new comment on a post.
+    - A single UPDATE with an F() expression, so concurrent comments never lose increments.
+    - The same statement adds the comment to the post's trending score.
+    """
+    Post.objects.filter(pk=post_id).update(
+        comment_count=F('comment_count') + 1,
+        last_comment_at=created_at,
+        trending_score=trending.add_to_score(trending.event_score(trending.COMMENT_WEIGHT, created_at)),
+    )
+
+
+def comment_removed(post_id, count=1):
+    """
+    Record that `count` comments were deleted from a post.
+    - Must run after the rows are deleted: `last_comment_at` is recomputed from the
+      remaining comments in the same UPDATE statement.
+    """
+    latest = Comment.objects.filter(post=OuterRef('pk')).order_by('-created_at').values('created_at')[:1]
+    Post.objects.filter(pk=post_id).update(
+        comment_count=Greatest(F('comment_count') - count, 0),
+        last_comment_at=Subquery(latest),
+    )
+
+# ----------------------------------------
+# Write-Behind View Counters
+# ----------------------------------------
+
+VIEW_FLUSH_INTERVAL = 10  # Seconds between flushes of the buffered view counts
+VIEW_FLUSH_THRESHOLD = 10_000  # Flush early once this many distinct posts are buffered
+VIEW_FLUSH_BATCH_SIZE = 500  # Posts per UPDATE statement (keeps the CASE and IN lists bounded)
+
+_pending_views = {}  # post_id -> views not yet written, for this process
+_views_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def _buffer_view(post_id):
+    """ Add a view to the buffer and return whether a flush is due. """
+    with _views_lock:
+        _pending_views[post_id] = _pending_views.get(post_id, 0) + 1
+        return (
+            time.monotonic() - _last_flush >= VIEW_FLUSH_INTERVAL
+            or len(_pending_views) >= VIEW_FLUSH_THRESHOLD
+        )
+
+
+def record_view(post_id):
+    """
+    Count one view of a post.
+    - Only a dict increment on the request path; the database is written by `flush_views`,
+      which runs here at most once per VIEW_FLUSH_INTERVAL.
+    - Buffered counts live in process memory, so a worker crash or restart loses at most one
+      interval of views. View counts are popularity signals, not records, so that is accepted.
+    """
+    if _buffer_view(post_id):
+        flush_views()
+
+
+async def arecord_view(post_id):
+    """
+    Async form of `record_view`: the buffer update stays on the event loop; only a due
+    flush (a database write) is handed to a thread.
+    """
+    if _buffer_view(post_id):
+        await sync_to_async(flush_views)()
+
+
+def pending_views():
+    """ Copy of the buffered, not yet flushed view counts. """
+    with _views_lock:
+        return dict(_pending_views)
+
+
+def flush_views():
+    """
+    Write the buffered view counts with one `UPDATE ... SET view_count = view_count + CASE ...`
+    per VIEW_FLUSH_BATCH_SIZE posts, and return the number of posts updated.
+    - The buffer is swapped out under the lock, so views recorded meanwhile go to the next flush.
+    - The same statement adds the views to each post's trending score (one event per post
+      with weight `views * VIEW_WEIGHT`, timed at the flush).
+    - `updated_at` is not touched: views do not invalidate caches or ETags.
+    """
+    global _pending_views, _last_flush
+    with _views_lock:
+        batch, _pending_views = _pending_views, {}
+        _last_flush = time.monotonic()
+    items = list(batch.items())
+    now = timezone.now()
+    updated = 0
+    for start in range(0, len(items), VIEW_FLUSH_BATCH_SIZE):
+        chunk = items[start:start + VIEW_FLUSH_BATCH_SIZE]
+        increment = Case(
+            *(When(pk=post_id, then=Value(views)) for post_id, views in chunk),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        event = Case(
+            *(When(pk=post_id, then=Value(trending.event_score(views * trending.VIEW_WEIGHT, now)))
+              for post_id, views in chunk),
+            output_field=FloatField(),
+        )
+        updated += Post.objects.filter(pk__in=[post_id for post_id, _ in chunk]).update(
+            view_count=F('view_count') + increment,
+            trending_score=trending.add_to_score(event),
+        )
+    return updated
+
@@ -0,0 +1,104 @@
+import json  # One JSON document per line
+import zlib  # Streaming gzip compression
+from itertools import islice  # Cutting the row iterators into chunks
+
+from django.core.serializers.json import DjangoJSONEncoder  # Dates as ISO 8601 strings
+from taggit.models import TaggedItem  # Tags of each chunk of posts
+
+from .models import Post, Comment  # The exported tables
+
+# ----------------------------------------
+# NDJSON Export (streamed, constant memory)
+# ----------------------------------------
+#
+# Rows are read with `.values().iterator(chunk_size)`, so the database cursor is drained a
+# chunk at a time and no model instances are built; each chunk's tags come from one extra
+# query. The output is produced as a generator of byte blocks, optionally gzip-compressed
+# on the fly, so neither the rows nor the document are ever held in memory at once.
+
+EXPORT_CHUNK_SIZE = 2000  # Rows fetched (and tag lookups batched) per chunk
+EXPORT_BLOCK_SIZE = 64 * 1024  # Output is emitted in blocks of about this many bytes
+EXPORT_KINDS = ('posts', 'comments')  # Exportable record types, in export order
+POST_FIELDS = (
+    'id', 'title', 'content', 'excerpt', 'published_date', 'updated_at',
+    'author__username', 'comment_count', 'view_count',
+)
+COMMENT_FIELDS = ('id', 'post_id', 'parent_id', 'depth', 'author__username', 'content', 'created_at', 'updated_at')
+
+
+def _chunks(rows, size):
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def _tags_by_post(post_ids):
+    """ {post_id: [tag names]} for a chunk of posts, from one query. """
+    tags = {}
+    rows = TaggedItem.objects.filter(
+        content_type__app_label=Post._meta.app_label,
+        content_type__model=Post._meta.model_name,
+        object_id__in=post_ids,
+    ).values_list('object_id', 'tag__name')
+    for post_id, name in rows:
+        tags.setdefault(post_id, []).append(name)
+    return tags
+
+
+def post_records(chunk_size=EXPORT_CHUNK_SIZE):
+    """ Export records of every post, in primary-key order, with `author` and `tags`. """
+    rows = Post.objects.order_by('pk').values(*POST_FIELDS).iterator(chunk_size=chunk_size)
+    for chunk in _chunks(rows, chunk_size):
+        tags = _tags_by_post([row['id'] for row in chunk])
+        for row in chunk:
+            row['author'] = row.pop('author__username')
+            row['tags'] = tags.get(row['id'], [])
+            yield {'type': 'post', **row}
+
+
+def comment_records(chunk_size=EXPORT_CHUNK_SIZE):
+    """ Export records of every comment, in primary-key order, with `author`. """
+    rows = Comment.objects.order_by('pk').values(*COMMENT_FIELDS).iterator(chunk_size=chunk_size)
+    for row in rows:
+        row['author'] = row.pop('author__username')
+        yield {'type': 'comment', **row}
+
+
+RECORDS = {'posts': post_records, 'comments': comment_records}
+
+
+def export_records(kinds=EXPORT_KINDS, chunk_size=EXPORT_CHUNK_SIZE):
+    """ Records of the requested kinds, one kind after the other. """
+    for kind in kinds:
+        yield from RECORDS[kind](chunk_size)
+
+
+def ndjson(records, block_size=EXPORT_BLOCK_SIZE):
+    """ Encode records as NDJSON, yielding byte blocks of roughly `block_size`. """
+    block = []
+    size = 0
+    for record in records:
+        line = (json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n').encode()
+        block.append(line)
+        size += len(line)
+        if size >= block_size:
+            yield b''.join(block)
+            block, size = [], 0
+    if block:
+        yield b''.join(block)
+
+
+def gzipped(blocks, level=6):
+    """ Compress a stream of byte blocks into a gzip stream, block by block. """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # 16+: gzip header
+    for block in blocks:
+        compressed = compressor.compress(block)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_stream(records, compress=False):
+    """ The export document for `records` as byte blocks, gzip-compressed if `compress`. """
+    blocks = ndjson(records)
+    return gzipped(blocks) if compress else blocks
@@ -0,0 +1,153 @@
+import hashlib  # Hashing feed validators into cache keys
+from io import StringIO  # Buffer drained after every feed entry
+
+from django.core.cache import cache  # Backend storing rendered feeds
+from django.db.models import Count, Max  # Feed validators
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed  # Feed formats
+from django.utils.xmlutils import SimplerXMLGenerator  # XML writer used by the feed classes
+
+from .models import Post  # Posts published in the feeds
+
+# ----------------------------------------
+# Atom / RSS Feeds (streamed and cached)
+# ----------------------------------------
+
+FEED_ITEMS = 50  # Newest posts included in a feed
+FEED_CACHE_TIMEOUT = 24 * 60 * 60  # Keys change with the posts, so entries only expire to free memory
+FEED_FIELDS = ('id', 'title', 'excerpt', 'published_date', 'updated_at', 'author__username')  # The only columns loaded
+
+
+class StreamingFeedMixin:
+    """
+    Adds `stream()` to Django's feed generators: the document is produced entry by entry
+    from an iterable, so neither the rows nor the XML are held in memory at once.
+    - `feed_updated` (passed to the constructor) is the feed's last modification time; the
+      stock implementation would scan `self.items`, which stay empty while streaming.
+    """
+    item_element = None
+
+    def latest_post_date(self):
+        return self.feed['feed_updated'] or super().latest_post_date()  # Empty feeds: now
+
+    def open_document(self, handler):
+        raise NotImplementedError
+
+    def close_document(self, handler):
+        raise NotImplementedError
+
+    def stream(self, entries, encoding='utf-8'):
+        """ Yield the document as encoded chunks; `entries` are `add_item()` keyword dicts. """
+        buffer = StringIO()
+        handler = SimplerXMLGenerator(buffer, encoding, short_empty_elements=True)
+
+        def drain():
+            chunk = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return chunk.encode(encoding)
+
+        handler.startDocument()
+        self.open_document(handler)
+        yield drain()
+        for entry in entries:
+            self.add_item(**entry)
+            item = self.items.pop()  # Normalised by add_item; never kept
+            handler.startElement(self.item_element, self.item_attributes(item))
+            self.add_item_elements(handler, item)
+            handler.endElement(self.item_element)
+            yield drain()
+        self.close_document(handler)
+        yield drain()
+
+
+class StreamingAtomFeed(StreamingFeedMixin, Atom1Feed):
+    item_element = 'entry'
+
+    def open_document(self, handler):
+        handler.startElement('feed', self.root_attributes())
+        self.add_root_elements(handler)
+
+    def close_document(self, handler):
+        handler.endElement('feed')
+
+
+class StreamingRssFeed(StreamingFeedMixin, Rss201rev2Feed):
+    item_element = 'item'
+
+    def open_document(self, handler):
+        handler.startElement('rss', self.rss_attributes())
+        handler.startElement('channel', self.root_attributes())
+        self.add_root_elements(handler)
+
+    def close_document(self, handler):
+        self.endChannelElement(handler)
+        handler.endElement('rss')
+
+
+FEED_FORMATS = {'atom': StreamingAtomFeed, 'rss': StreamingRssFeed}
+
+
+def feed_posts(tag=None):
+    """ Posts of a feed: all posts, or those carrying `tag` (a Tag instance). """
+    posts = Post.objects.all()
+    return posts.filter(tags=tag.pk) if tag is not None else posts
+
+
+def feed_validators(posts):
+    """
+    (last_modified, count) of a feed's posts from one aggregate query.
+    - Edits, comments and tag changes bump `updated_at`; the count catches deletions.
+    """
+    stats = posts.aggregate(last_modified=Max('updated_at'), count=Count('id'))
+    return stats['last_modified'], stats['count']
+
+
+def feed_cache_key(feed_format, scope, host, validators):
+    raw = '|'.join(str(part) for part in (feed_format, scope, host, *validators))
+    return 'blog:feed:' + hashlib.md5(raw.encode()).hexdigest()
+
+
+def get_cached_feed(key):
+    return cache.get(key)
+
+
+def feed_entries(posts, absolute_url):
+    """
+    `add_item()` keyword dicts for the newest FEED_ITEMS posts, from a single `.only()` query.
+    - `absolute_url` turns a path into a full URL (feed links must be absolute).
+    """
+    rows = (
+        posts.select_related('author')
+        .only(*FEED_FIELDS)
+        .order_by('-published_date', '-id')[:FEED_ITEMS]
+    )
+    for post in rows.iterator(chunk_size=FEED_ITEMS):
+        link = absolute_url(post.get_absolute_url())
+        yield {
+            'title': post.title,
+            'link': link,
+            'description': post.excerpt,
+            'unique_id': link,
+            'author_name': post.author.username,
+            'pubdate': post.published_date,
+            'updateddate': post.updated_at,
+        }
+
+
+def render_feed(feed_format, title, link, description, last_modified, entries, cache_key):
+    """
+    Stream a feed document, storing the complete bytes under `cache_key` once the last
+    chunk has been produced (an interrupted download caches nothing).
+    """
+    feed = FEED_FORMATS[feed_format](
+        title=title,
+        link=link,
+        description=description,
+        language='en',
+        feed_updated=last_modified,
+    )
+    chunks = []
+    for chunk in feed.stream(entries):
+        chunks.append(chunk)
+        yield chunk
+    cache.set(cache_key, b''.join(chunks), FEED_CACHE_TIMEOUT)
@@ -0,0 +1,65 @@
+import hashlib  # Hashing version tuples into compact cache keys
+import re  # Finding the per-user placeholders in cached HTML
+
+from django.core.cache import cache  # Backend storing the rendered fragments
+from django.urls import reverse  # URLs of the per-user comment links
+from django.utils.html import format_html  # Escaped HTML for the filled-in links
+
+# ----------------------------------------
+# Hole-Punched Fragment Cache (post detail body)
+# ----------------------------------------
+
+POST_BODY_TIMEOUT = 24 * 60 * 60  # Keys are versioned, so entries only expire to free memory
+POST_BODY_TEMPLATE = 'blog/post_detail_body.html'  # Rendered without a request, i.e. for nobody
+
+# Placeholder left by blog/comment.html where the per-user links go: post id, comment id, author id
+COMMENT_ACTIONS_RE = re.compile(r'<!--comment-actions (\d+) (\d+) (\d+)-->')
+
+
+def post_body_key(post_id, version):
+    """ Cache key of a post's rendered body; `version` changes whenever the body would. """
+    digest = hashlib.md5(repr(version).encode()).hexdigest()
+    return f'blog:post-body:{post_id}:{digest}'
+
+
+def get_post_body(post_id, version):
+    return cache.get(post_body_key(post_id, version))
+
+
+def set_post_body(post_id, version, fragment):
+    """ Store `fragment` (a dict with the HTML and whatever is needed to serve it again). """
+    cache.set(post_body_key(post_id, version), fragment, POST_BODY_TIMEOUT)
+
+
+def comment_actions(post_id, comment_id, author_id, user_id):
+    """
+    Links shown next to a comment for the user `user_id` (None when logged out).
+    - Everyone logged in may reply; only the author gets edit and delete.
+    """
+    if user_id is None:
+        return ''
+    html = format_html(
+        '<a href="{}">Reply</a>',
+        reverse('comment-reply', kwargs={'post_id': post_id, 'parent_id': comment_id}),
+    )
+    if author_id == user_id:
+        html += format_html(
+            ' <a href="{}">Edit</a> <a href="{}" '
+            'onclick="return confirm(\'Are you sure you want to delete this comment?\');">Delete</a>',
+            reverse('comment-update', args=[comment_id]),
+            reverse('comment-delete', args=[comment_id]),
+        )
+    return html
+
+
+def punch_holes(html, user_id):
+    """
+    Fill the per-user placeholders of a cached body for `user_id`.
+    - Author ids travel inside the placeholders, so no queries are needed; anonymous
+      visitors get every placeholder removed.
+    """
+    def fill(match):
+        post_id, comment_id, author_id = (int(value) for value in match.groups())
+        return comment_actions(post_id, comment_id, author_id, user_id)
+
+    return COMMENT_ACTIONS_RE.sub(fill, html)
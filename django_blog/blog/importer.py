@@ -0,0 +1,233 @@
+import csv  # CSV input
+import json  # JSON Lines input
+from collections import defaultdict  # Per-chunk tag statistics
+from itertools import islice  # Cutting the input stream into chunks
+
+from django.contrib.auth.hashers import make_password  # Unusable passwords for created authors
+from django.contrib.auth.models import User  # Post authors
+from django.contrib.contenttypes.models import ContentType  # Content type of the tagging rows
+from django.db import connections, router, transaction  # Raw date updates; one transaction per chunk
+from django.utils import timezone  # Naive dates are read in the site's time zone
+from django.utils.dateparse import parse_datetime  # ISO 8601 publication dates
+from taggit.models import Tag, TaggedItem  # Tags and the rows linking them to posts
+
+from . import archive, pagecache, search, tags  # Derived data normally kept in sync by signals
+from .models import Post, make_excerpt  # The imported model and its excerpt builder
+
+# ----------------------------------------
+# Bulk Post Import (streamed, chunked bulk_create)
+# ----------------------------------------
+#
+# bulk_create does not call save() or send signals, so everything the signal handlers
+# normally maintain (excerpt, search index, tag statistics, month archive, page cache) is
+# updated here once per chunk instead of once per post. Related posts need no work:
+# new posts start with related_dirty set, so the next build_related_posts picks them up.
+
+IMPORT_BATCH_SIZE = 1000  # Rows written per chunk (one transaction each)
+IMPORT_FORMATS = ('jsonl', 'csv')  # Accepted input formats
+
+
+def read_jsonl(handle):
+    """
+    Rows of a JSON Lines file, one object per line; blank lines are ignored.
+    - A line that is not valid JSON, or not an object, raises ValueError with its line number.
+    """
+    for number, line in enumerate(handle, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            raise ValueError(f'line {number}: {error}') from error
+        if not isinstance(row, dict):
+            raise ValueError(f'line {number}: expected a JSON object, got {type(row).__name__}')
+        yield row
+
+
+def read_csv(handle):
+    """ Rows of a CSV file with a header line. """
+    yield from csv.DictReader(handle)
+
+
+READERS = {'jsonl': read_jsonl, 'csv': read_csv}
+
+
+def parse_tags(value):
+    """ Tag names from a list (JSON) or a comma-separated string (CSV), without blanks or repeats. """
+    if not value:
+        return []
+    names = value if isinstance(value, list) else value.split(',')
+    return list(dict.fromkeys(name.strip() for name in names if name and name.strip()))
+
+
+def parse_date(value):
+    """ An aware datetime from an ISO 8601 string, or None when empty; ValueError when malformed. """
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(f'invalid date {value!r}')
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+class AuthorCache:
+    """
+    username → user id map shared by all chunks.
+    - `resolve()` looks up only the usernames not seen before, with one query per chunk.
+    - With `create=True` unknown authors are created (unusable passwords) instead of skipped.
+    """
+
+    def __init__(self, create=False):
+        self.create = create
+        self.ids = {}
+        self.unknown = set()
+
+    def resolve(self, usernames):
+        missing = {name for name in usernames if name not in self.ids and name not in self.unknown}
+        if not missing:
+            return
+        self.ids.update(User.objects.filter(username__in=missing).values_list('username', 'id'))
+        missing -= self.ids.keys()
+        if missing and self.create:
+            User.objects.bulk_create(
+                [User(username=name, password=make_password(None)) for name in missing],
+                ignore_conflicts=True,
+            )
+            self.ids.update(User.objects.filter(username__in=missing).values_list('username', 'id'))
+            missing -= self.ids.keys()
+        self.unknown |= missing
+
+
+class TagCache:
+    """
+    tag name → tag id map shared by all chunks.
+    - New tags are inserted with one bulk_create per chunk; a name whose slug collides with
+      an existing tag falls back to taggit's own save(), which picks a free slug.
+    """
+
+    def __init__(self):
+        self.ids = {}
+
+    def resolve(self, names):
+        missing = {name for name in names if name not in self.ids}
+        if not missing:
+            return
+        self.ids.update(Tag.objects.filter(name__in=missing).values_list('name', 'id'))
+        missing -= self.ids.keys()
+        if not missing:
+            return
+        Tag.objects.bulk_create(
+            [Tag(name=name, slug=Tag().slugify(name)) for name in missing], ignore_conflicts=True,
+        )
+        self.ids.update(Tag.objects.filter(name__in=missing).values_list('name', 'id'))
+        for name in missing - self.ids.keys():
+            self.ids[name] = Tag.objects.get_or_create(name=name)[0].pk
+
+
+def set_published_dates(posts):
+    """
+    Write the `published_date` of `posts` as given.
+    - auto_now_add overrides dates passed to bulk_create; a prepared UPDATE run with
+      executemany is much cheaper than bulk_update's CASE expression.
+    """
+    if not posts:
+        return
+    connection = connections[router.db_for_write(Post)]
+    field = Post._meta.get_field('published_date')
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"UPDATE {connection.ops.quote_name(Post._meta.db_table)} "
+            f"SET {connection.ops.quote_name(field.column)} = %s WHERE id = %s",
+            [[field.get_db_prep_save(post.published_date, connection), post.pk] for post in posts],
+        )
+
+
+class PostImporter:
+    """
+    Write a stream of post rows (dicts with `title`, `content`, `author` and optionally
+    `tags` and `published_date`) in chunks of `batch_size`.
+    - Per chunk: one query for unseen authors, one bulk INSERT for the posts, one for unseen
+      tags and one for the tagging rows, plus the batched updates of the derived data.
+    - Rows without a title or author, with an unknown author or a malformed date are
+      skipped and counted in `skipped`.
+    """
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE, create_authors=False):
+        self.batch_size = batch_size
+        self.authors = AuthorCache(create=create_authors)
+        self.tags = TagCache()
+        self.content_type_id = ContentType.objects.get_for_model(Post).pk
+        self.imported = 0
+        self.skipped = 0
+        self.tag_names = set()  # Tags whose pages must be purged at the end
+
+    def run(self, rows, on_chunk=None):
+        """ Import every row; `on_chunk(importer)` is called after each chunk is committed. """
+        rows = iter(rows)
+        while chunk := list(islice(rows, self.batch_size)):
+            self.import_chunk(chunk)
+            if on_chunk:
+                on_chunk(self)
+        self.finish()
+        return self.imported
+
+    def _clean(self, chunk):
+        cleaned = []
+        for row in chunk:
+            title, author = (row.get('title') or '').strip(), (row.get('author') or '').strip()
+            try:
+                published_date = parse_date(row.get('published_date'))
+            except ValueError:
+                published_date, title = None, ''
+            if not title or not author:
+                self.skipped += 1
+                continue
+            cleaned.append((title, row.get('content') or '', author, parse_tags(row.get('tags')), published_date))
+        self.authors.resolve({author for _, _, author, _, _ in cleaned})
+        valid = [row for row in cleaned if row[2] in self.authors.ids]
+        self.skipped += len(cleaned) - len(valid)
+        self.tags.resolve({name for _, _, _, names, _ in valid for name in names})
+        return valid
+
+    def import_chunk(self, chunk):
+        rows = self._clean(chunk)
+        if not rows:
+            return
+        with transaction.atomic():
+            posts = Post.objects.bulk_create([
+                Post(title=title, content=content, excerpt=make_excerpt(content), author_id=self.authors.ids[author])
+                for title, content, author, _, _ in rows
+            ])
+            dated = []
+            for post, (_, _, _, _, published_date) in zip(posts, rows):
+                if published_date is not None:
+                    post.published_date = published_date
+                    dated.append(post)
+            set_published_dates(dated)
+
+            tag_counts = defaultdict(lambda: [0, None])  # tag id → [new posts, newest published_date]
+            tagged = []
+            for post, (_, _, _, names, _) in zip(posts, rows):
+                for name in names:
+                    tag_id = self.tags.ids[name]
+                    tagged.append(TaggedItem(content_type_id=self.content_type_id, object_id=post.pk, tag_id=tag_id))
+                    counts = tag_counts[tag_id]
+                    counts[0] += 1
+                    counts[1] = max(counts[1], post.published_date) if counts[1] else post.published_date
+                self.tag_names.update(names)
+            TaggedItem.objects.bulk_create(tagged, batch_size=self.batch_size)
+
+            search.index_posts(posts)
+            tags.tags_counted(tag_counts)
+            archive.posts_created([post.published_date for post in posts])
+        self.imported += len(posts)
+
+    def finish(self):
+        """ Purge the cached pages the new posts appear on (once, not per chunk). """
+        if self.imported:
+            pagecache.purge(
+                pagecache.LIST_KEY,
+                pagecache.SEARCH_KEY,
+                pagecache.TAG_CLOUD_KEY,
+                *(pagecache.tag_key(name) for name in self.tag_names),
+            )
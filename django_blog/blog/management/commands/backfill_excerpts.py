@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand  # Base class for custom management commands
+from blog.models import Post, make_excerpt  # The Post model and the excerpt builder
+
+
+class Command(BaseCommand):
+    """
+    Fill in the stored excerpt of existing posts.
+    - Walks the Post table in primary-key batches and writes each batch with one bulk_update.
+    """
+    help = 'Backfill Post.excerpt for posts created before the field existed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of posts updated per batch (default: 500).',
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Recompute every excerpt, not only the empty ones.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = Post.objects.only('id', 'content', 'excerpt').order_by('pk')
+        if not options['all']:
+            queryset = queryset.filter(excerpt='')
+
+        last_pk = 0
+        updated = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])  # Keyset walk, no OFFSET
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            changed = []
+            for post in batch:
+                excerpt = make_excerpt(post.content)
+                if excerpt != post.excerpt:
+                    post.excerpt = excerpt
+                    changed.append(post)
+            Post.objects.bulk_update(changed, ['excerpt'])
+            updated += len(changed)
+
+        self.stdout.write(self.style.SUCCESS(f'Updated {updated} excerpts.'))
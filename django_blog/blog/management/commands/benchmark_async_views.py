@@ -0,0 +1,142 @@
+import asyncio  # Concurrent in-process clients
+import random  # Which page each request asks for
+import statistics  # Latency percentiles
+import time  # Wall-clock timing of each run
+from urllib.parse import urlsplit  # Path and query string of each request
+
+from django.conf import settings  # MIDDLEWARE and ROOT_URLCONF of the runs
+from django.core.asgi import get_asgi_application  # The same ASGI application a server would run
+from django.core.cache import cache  # Cleared so both runs start cold
+from django.core.management.base import BaseCommand, CommandError  # Base class for custom management commands
+from django.db.models import Count  # Busiest tags
+from django.test.utils import override_settings  # Switch between the sync and async URL patterns
+from django.urls import reverse  # URLs of the benchmarked pages
+from taggit.models import Tag  # Tags whose pages are requested
+from blog.models import Post  # Posts whose pages are requested
+
+URLCONFS = {'sync': 'blog.urls', 'async': 'blog.async_urls'}  # The two sets of views compared
+PAGE_CACHE_MIDDLEWARE = 'blog.pagecache.AnonymousPageCacheMiddleware'
+
+
+async def asgi_get(application, url, host):
+    """ Send one GET request straight to an ASGI application; returns (status, body size). """
+    parts = urlsplit(url)
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': parts.path,
+        'raw_path': parts.path.encode(),
+        'query_string': parts.query.encode(),
+        'root_path': '',
+        'headers': [(b'host', host.encode())],
+        'client': ('127.0.0.1', 50000),
+        'server': (host, 80),
+    }
+    disconnect = asyncio.Event()
+    request_sent = False
+    result = {'status': None, 'size': 0}
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await disconnect.wait()  # The client stays connected until the response is complete
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            result['status'] = message['status']
+        elif message['type'] == 'http.response.body':
+            result['size'] += len(message.get('body', b''))
+
+    await application(scope, receive, send)
+    disconnect.set()
+    return result['status'], result['size']
+
+
+class Command(BaseCommand):
+    """
+    Compare the sync and async read views under the same ASGI application.
+    - Builds a mix of post list, post, tag and search URLs from the existing data, then sends
+      the same requests with `--concurrency` concurrent clients through Django's ASGI handler,
+      once with blog/urls.py (sync views) and once with blog/async_urls.py.
+    - The anonymous page cache is left out unless `--page-cache` is given, so the views run.
+    - Only reads; still best run against a copy of a database with realistic data.
+    """
+    help = 'Benchmark throughput of the sync and async read views under ASGI.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per run.')
+        parser.add_argument('--concurrency', type=int, default=32, help='Concurrent clients.')
+        parser.add_argument('--page-cache', action='store_true', help='Keep the anonymous page cache enabled.')
+        parser.add_argument('--host', default='localhost', help='Host header (must be allowed by ALLOWED_HOSTS).')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def _urls(self, count, seed):
+        rng = random.Random(seed)
+        post_ids = list(Post.objects.order_by('-published_date').values_list('pk', flat=True)[:1000])
+        tag_names = list(
+            Tag.objects.annotate(uses=Count('taggit_taggeditem_items')).order_by('-uses').values_list('name', flat=True)[:50]
+        )
+        if not post_ids or not tag_names:
+            raise CommandError('Needs posts with tags to request.')
+        urls = []
+        for _ in range(count):
+            kind = rng.random()
+            if kind < 0.25:
+                urls.append(reverse('post-list'))
+            elif kind < 0.6:
+                urls.append(reverse('post-detail', args=[rng.choice(post_ids)]))
+            elif kind < 0.85:
+                urls.append(reverse('tagged-posts', args=[rng.choice(tag_names)]))
+            else:
+                urls.append(reverse('search-posts') + '?q=' + rng.choice(tag_names))
+        return urls
+
+    async def _run(self, application, urls, concurrency, host):
+        queue = list(reversed(urls))
+        latencies = []
+        errors = 0
+
+        async def client():
+            nonlocal errors
+            while queue:
+                url = queue.pop()
+                started = time.perf_counter()
+                status, _ = await asgi_get(application, url, host)
+                latencies.append(time.perf_counter() - started)
+                errors += status != 200
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        return time.perf_counter() - started, latencies, errors
+
+    def handle(self, *args, **options):
+        urls = self._urls(options['requests'], options['seed'])
+        middleware = [name for name in settings.MIDDLEWARE if options['page_cache'] or name != PAGE_CACHE_MIDDLEWARE]
+        self.stdout.write(
+            f'{len(urls)} requests, {options["concurrency"]} concurrent clients, '
+            f'page cache {"on" if options["page_cache"] else "off"}:'
+        )
+        results = {}
+        for mode, urlconf in URLCONFS.items():
+            with override_settings(ROOT_URLCONF=urlconf, MIDDLEWARE=middleware):
+                cache.clear()
+                application = get_asgi_application()
+                asyncio.run(self._run(application, urls[:50], options['concurrency'], options['host']))  # Warm-up
+                elapsed, latencies, errors = asyncio.run(
+                    self._run(application, urls, options['concurrency'], options['host'])
+                )
+            latencies.sort()
+            results[mode] = len(urls) / elapsed
+            self.stdout.write(
+                f'  {mode:>5} views: {results[mode]:,.0f} req/s, '
+                f'p50 {statistics.median(latencies) * 1000:.1f} ms, '
+                f'p95 {latencies[int(len(latencies) * 0.95)] * 1000:.1f} ms'
+                + (f', {errors} errors' if errors else '')
+            )
+        self.stdout.write(self.style.SUCCESS(f'async / sync throughput: {results["async"] / results["sync"]:.2f}x'))
@@ -0,0 +1,65 @@
+import random  # Synthetic titles and query prefixes
+import statistics  # Latency percentiles
+import time  # Timing the build and every lookup
+import tracemalloc  # Optional memory measurement
+
+from django.core.management.base import BaseCommand  # Base class for custom management commands
+from blog.autocomplete import PrefixIndex  # The index under test
+
+WORDS = (
+    'django python cache query index search tag post comment page template view model field '
+    'signal feed archive author trending related async replica sitemap export import count '
+    'tutorial guide notes tips release review deep dive intro advanced performance scaling'
+).split()
+
+
+class Command(BaseCommand):
+    """
+    Benchmark the autocomplete prefix index on synthetic titles (no database involved).
+    - Reports build time, per-lookup p50/p99 latency and, with --trace-memory, the memory used.
+    """
+    help = 'Measure autocomplete lookup latency (p50/p99) over N synthetic titles.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=1_000_000, help='Number of titles to index (default: 1M).')
+        parser.add_argument('--queries', type=int, default=20_000, help='Number of lookups to time.')
+        parser.add_argument('--limit', type=int, default=10, help='Suggestions per lookup.')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--trace-memory', action='store_true', help='Measure memory (slows the build).')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        titles = [
+            ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 8))).capitalize() + f' {number}'
+            for number in range(options['titles'])
+        ]
+        prefixes = []
+        for _ in range(options['queries']):
+            title = rng.choice(titles)
+            prefixes.append(title[:rng.randint(1, min(12, len(title)))])
+
+        if options['trace_memory']:
+            tracemalloc.start()
+        started = time.perf_counter()
+        index = PrefixIndex(max_entries=None)
+        index.load(enumerate(titles, start=1))
+        build_seconds = time.perf_counter() - started
+        if options['trace_memory']:
+            used, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        del titles
+
+        latencies = []
+        for prefix in prefixes:
+            started = time.perf_counter_ns()
+            index.search(prefix, options['limit'])
+            latencies.append(time.perf_counter_ns() - started)
+        cuts = statistics.quantiles(latencies, n=100)
+
+        self.stdout.write(f'Indexed {len(index)} titles in {build_seconds:.2f}s.')
+        if options['trace_memory']:
+            self.stdout.write(f'Index memory: {used / 2**20:.0f} MiB.')
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(prefixes)} lookups: p50 {cuts[49] / 1000:.1f} us, p99 {cuts[98] / 1000:.1f} us, '
+            f'max {max(latencies) / 1000:.1f} us.'
+        ))
@@ -0,0 +1,81 @@
+import random  # Which post each simulated view hits
+import threading  # Concurrent "workers"
+import time  # Wall-clock timing of each strategy
+
+from django.contrib.auth.models import User  # Owner of the temporary posts
+from django.core.management.base import BaseCommand  # Base class for custom management commands
+from django.db import connection  # Per-thread connections are closed when a worker finishes
+from django.db.models import F  # The naive per-view UPDATE
+from blog import counters  # The write-behind buffer under test
+from blog.models import Post  # Posts whose counters are incremented
+
+BENCHMARK_USERNAME = 'benchmark-view-counters'  # Temporary author; deleted with its posts afterwards
+
+
+class Command(BaseCommand):
+    """
+    Compare naive per-view UPDATEs with the write-behind view counters.
+    - Creates temporary posts in the configured database, simulates views from several threads
+      with each strategy, checks that both produce the same totals and deletes the posts again.
+    - Run it against a copy of the database: it writes (and then removes) real rows.
+    """
+    help = 'Benchmark buffered view counters against one UPDATE per page view.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--views', type=int, default=20_000, help='Simulated page views per strategy.')
+        parser.add_argument('--posts', type=int, default=200, help='Temporary posts the views are spread over.')
+        parser.add_argument('--threads', type=int, default=4, help='Concurrent workers.')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def _run(self, post_ids, views, threads, count_view, seed):
+        """ Run `count_view(post_id)` `views` times over `threads` threads and return the seconds taken. """
+        def worker(share, worker_seed):
+            rng = random.Random(worker_seed)
+            try:
+                for _ in range(share):
+                    count_view(rng.choice(post_ids))
+            finally:
+                connection.close()
+
+        shares = [views // threads + (1 if index < views % threads else 0) for index in range(threads)]
+        workers = [threading.Thread(target=worker, args=(share, seed + index)) for index, share in enumerate(shares)]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return time.perf_counter() - started
+
+    def handle(self, *args, **options):
+        user, _ = User.objects.get_or_create(username=BENCHMARK_USERNAME)
+        # Created (and deleted) one by one, so the signal handlers that maintain the month
+        # archive, tag statistics and search index see both sides and leave them as they were
+        post_ids = [
+            Post.objects.create(title=f'View counter benchmark {number}', content='', author=user).pk
+            for number in range(options['posts'])
+        ]
+        views, threads = options['views'], options['threads']
+        try:
+            naive = self._run(
+                post_ids, views, threads,
+                lambda post_id: Post.objects.filter(pk=post_id).update(view_count=F('view_count') + 1),
+                options['seed'],
+            )
+            Post.objects.filter(pk__in=post_ids).update(view_count=0)
+
+            counters.flush_views()
+            buffered = self._run(post_ids, views, threads, counters.record_view, options['seed'])
+            started = time.perf_counter()
+            counters.flush_views()  # The final flush is part of the buffered cost
+            buffered += time.perf_counter() - started
+
+            total = sum(Post.objects.filter(pk__in=post_ids).values_list('view_count', flat=True))
+            if total != views:
+                self.stderr.write(f'Buffered totals do not match: {total} != {views}.')
+        finally:
+            user.delete()  # Cascades to the temporary posts (sending post_delete for each)
+
+        self.stdout.write(f'{views} views over {len(post_ids)} posts, {threads} threads:')
+        self.stdout.write(f'  naive UPDATE per view: {naive:.2f}s ({views / naive:,.0f} views/s)')
+        self.stdout.write(f'  write-behind buffer:   {buffered:.2f}s ({views / buffered:,.0f} views/s)')
+        self.stdout.write(self.style.SUCCESS(f'Speed-up: {naive / buffered:.0f}x'))
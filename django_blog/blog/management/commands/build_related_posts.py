@@ -0,0 +1,26 @@
+import time  # Measure how long the refresh took
+
+from django.core.management.base import BaseCommand  # Base class for custom management commands
+from blog import related  # Related-posts engine
+
+
+class Command(BaseCommand):
+    """
+    Refresh the precomputed related-posts table.
+    - By default only posts whose tags changed since the last run (and the lists they appear in)
+      are recomputed; schedule it every few minutes, plus an occasional --full run.
+    """
+    help = 'Recompute top-K related posts (Jaccard similarity over tags).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Recompute every post, not only changed ones.')
+        parser.add_argument(
+            '--k', type=int, default=related.RELATED_POSTS_K,
+            help=f'Neighbours stored per post (default: {related.RELATED_POSTS_K}).',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        total = related.refresh_related_posts(full=options['full'], k=options['k'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'Refreshed related posts for {total} posts in {elapsed:.2f}s.'))
@@ -0,0 +1,24 @@
+import time  # Measure how long the build took
+
+from django.core.management.base import BaseCommand  # Base class for custom management commands
+from blog import sitemaps  # Sitemap shard builder
+
+
+class Command(BaseCommand):
+    """
+    Write sitemap.xml and its shards to SITEMAP_ROOT for static serving.
+    - Only shards whose posts or tags changed since the previous run are rewritten; schedule
+      it every few minutes (e.g. from cron).
+    """
+    help = 'Incrementally (re)build the sharded sitemap files.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Rewrite every shard, not only changed ones.')
+        parser.add_argument('--root', help='Output directory (default: settings.SITEMAP_ROOT).')
+        parser.add_argument('--site-url', help='Scheme and host for the URLs (default: settings.SITE_URL).')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = sitemaps.build_sitemaps(root=options['root'], site_url=options['site_url'], full=options['full'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'Rewrote {len(written)} sitemap shards in {elapsed:.2f}s.'))
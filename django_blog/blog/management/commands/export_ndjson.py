@@ -0,0 +1,55 @@
+import sys  # Writing to standard output
+from collections import Counter  # Records written per kind
+
+from django.core.management.base import BaseCommand  # Base class for custom management commands
+from blog import export  # The streaming NDJSON export
+
+
+class Command(BaseCommand):
+    """
+    Export posts and comments as NDJSON (one JSON object per line, with a `type` field).
+    - Rows are streamed from the database in chunks and written as they arrive, so memory
+      use does not grow with the size of the tables.
+    """
+    help = 'Export posts (with tags) and comments as NDJSON, optionally gzip-compressed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='File to write, or - for standard output.')
+        parser.add_argument(
+            '--gzip', action='store_true',
+            help='Compress the output (implied by a .gz file name).',
+        )
+        parser.add_argument(
+            '--only', choices=export.EXPORT_KINDS, action='append',
+            help='Export only this kind of record (may be repeated; default: all).',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=export.EXPORT_CHUNK_SIZE,
+            help=f'Rows fetched per database round trip (default: {export.EXPORT_CHUNK_SIZE}).',
+        )
+
+    def handle(self, *args, **options):
+        output = options['output']
+        compress = options['gzip'] or output.endswith('.gz')
+        kinds = [kind for kind in export.EXPORT_KINDS if kind in (options['only'] or export.EXPORT_KINDS)]
+        counts = Counter()
+
+        def counted(records):
+            for record in records:
+                counts[record['type']] += 1
+                yield record
+
+        blocks = export.export_stream(counted(export.export_records(kinds, options['chunk_size'])), compress)
+        handle = sys.stdout.buffer if output == '-' else open(output, 'wb')
+        try:
+            for block in blocks:
+                handle.write(block)
+        finally:
+            if output == '-':
+                handle.flush()
+            else:
+                handle.close()
+
+        summary = ', '.join(f'{counts[kind[:-1]]} {kind}' for kind in kinds)
+        report = self.stderr if output == '-' else self.stdout  # Keep standard output clean
+        report.write(self.style.SUCCESS(f'Exported {summary}.'))
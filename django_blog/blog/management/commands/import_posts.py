@@ -0,0 +1,64 @@
+import sys  # Reading from standard input
+import time  # Rows per second
+from pathlib import Path  # Guessing the format from the file extension
+
+from django.core.management.base import BaseCommand, CommandError  # Base class for custom management commands
+from blog import importer  # The chunked bulk importer
+
+
+class Command(BaseCommand):
+    """
+    Import posts from a JSON Lines or CSV file.
+    - The file is read as a stream and written in chunks with bulk_create, so memory stays
+      bounded and a million rows take a few thousand statements instead of several per post.
+    - Each row has `title`, `content`, `author` (a username) and optionally `tags` (a list in
+      JSON, comma-separated in CSV) and `published_date` (ISO 8601).
+    """
+    help = 'Bulk import posts (with authors and tags) from JSONL or CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import, or - for standard input.')
+        parser.add_argument(
+            '--format', choices=importer.IMPORT_FORMATS,
+            help='Input format (default: from the file extension).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=importer.IMPORT_BATCH_SIZE,
+            help=f'Rows written per chunk (default: {importer.IMPORT_BATCH_SIZE}).',
+        )
+        parser.add_argument(
+            '--create-authors', action='store_true',
+            help='Create missing authors (without a usable password) instead of skipping their posts.',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        input_format = options['format'] or Path(path).suffix.lstrip('.').lower()
+        if input_format == 'ndjson':
+            input_format = 'jsonl'
+        if input_format not in importer.READERS:
+            raise CommandError('Cannot tell the input format; pass --format jsonl or --format csv.')
+
+        posts = importer.PostImporter(batch_size=options['batch_size'], create_authors=options['create_authors'])
+        started = time.perf_counter()
+
+        def report(progress):
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f'{progress.imported:,} posts imported ({progress.imported / elapsed:,.0f} rows/s)')
+
+        handle = sys.stdin if path == '-' else open(path, encoding='utf-8', newline='')
+        try:
+            posts.run(importer.READERS[input_format](handle), on_chunk=report)
+        except ValueError as error:  # Malformed JSON line (or not an object) or CSV
+            raise CommandError(f'Import stopped after {posts.imported} posts: {error}')
+        finally:
+            if handle is not sys.stdin:
+                handle.close()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {posts.imported:,} posts in {elapsed:.1f}s '
+            f'({posts.imported / elapsed:,.0f} rows/s); skipped {posts.skipped:,} rows.'
+        ))
+        if posts.authors.unknown:
+            self.stdout.write(f'Unknown authors (use --create-authors): {", ".join(sorted(posts.authors.unknown)[:20])}')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand  # Base class for custom management commands
+from blog import archive  # Month archive helpers
+
+
+class Command(BaseCommand):
+    """
+    Recompute the month archive buckets from the Post table.
+    - Needed once after upgrading, and whenever posts were written without signals (e.g. raw SQL).
+    """
+    help = 'Rebuild MonthArchive (posts per month) from scratch.'
+
+    def handle(self, *args, **options):
+        total = archive.rebuild_archive()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt the archive: {total} months with posts.'))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand  # Base class for custom management commands
+from blog import search  # Full-text search index helpers
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the full-text search index from scratch.
+    - Useful after bulk imports, restores or if the index ever drifts from the Post table.
+    """
+    help = 'Rebuild the FTS5 search index for blog posts from scratch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of posts indexed per batch (default: 500).',
+        )
+
+    def handle(self, *args, **options):
+        total = search.rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {total} posts.'))
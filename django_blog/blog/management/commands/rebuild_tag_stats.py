@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand  # Base class for custom management commands
+from blog import tags  # Tag statistics helpers
+
+
+class Command(BaseCommand):
+    """
+    Recompute the per-tag statistics table from the tagging rows.
+    - Needed once after upgrading, and whenever tags were written without signals (e.g. raw SQL).
+    """
+    help = 'Rebuild TagStat (post counts and latest post date per tag) from scratch.'
+
+    def handle(self, *args, **options):
+        total = tags.rebuild_tag_stats()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt statistics for {total} tags.'))
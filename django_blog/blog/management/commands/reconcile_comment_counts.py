@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand  # Base class for custom management commands
+from django.db.models import Count, Max  # Aggregates recomputed from the Comment table
+from blog.models import Post, Comment  # Models whose counters are reconciled
+
+
+class Command(BaseCommand):
+    """
+    Fix drift between Post.comment_count / Post.last_comment_at and the Comment table.
+    - Posts are processed in primary-key batches: one grouped query per batch computes the
+      true values, and only drifted posts are written back with bulk_update.
+    """
+    help = 'Recompute denormalized comment counters on posts in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of posts checked per batch (default: 500).',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        posts = Post.objects.only('id', 'comment_count', 'last_comment_at').order_by('pk')
+
+        last_pk = 0
+        checked = fixed = 0
+        while True:
+            batch = list(posts.filter(pk__gt=last_pk)[:batch_size])  # Keyset walk, no OFFSET
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            actual = {
+                row['post_id']: row
+                for row in Comment.objects.filter(post_id__in=[post.pk for post in batch])
+                .values('post_id')
+                .annotate(count=Count('id'), latest=Max('created_at'))
+            }
+            drifted = []
+            for post in batch:
+                row = actual.get(post.pk, {'count': 0, 'latest': None})
+                if (post.comment_count, post.last_comment_at) != (row['count'], row['latest']):
+                    post.comment_count = row['count']
+                    post.last_comment_at = row['latest']
+                    drifted.append(post)
+            Post.objects.bulk_update(drifted, ['comment_count', 'last_comment_at'])
+            checked += len(batch)
+            fixed += len(drifted)
+
+        self.stdout.write(self.style.SUCCESS(f'Checked {checked} posts, fixed {fixed}.'))
@@ -0,0 +1,34 @@
+import time  # Interval between copies
+
+from django.core.management.base import BaseCommand, CommandError  # Base class for custom management commands
+from blog import replicas  # Local SQLite replica copies
+
+
+class Command(BaseCommand):
+    """
+    Copy the primary SQLite database over the local replicas in BLOG_READ_REPLICAS.
+    - A development stand-in for replication: with `--interval` it keeps copying, and the
+      replicas lag by up to that many seconds (keep BLOG_REPLICA_STICKY_SECONDS above it).
+    """
+    help = 'Refresh local SQLite read replicas from the primary, once or periodically.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('aliases', nargs='*', help='Replica aliases (default: BLOG_READ_REPLICAS).')
+        parser.add_argument('--interval', type=float, help='Keep copying every this many seconds.')
+
+    def handle(self, *args, **options):
+        aliases = options['aliases'] or replicas.replica_aliases()
+        if not aliases:
+            raise CommandError('No replicas configured (BLOG_READ_REPLICAS is empty).')
+        while True:
+            started = time.perf_counter()
+            for alias in aliases:
+                try:
+                    replicas.copy_sqlite_replica(alias)
+                except ValueError as error:
+                    raise CommandError(str(error))
+            elapsed = time.perf_counter() - started
+            self.stdout.write(self.style.SUCCESS(f'Copied the primary to {", ".join(aliases)} in {elapsed:.2f}s.'))
+            if not options['interval']:
+                break
+            time.sleep(max(options['interval'] - elapsed, 0))
@@ -0,0 +1,40 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Create the FTS5 table backing blog search (SQLite only) and index the existing posts.
+    - One INSERT ... SELECT, with each post's tag names joined by spaces as in blog.search.
+    """
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS blog_post_fts USING fts5("
+            "title, content, tags, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+        schema_editor.execute("DELETE FROM blog_post_fts")
+        schema_editor.execute(
+            "INSERT INTO blog_post_fts (rowid, title, content, tags) "
+            "SELECT p.id, p.title, p.content, COALESCE(("
+            "  SELECT group_concat(t.name, ' ') FROM taggit_taggeditem ti"
+            "  JOIN taggit_tag t ON t.id = ti.tag_id"
+            "  JOIN django_content_type ct ON ct.id = ti.content_type_id"
+            "  WHERE ti.object_id = p.id AND ct.app_label = 'blog' AND ct.model = 'post'"
+            "), '') FROM blog_post p"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS blog_post_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_post_tags'),
+        ('contenttypes', '0002_remove_content_type_name'),  # Tagged items are matched by content type
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:07
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def fill_comment_counters(apps, schema_editor):
+    """ Count the existing comments of every post (as reconcile_comment_counts does) in one UPDATE. """
+    Post = apps.get_model('blog', 'Post')
+    Comment = apps.get_model('blog', 'Comment')
+    comments = Comment.objects.filter(post=models.OuterRef('pk')).order_by().values('post')
+    Post.objects.update(
+        comment_count=Coalesce(models.Subquery(comments.annotate(count=models.Count('id')).values('count')), 0),
+        last_comment_at=models.Subquery(comments.annotate(latest=models.Max('created_at')).values('latest')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_post_excerpt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='last_comment_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_comment_counters, migrations.RunPython.noop),
+    ]
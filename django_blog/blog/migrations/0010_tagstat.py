@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_tag_stats(apps, schema_editor):
+    """
+    Count the existing posts per tag, as blog.tags.rebuild_tag_stats does, in one
+    INSERT ... SELECT (historical models have no generic relation to join posts to tags).
+    """
+    schema_editor.execute(
+        "INSERT INTO blog_tagstat (tag_id, post_count, latest_post_date) "
+        "SELECT ti.tag_id, COUNT(*), MAX(p.published_date) FROM taggit_taggeditem ti "
+        "JOIN django_content_type ct ON ct.id = ti.content_type_id "
+        "JOIN blog_post p ON p.id = ti.object_id "
+        "WHERE ct.app_label = 'blog' AND ct.model = 'post' "
+        "GROUP BY ti.tag_id"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_comment_threads'),
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+        ('contenttypes', '0002_remove_content_type_name'),  # Tagged items are matched by content type
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagStat',
+            fields=[
+                ('tag', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='blog_stat', serialize=False, to='taggit.tag')),
+                ('post_count', models.PositiveIntegerField(db_index=True, default=0)),
+                ('latest_post_date', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.RunPython(fill_tag_stats, migrations.RunPython.noop),
+    ]
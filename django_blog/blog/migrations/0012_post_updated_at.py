@@ -0,0 +1,25 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def copy_published_date(apps, schema_editor):
+    """ Existing posts were last modified (as far as we know) when they were published. """
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.update(updated_at=models.F('published_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_related_posts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_published_date, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:38
+
+from django.db import migrations, models
+from django.db.models.functions import TruncMonth
+
+
+def fill_month_archive(apps, schema_editor):
+    """ Count the existing posts per month with the grouped query of blog.archive.rebuild_archive. """
+    Post = apps.get_model('blog', 'Post')
+    MonthArchive = apps.get_model('blog', 'MonthArchive')
+    rows = (
+        Post.objects.annotate(bucket=TruncMonth('published_date'))
+        .values('bucket')
+        .annotate(post_count=models.Count('id'))
+    )
+    MonthArchive.objects.bulk_create(
+        [MonthArchive(year=row['bucket'].year, month=row['bucket'].month, post_count=row['post_count']) for row in rows],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_post_trending_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('post_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-year', '-month'],
+                'constraints': [models.UniqueConstraint(fields=('year', 'month'), name='blog_montharchive_year_month_uniq')],
+            },
+        ),
+        migrations.RunPython(fill_month_archive, migrations.RunPython.noop),
+    ]
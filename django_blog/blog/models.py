@@ -1,6 +1,24 @@
 from django.db import models  # Import Django's model utilities
+from django.urls import reverse  # Import reverse for building URLs to views
 from django.contrib.auth.models import User  # Import Django's built-in User model
 from taggit.managers import TaggableManager  # Import TaggableManager for tagging
+from taggit.models import Tag  # Import the Tag model from django-taggit
+
+# Maximum length of the stored excerpt shown on post lists
+EXCERPT_LENGTH = 200
+
+
+def make_excerpt(content, length=EXCERPT_LENGTH):
+    """
+    Build a plain-text excerpt of `content`.
+    - Whitespace is collapsed and the text is cut on a word boundary, ending with an ellipsis.
+    """
+    text = ' '.join(content.split())
+    if len(text) <= length:
+        return text
+    cut = text[:length - 1].rsplit(' ', 1)[0] or text[:length - 1]
+    return cut + '\u2026'
+
 
 # Define the Post model
 class Post(models.Model):
@@ -8,17 +26,65 @@ class Post(models.Model):
     title = models.CharField(max_length=200)
     # Content of the blog post
     content = models.TextField()
+    # Short excerpt of the content, maintained on save so lists never load the full content
+    excerpt = models.CharField(max_length=EXCERPT_LENGTH, blank=True, editable=False)
     # Timestamp for when the post is published
     published_date = models.DateTimeField(auto_now_add=True)
+    # Timestamp of the last change to the post, its tags or its comments (used for conditional GET)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     # ForeignKey to associate the post with the author
     author = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Number of comments on the post (denormalized, maintained by blog.counters)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    # Timestamp of the most recent comment (denormalized, maintained by blog.counters)
+    last_comment_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Number of times the post page was viewed (buffered in memory, flushed by blog.counters)
+    view_count = models.PositiveIntegerField(default=0, editable=False)
+    # log-space, time-decayed activity from views and comments (maintained by blog.trending)
+    trending_score = models.FloatField(null=True, blank=True, editable=False)
+    # Set when the post's tags change; cleared once its related posts are recomputed (blog.related)
+    related_dirty = models.BooleanField(default=True, db_index=True, editable=False)
     # Tags to allow tagging of posts (many-to-many relationship managed by django-taggit)
     tags = TaggableManager()  # Adds tagging functionality to the Post model
 
+    class Meta:
+        indexes = [
+            # Matches the keyset pagination order used by the post lists
+            models.Index(fields=['-published_date', '-id'], name='blog_post_published_id_idx'),
+            # Author pages: one author's posts, newest first (keyset pagination)
+            models.Index(fields=['author', '-published_date', '-id'], name='blog_post_author_pub_idx'),
+            # Serves the trending page as a single ORDER BY ... LIMIT
+            models.Index(fields=['-trending_score', '-id'], name='blog_post_trending_idx'),
+        ]
+
     # String representation of the Post object
     def __str__(self):
         return self.title
 
+    # Keep the excerpt in sync with the content whenever the post is saved
+    def save(self, *args, **kwargs):
+        if 'content' not in self.get_deferred_fields():
+            self.excerpt = make_excerpt(self.content)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'content' in update_fields:
+                kwargs['update_fields'] = {*update_fields, 'excerpt'}
+        super().save(*args, **kwargs)
+
+    # URL of the post's detail page (used by CreateView/UpdateView redirects)
+    def get_absolute_url(self):
+        return reverse('post-detail', kwargs={'pk': self.pk})
+
+
+# Width of one materialized-path segment (a zero-padded comment id followed by '/')
+PATH_SEGMENT_DIGITS = 10
+# Deepest reply level allowed (the path column holds MAX_THREAD_DEPTH + 1 segments)
+MAX_THREAD_DEPTH = 20
+
+
+def path_segment(pk):
+    """ Path segment for a comment id, e.g. 42 -> '0000000042/'. """
+    return f'{pk:0{PATH_SEGMENT_DIGITS}d}/'
+
 
 # Define the Comment model
 class Comment(models.Model):
@@ -26,6 +92,14 @@ class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='comments')
     # ForeignKey to associate the comment with the user who wrote it
     author = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Comment this one replies to (None for top-level comments); replies are deleted with their parent
+    parent = models.ForeignKey('self', null=True, blank=True, on_delete=models.CASCADE, related_name='replies')
+    # Materialized path of ids from the thread root down to this comment, e.g. '0000000012/0000000034/'
+    path = models.CharField(
+        max_length=(PATH_SEGMENT_DIGITS + 1) * (MAX_THREAD_DEPTH + 1), blank=True, default='', editable=False
+    )
+    # Nesting level (0 for top-level comments)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
     # Text field to store the content of the comment
     content = models.TextField()
     # Timestamp for when the comment was created
@@ -33,7 +107,80 @@ class Comment(models.Model):
     # Timestamp for when the comment was last updated
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Serves "comments of a post in order" as a single range scan (cursor pagination)
+            models.Index(fields=['post', 'created_at', 'id'], name='blog_comment_post_created_idx'),
+            # Serves whole threads and subtrees as a single range scan over the materialized path
+            models.Index(fields=['post', 'path'], name='blog_comment_post_path_idx'),
+        ]
+
     # String representation of the Comment object
     def __str__(self):
         return f'Comment by {self.author} on {self.post}'
 
+    # Assign depth before the insert and the materialized path once the id is known
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.parent_id:
+            self.depth = self.parent.depth + 1
+        super().save(*args, **kwargs)
+        if not self.path:
+            prefix = self.parent.path if self.parent_id else ''
+            self.path = prefix + path_segment(self.pk)
+            Comment.objects.filter(pk=self.pk).update(path=self.path)
+
+
+# Define the RelatedPost model (precomputed top-K neighbours of each post by tag similarity)
+class RelatedPost(models.Model):
+    # The post the neighbour list belongs to
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='related_entries')
+    # A post similar to `post`
+    related = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='+')
+    # Jaccard similarity of the two posts' tag sets (0..1)
+    score = models.FloatField()
+    # Position in the neighbour list (0 = most similar)
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ['rank']
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'rank'], name='blog_relatedpost_post_rank_uniq'),
+        ]
+
+    # String representation of the RelatedPost object
+    def __str__(self):
+        return f'{self.post_id} ~ {self.related_id} ({self.score:.2f})'
+
+
+# Define the TagStat model (per-tag statistics maintained incrementally from taggit signals)
+class TagStat(models.Model):
+    # The tag these statistics describe
+    tag = models.OneToOneField(Tag, on_delete=models.CASCADE, primary_key=True, related_name='blog_stat')
+    # Number of posts carrying the tag
+    post_count = models.PositiveIntegerField(default=0, db_index=True)
+    # Publication date of the newest post carrying the tag
+    latest_post_date = models.DateTimeField(null=True, blank=True)
+
+    # String representation of the TagStat object
+    def __str__(self):
+        return f'{self.tag_id}: {self.post_count} posts'
+
+
+# Define the MonthArchive model (posts per calendar month, maintained on post create and delete)
+class MonthArchive(models.Model):
+    # Calendar year and month of the bucket (in the site's time zone)
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    # Number of posts published in that month
+    post_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-year', '-month']  # Newest month first, as shown in the sidebar
+        constraints = [
+            models.UniqueConstraint(fields=['year', 'month'], name='blog_montharchive_year_month_uniq'),
+        ]
+
+    # String representation of the MonthArchive object
+    def __str__(self):
+        return f'{self.year}-{self.month:02d}: {self.post_count} posts'
+
@@ -0,0 +1,200 @@
+import hashlib  # Hashing URLs and surrogate keys into cache keys
+import time  # Initial surrogate-key versions
+from urllib.parse import quote  # Keep tag names header-safe
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async  # Async middleware support
+from django.conf import settings  # BLOG_REPLICA_STICKY_SECONDS bounds pages built from replicas
+from django.core.cache import cache  # Backend storing pages and surrogate-key versions
+from django.db import transaction  # Purges wait for the write to commit
+from django.http import HttpResponse  # Rebuilds cached responses
+from django.utils.cache import get_conditional_response  # Honour If-None-Match on cache hits
+from django.utils.http import parse_http_date_safe  # Last-Modified header -> timestamp
+
+from . import counters  # Post views served from the cache are still counted
+
+# ----------------------------------------
+# Anonymous Full-Page Cache with Surrogate Keys
+# ----------------------------------------
+
+PAGE_CACHE_TIMEOUT = 5 * 60  # Upper bound on how long an entry may live, even without purges
+SURROGATE_KEY_HEADER = 'Surrogate-Key'  # Space-separated keys, as understood by Fastly-style CDNs
+LIST_KEY = 'list'  # Post list pages
+SEARCH_KEY = 'search'  # Search result pages
+TAG_CLOUD_KEY = 'tagcloud'  # Any page embedding the tag cloud
+
+
+def post_key(post_id):
+    return f'post:{post_id}'
+
+
+def tag_key(name):
+    return f'tag:{quote(name, safe="")}'
+
+
+def _version_key(surrogate_key):
+    return 'blog:sk:' + hashlib.md5(surrogate_key.encode()).hexdigest()
+
+
+def _page_key(request):
+    return 'blog:page:' + hashlib.md5(request.get_full_path().encode()).hexdigest()
+
+
+def add_surrogate_keys(response, *keys):
+    """ Tag a response with the surrogate keys whose purge must evict it. """
+    existing = response.headers.get(SURROGATE_KEY_HEADER, '').split()
+    response.headers[SURROGATE_KEY_HEADER] = ' '.join(dict.fromkeys(existing + list(keys)))
+    return response
+
+
+class SurrogateKeyMixin:
+    """
+    Mixin for template views that tags the rendered response with `get_surrogate_keys()`.
+    - Responses without surrogate keys are never stored by AnonymousPageCacheMiddleware.
+    """
+
+    def get_surrogate_keys(self, context):
+        return []
+
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs)
+        return add_surrogate_keys(response, *self.get_surrogate_keys(context))
+
+
+def purge(*keys):
+    """
+    Invalidate every cached page tagged with any of `keys`.
+    - Each key has a version counter; cached pages record the versions they were built with,
+      so bumping a counter evicts exactly the pages carrying that key, in O(1).
+    - A key without a counter has no valid pages (entries need the counter to match).
+    """
+    for key in set(keys):
+        try:
+            cache.incr(_version_key(key))
+        except ValueError:
+            pass
+
+
+def purge_on_commit(*keys, using=None):
+    """
+    `purge(*keys)` once the current transaction on `using` commits (at once in autocommit).
+    - Purging earlier would let a request in between cache the page without the write under
+      the new key versions, where no later purge would evict it.
+    """
+    transaction.on_commit(lambda: purge(*keys), using=using)
+
+
+def _current_versions(keys, create=False):
+    """ Map surrogate keys to their version counters (creating missing ones if asked). """
+    version_keys = {key: _version_key(key) for key in keys}
+    found = cache.get_many(version_keys.values())
+    versions = {}
+    for key, version_key in version_keys.items():
+        if version_key not in found and create:
+            cache.add(version_key, time.time_ns(), None)  # Unique start value survives evictions
+            found[version_key] = cache.get(version_key)
+        versions[key] = found.get(version_key)
+    return versions
+
+
+def _is_cacheable(request, response):
+    return (
+        request.method in ('GET', 'HEAD')
+        and response.status_code == 200
+        and not response.streaming
+        and not response.cookies  # Never share a response that sets cookies (session, CSRF)
+        and SURROGATE_KEY_HEADER in response.headers  # Only views that declare their keys
+        and 'private' not in response.get('Cache-Control', '')
+        and 'no-store' not in response.get('Cache-Control', '')
+    )
+
+
+def _fresh_entry(page_key):
+    """ The cached page under `page_key`, unless one of its surrogate keys was purged since. """
+    entry = cache.get(page_key)
+    if entry is not None and _current_versions(entry['versions']) == entry['versions']:
+        return entry
+    return None
+
+
+def _hit_response(request, entry):
+    response = HttpResponse(entry['content'], status=entry['status'])
+    for header, value in entry['headers']:
+        response.headers[header] = value
+    response.headers['X-Cache'] = 'HIT'
+    return get_conditional_response(
+        request,
+        etag=response.get('ETag'),
+        last_modified=parse_http_date_safe(response.get('Last-Modified', '')),
+        response=response,
+    )
+
+
+def _store(page_key, response):
+    keys = response.headers[SURROGATE_KEY_HEADER].split()
+    timeout = PAGE_CACHE_TIMEOUT
+    if getattr(response, 'read_from_replica', False):  # Set by blog.replicas.reads_from_replica
+        # A purge may have happened before the replica caught up, so a page built from it
+        # is only kept for as long as replicas are allowed to lag
+        timeout = min(timeout, settings.BLOG_REPLICA_STICKY_SECONDS)
+    cache.set(page_key, {
+        'content': response.content,
+        'status': response.status_code,
+        'headers': list(response.headers.items()),
+        'versions': _current_versions(keys, create=True),
+        'view_post_id': getattr(response, 'view_post_id', None),  # Set by PostDetailView
+    }, timeout)
+    response.headers['X-Cache'] = 'MISS'
+
+
+class AnonymousPageCacheMiddleware:
+    """
+    Serve whole pages to logged-out visitors from the cache.
+    - Only responses of views that declared surrogate keys are stored; writes purge those keys
+      (see blog.signals) instead of flushing the cache.
+    - Must come after AuthenticationMiddleware and MessageMiddleware.
+    - Use a shared cache backend (Redis, Memcached) when running several processes,
+      so a purge in one process is seen by all of them.
+    - Works both ways under ASGI: with async views the lookup and store each take one
+      thread hop and the user comes from `request.auser()`.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if request.method not in ('GET', 'HEAD') or request.user.is_authenticated:
+            return self.get_response(request)
+
+        page_key = _page_key(request)
+        entry = _fresh_entry(page_key)
+        if entry is not None:
+            if entry.get('view_post_id') is not None:
+                counters.record_view(entry['view_post_id'])
+            return _hit_response(request, entry)
+
+        response = self.get_response(request)
+        if _is_cacheable(request, response) and not request.user.is_authenticated:
+            _store(page_key, response)
+        return response
+
+    async def __acall__(self, request):
+        if request.method not in ('GET', 'HEAD') or (await request.auser()).is_authenticated:
+            return await self.get_response(request)
+
+        page_key = _page_key(request)
+        entry = await sync_to_async(_fresh_entry)(page_key)
+        if entry is not None:
+            if entry.get('view_post_id') is not None:
+                await counters.arecord_view(entry['view_post_id'])
+            return _hit_response(request, entry)
+
+        response = await self.get_response(request)
+        if _is_cacheable(request, response) and not (await request.auser()).is_authenticated:
+            await sync_to_async(_store)(page_key, response)
+        return response
@@ -0,0 +1,151 @@
+import base64  # URL-safe encoding of cursors
+import datetime  # Cursor values are often timestamps
+import json  # Serialisation of the cursor position
+
+from django.core.serializers.json import DjangoJSONEncoder  # Encodes datetimes and decimals
+from django.db.models import Q  # For building the keyset comparison
+from django.http import Http404  # Raised for malformed cursors
+
+# ----------------------------------------
+# Keyset (Cursor) Pagination
+# ----------------------------------------
+
+class CursorEncoder(DjangoJSONEncoder):
+    """ JSON encoder keeping full microsecond precision (DjangoJSONEncoder truncates to milliseconds). """
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class InvalidCursor(ValueError):
+    """ Raised when a cursor cannot be decoded for the requested ordering. """
+
+
+class KeysetPage:
+    """
+    A single page of results produced by `paginate`.
+    - `object_list`: the rows on this page.
+    - `next_cursor`: opaque token for the following page, or None on the last page.
+    - `cursor`: the token this page was requested with (None for the first page).
+    """
+
+    def __init__(self, object_list, next_cursor, cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.cursor = cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def is_first(self):
+        return self.cursor is None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def encode_cursor(values):
+    """ Pack the ordering values of the last row into an opaque, URL-safe token. """
+    raw = json.dumps(list(values), cls=CursorEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, model, fields):
+    """
+    Unpack a cursor produced by `encode_cursor`.
+    - Values are converted back to Python with the model fields' `to_python`.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(fields):
+            raise ValueError('cursor does not match the ordering')
+        return [model._meta.get_field(name).to_python(value) for name, value in zip(fields, values)]
+    except Exception as exc:  # Any decoding problem means the client sent a bad cursor
+        raise InvalidCursor(str(exc)) from exc
+
+
+def _split_ordering(ordering):
+    """ ('-published_date', '-id') -> [('published_date', True), ('id', True)] """
+    return [(field.lstrip('-'), field.startswith('-')) for field in ordering]
+
+
+def _after(fields, values):
+    """
+    Build the filter selecting rows strictly after `values` in the given ordering.
+    - For (a DESC, b DESC) this is: a < va OR (a = va AND b < vb).
+    """
+    condition = Q()
+    for index, (name, descending) in enumerate(fields):
+        branch = Q(**{f'{name}__{"lt" if descending else "gt"}': values[index]})
+        for prev_index in range(index):
+            branch &= Q(**{fields[prev_index][0]: values[prev_index]})
+        condition |= branch
+    return condition
+
+
+def _page_queryset(queryset, fields, ordering, cursor, page_size):
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        values = decode_cursor(cursor, queryset.model, [name for name, _ in fields])
+        queryset = queryset.filter(_after(fields, values))
+    return queryset[:page_size + 1]  # One extra row tells whether a next page exists
+
+
+def _make_page(rows, fields, cursor, page_size):
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, name) for name, _ in fields)
+    return KeysetPage(rows, next_cursor, cursor or None)
+
+
+def paginate(queryset, ordering, cursor=None, page_size=20):
+    """
+    Return one `KeysetPage` of `queryset` ordered by `ordering`.
+    - The last field of `ordering` must be unique (e.g. 'id') so the order is total.
+    - Each page is a single indexed range scan (`WHERE key < cursor ORDER BY key LIMIT n`),
+      so the cost of page N does not depend on N the way OFFSET does.
+    """
+    fields = _split_ordering(ordering)
+    rows = list(_page_queryset(queryset, fields, ordering, cursor, page_size))
+    return _make_page(rows, fields, cursor, page_size)
+
+
+async def apaginate(queryset, ordering, cursor=None, page_size=20):
+    """ Async form of `paginate` (the page is fetched with `async for`). """
+    fields = _split_ordering(ordering)
+    rows = [row async for row in _page_queryset(queryset, fields, ordering, cursor, page_size)]
+    return _make_page(rows, fields, cursor, page_size)
+
+
+class KeysetPaginationMixin:
+    """
+    Mixin for ListView subclasses that replaces OFFSET pagination with keyset pagination.
+    - The page is read from the `cursor` GET parameter and exposed to templates as `page`.
+    """
+    keyset_ordering = ('-published_date', '-id')
+    page_size = 20
+    cursor_param = 'cursor'
+
+    def get_context_data(self, **kwargs):
+        try:
+            page = paginate(
+                self.object_list,
+                self.keyset_ordering,
+                cursor=self.request.GET.get(self.cursor_param),
+                page_size=self.page_size,
+            )
+        except InvalidCursor:
+            raise Http404('Invalid page cursor.')
+        context = super().get_context_data(object_list=page.object_list, **kwargs)
+        context['page'] = page
+        return context
@@ -0,0 +1,185 @@
+from django.db import transaction  # Replace each post's neighbour rows atomically
+from taggit.models import TaggedItem  # Tagging rows the similarity is computed from
+
+from . import pagecache  # Purge cached post pages whose neighbour list changed
+from .models import Post, RelatedPost  # Posts and the precomputed neighbour table
+
+# ----------------------------------------
+# Related Posts (Jaccard Similarity over Tags)
+# ----------------------------------------
+
+RELATED_POSTS_K = 5  # Neighbours stored per post
+WRITE_BATCH_SIZE = 500  # Posts whose neighbour rows are written per transaction
+
+
+def chunked(values, size=500):
+    """ Split `values` into lists of at most `size` items (keeps IN clauses under SQLite's limits). """
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def iter_bits(mask):
+    """ Yield the positions of the set bits of `mask`, lowest first. """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class TagMatrix:
+    """
+    In-memory post x tag incidence matrix stored as bitsets.
+    - Posts get dense indexes 0..N-1; for every tag, a Python int has bit i set when post i
+      carries it. Intersections and overlap counts for *all* posts are then computed with a
+      handful of bitwise operations on those ints, which run in C over N/64 machine words.
+    - Tag bitsets are built on first use and cached for the lifetime of the matrix.
+    """
+
+    def __init__(self, rows):
+        self.post_ids = []  # Dense index -> post id
+        self.index = {}  # Post id -> dense index
+        self.post_tags = []  # Dense index -> tuple of tag ids
+        self.postings = {}  # Tag id -> list of dense post indexes
+        tags_by_post = {}
+        for post_id, tag_id in rows:
+            tags_by_post.setdefault(post_id, []).append(tag_id)
+        for post_id in sorted(tags_by_post):
+            position = len(self.post_ids)
+            self.index[post_id] = position
+            self.post_ids.append(post_id)
+            self.post_tags.append(tuple(tags_by_post[post_id]))
+            for tag_id in tags_by_post[post_id]:
+                self.postings.setdefault(tag_id, []).append(position)
+        self._bitsets = {}
+
+    @classmethod
+    def load(cls):
+        """ Build the matrix from the tagging table with a single query. """
+        rows = TaggedItem.objects.filter(
+            content_type__app_label=Post._meta.app_label,
+            content_type__model=Post._meta.model_name,
+            object_id__in=Post.objects.values('pk'),  # Ignore tagging rows of deleted posts
+        ).values_list('object_id', 'tag_id')
+        return cls(rows.iterator(chunk_size=5000))
+
+    def bitset(self, tag_id):
+        """ Bitset of the posts carrying `tag_id`. """
+        bits = self._bitsets.get(tag_id)
+        if bits is None:
+            raw = bytearray((len(self.post_ids) + 7) // 8)
+            for position in self.postings.get(tag_id, ()):
+                raw[position >> 3] |= 1 << (position & 7)
+            bits = int.from_bytes(raw, 'little')
+            self._bitsets[tag_id] = bits
+        return bits
+
+    def top_k(self, post_id, k=RELATED_POSTS_K):
+        """
+        The `k` posts most similar to `post_id` as [(related_id, score)], best first.
+        - Overlap counts of every post are accumulated in bit-sliced counters: slice i holds
+          bit i of each post's count, and adding a tag bitset is a ripple-carry addition.
+        - Candidates are then read level by level from the highest overlap down. A post with
+          overlap m can score at most m / |tags(post)|, so the scan stops as soon as the
+          current top-k can no longer be beaten.
+        """
+        position = self.index.get(post_id)
+        if position is None:
+            return []
+        tags = self.post_tags[position]
+        own_size = len(tags)
+
+        slices = []  # Bit-sliced overlap counters
+        for tag_id in tags:
+            carry = self.bitset(tag_id)
+            for level, counter in enumerate(slices):
+                slices[level], carry = counter ^ carry, counter & carry
+                if not carry:
+                    break
+            if carry:
+                slices.append(carry)
+
+        candidates = 0
+        for counter in slices:
+            candidates |= counter
+        candidates &= ~(1 << position)  # A post is not related to itself
+
+        scored = []
+        for overlap in range(own_size, 0, -1):
+            if len(scored) >= k and scored[k - 1][0] >= overlap / own_size:
+                break  # No post at this overlap level can enter the top-k
+            exact = candidates
+            for level, counter in enumerate(slices):
+                exact &= counter if overlap >> level & 1 else ~counter
+            for other in iter_bits(exact):
+                other_size = len(self.post_tags[other])
+                score = overlap / (own_size + other_size - overlap)
+                scored.append((score, -self.post_ids[other]))
+            scored.sort(reverse=True)  # Best score first, older (lower id) posts break ties
+            del scored[k:]
+        return [(-negative_id, score) for score, negative_id in scored]
+
+
+def _write_neighbours(results):
+    """
+    Replace the neighbour rows of the posts in `results` ({post_id: [(related_id, score)]}).
+    - Posts deleted while the refresh was running are skipped.
+    - Returns the number of posts whose rows were written.
+    """
+    ids = set(results)
+    for neighbours in results.values():
+        ids.update(related_id for related_id, _ in neighbours)
+    with transaction.atomic():
+        existing = set(Post.objects.filter(pk__in=list(ids)).values_list('pk', flat=True))
+        RelatedPost.objects.filter(post_id__in=list(results)).delete()
+        rows = []
+        for post_id, neighbours in results.items():
+            if post_id not in existing:
+                continue
+            neighbours = [(related_id, score) for related_id, score in neighbours if related_id in existing]
+            rows.extend(
+                RelatedPost(post_id=post_id, related_id=related_id, score=score, rank=rank)
+                for rank, (related_id, score) in enumerate(neighbours)
+            )
+        RelatedPost.objects.bulk_create(rows, batch_size=WRITE_BATCH_SIZE)
+    pagecache.purge(*(pagecache.post_key(post_id) for post_id in results))
+    return len(existing & set(results))
+
+
+def refresh_related_posts(full=False, k=RELATED_POSTS_K):
+    """
+    Recompute neighbour lists and return the number of posts refreshed.
+    - Incremental mode refreshes the posts flagged `related_dirty` (their tags changed), the
+      posts that currently list one of them, and their new neighbours (similarity is
+      symmetric, so those lists are the ones a tag change can reorder).
+    - `full=True` recomputes every post; run it periodically to fold in rarer knock-on effects.
+    - Results are written in batches of WRITE_BATCH_SIZE posts.
+    - Flags are cleared before the tags are loaded, so a post re-tagged while the job runs
+      stays flagged for the next refresh (its list may have been built from its old tags).
+    """
+    if full:
+        dirty = set(Post.objects.values_list('pk', flat=True))
+    else:
+        dirty = set(Post.objects.filter(related_dirty=True).values_list('pk', flat=True))
+    for ids in chunked(dirty):
+        Post.objects.filter(pk__in=ids, related_dirty=True).update(related_dirty=False)
+
+    matrix = TagMatrix.load()
+    computed = {}
+    if full:
+        pending = sorted(dirty)
+    else:
+        affected = set(dirty)
+        for ids in chunked(dirty):
+            affected.update(RelatedPost.objects.filter(related_id__in=ids).values_list('post_id', flat=True))
+        for post_id in dirty:
+            computed[post_id] = matrix.top_k(post_id, k)
+            affected.update(related_id for related_id, _ in computed[post_id])
+        pending = sorted(affected)
+
+    refreshed = 0
+    for ids in chunked(pending, WRITE_BATCH_SIZE):
+        refreshed += _write_neighbours({
+            post_id: computed.pop(post_id, None) or matrix.top_k(post_id, k) for post_id in ids
+        })
+    return refreshed
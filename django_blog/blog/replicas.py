@@ -0,0 +1,183 @@
+import os  # Atomic replacement of a replica file
+import random  # Spreads requests over the replicas
+import sqlite3  # Online backup of the primary into a local replica
+from contextlib import contextmanager  # Temporarily reading from the primary
+from contextvars import ContextVar  # Per-request (and per-task under ASGI) replica choice
+from functools import wraps  # Keeps the wrapped view's name and attributes
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction  # Async view and middleware support
+from django.conf import settings  # BLOG_READ_REPLICAS and BLOG_REPLICA_STICKY_SECONDS
+from django.db import DEFAULT_DB_ALIAS, connections  # The primary database; replica file names
+
+# ----------------------------------------
+# Read Replicas with Read-Your-Writes Stickiness
+# ----------------------------------------
+#
+# Reads only go to a replica inside a view wrapped with `reads_from_replica` (the post list,
+# post, tag and search pages); everything else, and every write, uses the primary. A request
+# that may have written (any unsafe method) gets a short-lived cookie, and while it is
+# present that browser's reads stay on the primary, so users always see their own changes
+# even when the replicas lag behind.
+
+STICKY_COOKIE = 'blog_primary'  # Present while a browser's reads must stay on the primary
+REPLICA_APPS = {'blog', 'taggit'}  # Apps whose tables are read from replicas (users and sessions never are)
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+_read_alias = ContextVar('blog_read_alias', default=None)  # Replica used by the current view, if any
+
+
+def replica_aliases():
+    return list(settings.BLOG_READ_REPLICAS)
+
+
+def current_replica():
+    """ The replica alias reads are routed to right now, or None when they use the primary. """
+    return _read_alias.get()
+
+
+@contextmanager
+def primary_reads():
+    """
+    Read from the primary inside the block, even within a replica-reading view.
+    - For cheap queries whose results are cached for long: a lagging replica would put stale
+      data in the cache right after a write invalidated it.
+    """
+    token = _read_alias.set(None)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def replica_timeout(timeout):
+    """ `timeout` for a cache entry built from the current reads: at most the lag window on a replica. """
+    if _read_alias.get() is None:
+        return timeout
+    return min(timeout, settings.BLOG_REPLICA_STICKY_SECONDS)
+
+
+def _pick_replica(request):
+    """ A replica for this request, or None when there are none or the browser is sticky. """
+    replicas = replica_aliases()
+    if not replicas or STICKY_COOKIE in request.COOKIES:
+        return None
+    return random.choice(replicas)
+
+
+def reads_from_replica(view):
+    """
+    Decorator sending the ORM reads of a view (sync or async) to one replica.
+    - One replica is picked per request, so all of a page's queries see the same snapshot.
+    - Template responses are rendered inside the view, so the queries run by the template
+      go to the replica too; the response is marked with `read_from_replica`.
+    """
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            token = _read_alias.set(_pick_replica(request))
+            try:
+                response = await view(request, *args, **kwargs)
+                response.read_from_replica = _read_alias.get() is not None
+                return response
+            finally:
+                _read_alias.reset(token)
+        return wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        token = _read_alias.set(_pick_replica(request))
+        try:
+            response = view(request, *args, **kwargs)
+            if hasattr(response, 'render') and callable(response.render):
+                response = response.render()
+            response.read_from_replica = _read_alias.get() is not None
+            return response
+        finally:
+            _read_alias.reset(token)
+    return wrapper
+
+
+class ReadReplicaRouter:
+    """
+    Database router: reads of blog and tag tables go to the replica chosen by
+    `reads_from_replica`, all writes go to the primary (`default`).
+    - Without BLOG_READ_REPLICAS it has no effect.
+    - Replicas are copies of the primary, so relations between their objects are allowed,
+      and they are never migrated directly.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None:
+            return DEFAULT_DB_ALIAS
+        instance = hints.get('instance')
+        if model._meta.app_label in REPLICA_APPS or (instance is not None and instance._state.db == alias):
+            return alias  # Also related objects of replica rows (e.g. a post's author)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replica_aliases():
+            return False
+        return None
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Keep a browser's reads on the primary for BLOG_REPLICA_STICKY_SECONDS after it sends a
+    request that may have written (POST, PUT, PATCH, DELETE).
+    - The window should be longer than the replicas' lag (see `sync_replica`).
+    - Does nothing while no replicas are configured.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self._mark(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self._mark(request, await self.get_response(request))
+
+    def _mark(self, request, response):
+        if request.method not in SAFE_METHODS and replica_aliases():
+            response.set_cookie(
+                STICKY_COOKIE, '1', max_age=settings.BLOG_REPLICA_STICKY_SECONDS, httponly=True, samesite='Lax',
+            )
+        return response
+
+
+def copy_sqlite_replica(alias, source=DEFAULT_DB_ALIAS):
+    """
+    Refresh a local SQLite replica with a consistent snapshot of the primary (a stand-in for
+    real replication in development and tests).
+    - Uses SQLite's online backup, so writers are not blocked for long, into a temporary
+      file that then replaces the replica; open replica connections keep the old snapshot.
+    """
+    source_settings, replica_settings = connections[source].settings_dict, connections[alias].settings_dict
+    if not (source_settings['ENGINE'] == replica_settings['ENGINE'] == 'django.db.backends.sqlite3'):
+        raise ValueError(f'{source!r} and {alias!r} must both be SQLite databases')
+    target = str(replica_settings['NAME'])
+    temporary = f'{target}.tmp'
+    primary = sqlite3.connect(str(source_settings['NAME']))
+    copy = sqlite3.connect(temporary)
+    try:
+        primary.backup(copy)
+    finally:
+        copy.close()
+        primary.close()
+    os.replace(temporary, target)
@@ -0,0 +1,325 @@
+import hashlib  # Hashing normalized queries into cache keys
+import re  # Regular expressions for splitting search queries into tokens
+import time  # Initial value of the search generation counter
+
+from django.core.cache import cache  # Backend storing cached result id lists
+from django.db import connections, router, transaction  # Raw database connections, the router choosing them, commit hooks
+from django.db.models import Q  # For the fallback lookup on non-SQLite databases
+from taggit.models import TaggedItem  # Through model linking posts to tags
+
+from . import replicas  # Results read from a replica are cached only for the lag window
+from .models import Post  # The model whose rows are indexed
+
+# ----------------------------------------
+# Full-Text Search Index (SQLite FTS5)
+# ----------------------------------------
+
+FTS_TABLE = 'blog_post_fts'  # Name of the FTS5 virtual table (rowid == Post.id)
+SEARCH_MAX_RESULTS = 1000  # Upper bound on the number of ids returned for a single query
+BM25_WEIGHTS = (10.0, 1.0, 5.0)  # Relative weight of title, content and tags in the ranking
+SEARCH_GENERATION_KEY = 'blog:search-generation'  # Bumped on every index write; part of every result key
+SEARCH_CACHE_TIMEOUT = 60 * 60  # Old generations are never read again and simply expire
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)  # A token is a run of word characters
+
+
+def _write_connection():
+    """ Connection that receives index writes (the same database as Post writes). """
+    return connections[router.db_for_write(Post)]
+
+
+def _read_connection():
+    """ Connection that serves search queries. """
+    return connections[router.db_for_read(Post)]
+
+
+def uses_fts(connection):
+    """ The FTS5 index only exists on SQLite; other backends fall back to LIKE lookups. """
+    return connection.vendor == 'sqlite'
+
+
+def tokenize(query):
+    """
+    Split a raw search string into case-folded tokens.
+    - Punctuation and FTS5 operators are dropped, so user input can never break the MATCH syntax.
+    """
+    return TOKEN_RE.findall(query.casefold())
+
+
+def normalize_query(query):
+    """
+    Canonical form of a query for caching: case-folded tokens, de-duplicated and sorted.
+    - Tokens are ANDed and BM25 ignores their order, so all spellings share one result list.
+    """
+    return ' '.join(sorted(set(tokenize(query))))
+
+
+def build_match_expression(query):
+    """
+    Turn a user query into an FTS5 MATCH expression.
+    - Every token must match (implicit AND), and each token is a prefix query
+      so partially typed words still find results.
+    """
+    return ' '.join(f'"{token}"*' for token in tokenize(query))
+
+
+# ----------------------------------------
+# Result Cache (generation counter)
+# ----------------------------------------
+
+def search_generation():
+    """ Current generation; a missing counter starts at a unique value so old keys are never reused. """
+    cache.add(SEARCH_GENERATION_KEY, time.time_ns(), None)
+    return cache.get(SEARCH_GENERATION_KEY)
+
+
+def invalidate_results():
+    """ Move to a new generation, orphaning every cached result list at once. """
+    try:
+        cache.incr(SEARCH_GENERATION_KEY)
+    except ValueError:  # No counter yet: nothing has been cached under it
+        pass
+
+
+def invalidate_results_on_commit(connection):
+    """
+    Move to a new generation once the current transaction commits (at once in autocommit).
+    - Called after the index write: bumping first would let a search running in between
+      cache the old results under the new generation.
+    """
+    transaction.on_commit(invalidate_results, using=connection.alias)
+
+
+def _results_key(generation, normalized):
+    return f'blog:search:{generation}:' + hashlib.md5(normalized.encode()).hexdigest()
+
+
+def _cached_entry(query, with_facets=False):
+    """
+    Cached `{'ids': [...], 'facets': {...} or None}` for `query` in the current generation.
+    - Facet memberships are computed on first request and stored in the same entry.
+    """
+    normalized = normalize_query(query)
+    if not normalized:
+        return {'ids': [], 'facets': {}}
+    key = _results_key(search_generation(), normalized)
+    entry = cache.get(key)
+    timeout = replicas.replica_timeout(SEARCH_CACHE_TIMEOUT)  # Results from a replica may predate the generation
+    if entry is None:
+        entry = {'ids': search(normalized), 'facets': None}
+        cache.set(key, entry, timeout)
+    if with_facets and entry['facets'] is None:
+        entry['facets'] = facet_memberships(entry['ids'])
+        cache.set(key, entry, timeout)
+    return entry
+
+
+def cached_search(query):
+    """
+    `search()` through the result cache: ranked post ids for `query`.
+    - Results are stored per normalized query under the current generation, which every
+      post or tag write bumps (through the index functions below).
+    """
+    return _cached_entry(query)['ids']
+
+# ----------------------------------------
+# Facets (tags and authors of the matching posts)
+# ----------------------------------------
+
+FACET_LIMIT = 10  # Facet values shown per facet (selected values are always kept)
+
+
+def facet_memberships(post_ids):
+    """
+    {post_id: (author username, tag names)} for the matching posts, from one joined query.
+    """
+    memberships = {}
+    rows = Post.objects.filter(pk__in=post_ids).values_list('id', 'author__username', 'tags__name')
+    for post_id, author, tag in rows:
+        _, post_tags = memberships.setdefault(post_id, (author, []))
+        if tag is not None:
+            post_tags.append(tag)
+    return memberships
+
+
+def narrow(post_ids, memberships, tags=(), author=None):
+    """ Keep the posts carrying every tag in `tags` (and written by `author`), in ranked order. """
+    wanted = set(tags)
+    return [
+        post_id for post_id in post_ids
+        if post_id in memberships
+        and (author is None or memberships[post_id][0] == author)
+        and wanted.issubset(memberships[post_id][1])
+    ]
+
+
+def count_facets(post_ids, memberships, limit=FACET_LIMIT, selected_tags=(), selected_author=None):
+    """
+    Tag and author counts over `post_ids` in a single pass.
+    - Returns {'tags': [(name, count)], 'authors': [(username, count)]}, most frequent first.
+    """
+    tag_counts, author_counts = {}, {}
+    for post_id in post_ids:
+        author, post_tags = memberships[post_id]
+        author_counts[author] = author_counts.get(author, 0) + 1
+        for tag in post_tags:
+            tag_counts[tag] = tag_counts.get(tag, 0) + 1
+
+    def top(counts, selected):
+        ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        return [item for index, item in enumerate(ranked) if index < limit or item[0] in selected]
+
+    return {
+        'tags': top(tag_counts, set(selected_tags)),
+        'authors': top(author_counts, {selected_author}),
+    }
+
+
+def faceted_search(query, tags=(), author=None):
+    """
+    Ranked ids for `query` narrowed by the selected facets, plus the facet counts.
+    - The text match runs once per query and generation; selecting facets only filters the
+      cached ids against the cached memberships.
+    """
+    entry = _cached_entry(query, with_facets=True)
+    post_ids = narrow(entry['ids'], entry['facets'], tags, author)
+    return post_ids, count_facets(post_ids, entry['facets'], selected_tags=tags, selected_author=author)
+
+
+def _tag_names_by_post(post_ids):
+    """ Fetch the tag names for many posts in a single query: {post_id: 'tag1 tag2'}. """
+    names = {}
+    rows = TaggedItem.objects.filter(
+        content_type__app_label=Post._meta.app_label,
+        content_type__model=Post._meta.model_name,
+        object_id__in=post_ids,
+    ).values_list('object_id', 'tag__name')
+    for post_id, name in rows:
+        names.setdefault(post_id, []).append(name)
+    return {post_id: ' '.join(tags) for post_id, tags in names.items()}
+
+
+def index_post(post):
+    """
+    Insert or replace the index row of a single post.
+    - Called from signal handlers whenever a post or its tags change.
+    """
+    connection = _write_connection()
+    if uses_fts(connection):
+        tags = ' '.join(post.tags.names())
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [post.pk])
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, content, tags) VALUES (%s, %s, %s, %s)",
+                [post.pk, post.title, post.content, tags],
+            )
+    invalidate_results_on_commit(connection)
+
+
+def remove_post(post_id):
+    """ Drop a post from the index (used when the post is deleted). """
+    connection = _write_connection()
+    if uses_fts(connection):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [post_id])
+    invalidate_results_on_commit(connection)
+
+
+def index_posts(posts):
+    """
+    Index a batch of posts with one query for their tags and one executemany for the rows.
+    - Existing rows for these posts are replaced.
+    """
+    connection = _write_connection()
+    if uses_fts(connection) and posts:
+        tags = _tag_names_by_post([post.pk for post in posts])
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [[post.pk] for post in posts]
+            )
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, content, tags) VALUES (%s, %s, %s, %s)",
+                [[post.pk, post.title, post.content, tags.get(post.pk, '')] for post in posts],
+            )
+    invalidate_results_on_commit(connection)
+
+
+def tagged_post_ids(tag_id):
+    """ Ids of the posts carrying a tag (one query on the tagging table). """
+    return list(
+        TaggedItem.objects.filter(
+            content_type__app_label=Post._meta.app_label,
+            content_type__model=Post._meta.model_name,
+            tag_id=tag_id,
+        ).values_list('object_id', flat=True)
+    )
+
+
+def reindex_posts(post_ids, batch_size=500):
+    """
+    Re-index posts by id, in batches (e.g. every post carrying a renamed or deleted tag).
+    - Cached results are retired even when no post is affected: facets list tag names.
+    """
+    post_ids = list(post_ids)
+    for start in range(0, len(post_ids), batch_size):
+        index_posts(list(Post.objects.filter(pk__in=post_ids[start:start + batch_size]).only('id', 'title', 'content')))
+    invalidate_results_on_commit(_write_connection())
+
+
+def rebuild_index(batch_size=500):
+    """
+    Rebuild the whole index from the Post table.
+    - Posts are streamed in primary-key order so memory stays bounded.
+    - Returns the number of posts indexed.
+    """
+    invalidate_results()
+    connection = _write_connection()
+    if not uses_fts(connection):
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+
+    total = 0
+    batch = []
+    for post in Post.objects.only('id', 'title', 'content').order_by('pk').iterator(chunk_size=batch_size):
+        batch.append(post)
+        if len(batch) >= batch_size:
+            index_posts(batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        index_posts(batch)
+        total += len(batch)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")  # Merge index segments
+    return total
+
+
+def search(query, limit=SEARCH_MAX_RESULTS):
+    """
+    Return the ids of posts matching `query`, best match first.
+    - On SQLite the FTS5 index is queried and ranked with BM25 (title > tags > content).
+    - On other databases a LIKE lookup is used, ordered by newest first.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+
+    connection = _read_connection()
+    if not uses_fts(connection):
+        lookup = Q()
+        for token in tokens:
+            lookup &= Q(title__icontains=token) | Q(content__icontains=token) | Q(tags__name__icontains=token)
+        return list(
+            Post.objects.filter(lookup).order_by('-published_date').values_list('pk', flat=True).distinct()[:limit]
+        )
+
+    weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+            f"ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT %s",
+            [build_match_expression(query), limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
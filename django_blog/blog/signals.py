@@ -0,0 +1,205 @@
+from django.db import transaction  # Cache invalidation after the write commits
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed  # Model lifecycle signals
+from django.dispatch import receiver  # Decorator for connecting signal handlers
+from django.utils import timezone  # Timestamps for change tracking
+from taggit.models import Tag, TaggedItem  # taggit models (TaggedItem is the sender of m2m_changed)
+from . import archive, autocomplete, pagecache, search, tags  # Month archive, autocomplete, page cache purging, search index and tag statistics
+from .models import Post, Comment  # The Post and Comment models
+
+# ----------------------------------------
+# Search Index Synchronisation
+# ----------------------------------------
+
+@receiver(post_save, sender=Post)
+def index_post_on_save(sender, instance, **kwargs):
+    """ Keep the full-text index in sync when a post is created or edited. """
+    search.index_post(instance)
+
+@receiver(post_delete, sender=Post)
+def remove_post_from_index(sender, instance, **kwargs):
+    """ Remove a deleted post from the full-text index. """
+    search.remove_post(instance.pk)
+
+@receiver(m2m_changed, sender=TaggedItem)
+def index_post_on_tag_change(sender, instance, action, **kwargs):
+    """ Re-index a post after tags are added to, removed from or cleared on it. """
+    if isinstance(instance, Post) and action in ('post_add', 'post_remove', 'post_clear'):
+        search.index_post(instance)
+
+@receiver(pre_save, sender=Tag)
+def remember_tag_name(sender, instance, **kwargs):
+    """ Keep the stored name of a tag being saved, so renames can be told apart from other saves. """
+    instance._old_name = Tag.objects.filter(pk=instance.pk).values_list('name', flat=True).first() if instance.pk else None
+
+@receiver(post_save, sender=Tag)
+def reindex_posts_on_tag_rename(sender, instance, created, **kwargs):
+    """ The index stores tag names, so every post carrying a renamed tag is re-indexed. """
+    old_name = getattr(instance, '_old_name', None)
+    if not created and old_name is not None and old_name != instance.name:
+        search.reindex_posts(search.tagged_post_ids(instance.pk))
+
+@receiver(pre_delete, sender=Tag)
+def remember_tagged_posts(sender, instance, **kwargs):
+    """ The tagging rows are deleted with the tag (by cascade), so collect the posts first. """
+    instance._tagged_post_ids = search.tagged_post_ids(instance.pk)
+
+@receiver(post_delete, sender=Tag)
+def reindex_posts_on_tag_delete(sender, instance, **kwargs):
+    search.reindex_posts(getattr(instance, '_tagged_post_ids', []))
+
+# ----------------------------------------
+# Tag Statistics
+# ----------------------------------------
+
+@receiver(m2m_changed, sender=TaggedItem)
+def update_tag_stats(sender, instance, action, pk_set, **kwargs):
+    """
+    Maintain TagStat rows incrementally as tags are added to or removed from posts.
+    - taggit sends `pk_set=None` on clear, so the cleared tag ids are captured in pre_clear.
+    """
+    if not isinstance(instance, Post):
+        return
+    if action == 'pre_clear':
+        instance._cleared_tag_ids = set(
+            TaggedItem.objects.filter(
+                content_type__app_label=Post._meta.app_label,
+                content_type__model=Post._meta.model_name,
+                object_id=instance.pk,
+            ).values_list('tag_id', flat=True)
+        )
+    elif action == 'post_add':
+        tags.tags_added(pk_set, instance.published_date)
+    elif action == 'post_remove':
+        tags.tags_removed(pk_set)
+    elif action == 'post_clear':
+        tags.tags_removed(getattr(instance, '_cleared_tag_ids', set()))
+
+# ----------------------------------------
+# Month Archive
+# ----------------------------------------
+
+@receiver(post_save, sender=Post)
+def count_post_in_archive(sender, instance, created, **kwargs):
+    """ `published_date` is set once (auto_now_add), so only creation changes the buckets. """
+    if created:
+        archive.post_created(instance.published_date)
+
+@receiver(post_delete, sender=Post)
+def remove_post_from_archive(sender, instance, **kwargs):
+    archive.post_deleted(instance.published_date)
+
+# ----------------------------------------
+# Change Tracking (updated_at and related posts)
+# ----------------------------------------
+
+@receiver(m2m_changed, sender=TaggedItem)
+def touch_post_on_tag_change(sender, instance, action, **kwargs):
+    """
+    Record a tag change on the post in one UPDATE:
+    - bump `updated_at` so cached pages and conditional GETs see the change;
+    - flag the post for the next related-posts refresh.
+    """
+    if isinstance(instance, Post) and action in ('post_add', 'post_remove', 'post_clear'):
+        Post.objects.filter(pk=instance.pk).update(related_dirty=True, updated_at=timezone.now())
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def touch_post_on_comment_change(sender, instance, **kwargs):
+    """ A new, edited or deleted comment changes the post page, so bump the post's `updated_at`. """
+    Post.objects.filter(pk=instance.post_id).update(updated_at=timezone.now())
+
+@receiver(pre_delete, sender=Post)
+def mark_referrers_dirty(sender, instance, **kwargs):
+    """ Posts listing a deleted post lose a neighbour; flag them so the slot gets refilled. """
+    Post.objects.filter(related_entries__related=instance).update(related_dirty=True)
+
+@receiver(pre_delete, sender=Post)
+def clear_tags_on_delete(sender, instance, **kwargs):
+    """
+    Untag a post before it is deleted.
+    - taggit does not cascade its generic tagging rows, so without this the rows would be
+      orphaned and the tag statistics would never be decremented.
+    """
+    instance.tags.clear()
+
+# ----------------------------------------
+# Page Cache Purging (surrogate keys)
+# ----------------------------------------
+
+@receiver(post_save, sender=Post)
+def purge_pages_on_post_save(sender, instance, created, using, **kwargs):
+    """ A new post changes the lists and search; an edit also changes its own page and its tag pages. """
+    keys = [pagecache.LIST_KEY, pagecache.SEARCH_KEY]
+    if not created:
+        keys.append(pagecache.post_key(instance.pk))
+        keys.extend(pagecache.tag_key(name) for name in instance.tags.names())
+    pagecache.purge_on_commit(*keys, using=using)
+
+@receiver(post_delete, sender=Post)
+def purge_pages_on_post_delete(sender, instance, using, **kwargs):
+    """ Tag pages were already purged when the post was untagged in pre_delete. """
+    pagecache.purge_on_commit(pagecache.post_key(instance.pk), pagecache.LIST_KEY, pagecache.SEARCH_KEY, using=using)
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def purge_pages_on_comment_change(sender, instance, using, **kwargs):
+    """
+    Comments appear on their post's page; the list shows comment counts.
+    - Comment views write inside a transaction, so the purge waits for its commit.
+    """
+    pagecache.purge_on_commit(pagecache.post_key(instance.post_id), pagecache.LIST_KEY, using=using)
+
+@receiver(m2m_changed, sender=TaggedItem)
+def purge_pages_on_tag_change(sender, instance, action, pk_set, using, **kwargs):
+    """ Purge the post, the pages of the tags that changed, and everything showing the tag cloud. """
+    if not isinstance(instance, Post) or action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    tag_ids = getattr(instance, '_cleared_tag_ids', set()) if action == 'post_clear' else pk_set
+    names = Tag.objects.filter(pk__in=tag_ids).values_list('name', flat=True) if tag_ids else []
+    pagecache.purge_on_commit(
+        pagecache.post_key(instance.pk),
+        pagecache.LIST_KEY,
+        pagecache.SEARCH_KEY,
+        pagecache.TAG_CLOUD_KEY,
+        *(pagecache.tag_key(name) for name in names),
+        using=using,
+    )
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def purge_pages_on_tag_rename(sender, instance, using, created=None, **kwargs):
+    """
+    A renamed or deleted tag changes the tag cloud and its tag pages (old and new URL).
+    - The cloud is dropped once the write commits, like the purge, so it is not refilled
+      with the old name in between. New tags are counted (and purged) when first used.
+    """
+    names = {instance.name}
+    if created is not None:  # post_save
+        old_name = getattr(instance, '_old_name', None)
+        if created or old_name is None or old_name == instance.name:
+            return
+        names.add(old_name)
+    transaction.on_commit(tags.invalidate_tag_cloud, using=using)
+    pagecache.purge_on_commit(
+        pagecache.TAG_CLOUD_KEY, *(pagecache.tag_key(name) for name in names), using=using
+    )
+
+# ----------------------------------------
+# Autocomplete Index
+# ----------------------------------------
+
+@receiver(post_save, sender=Post)
+def add_title_suggestion(sender, instance, **kwargs):
+    autocomplete.post_saved(instance)
+
+@receiver(post_delete, sender=Post)
+def remove_title_suggestion(sender, instance, **kwargs):
+    autocomplete.post_deleted(instance.pk)
+
+@receiver(post_save, sender=Tag)
+def add_tag_suggestion(sender, instance, **kwargs):
+    autocomplete.tag_saved(instance)
+
+@receiver(post_delete, sender=Tag)
+def remove_tag_suggestion(sender, instance, **kwargs):
+    autocomplete.tag_deleted(instance.pk)
@@ -0,0 +1,175 @@
+import hashlib  # Fingerprints of the tag names in a shard
+import json  # The manifest of shard fingerprints
+import os  # Atomic file replacement
+from pathlib import Path  # Paths of the sitemap files
+from xml.sax.saxutils import escape  # XML-escape URLs
+
+from django.conf import settings  # SITE_URL and SITEMAP_ROOT
+from django.db.models import Count, F, Max  # Per-shard fingerprints
+from django.urls import reverse  # URLs of posts and tag pages
+
+from .models import Post, TagStat  # Posts and tags (with their latest post date) listed in the sitemaps
+
+# ----------------------------------------
+# Sitemaps (sharded, incrementally rebuilt, written to disk)
+# ----------------------------------------
+
+SHARD_SIZE = 50_000  # URLs per shard (the sitemap protocol's maximum)
+INDEX_FILENAME = 'sitemap.xml'  # The sitemap index crawlers are pointed at
+MANIFEST_FILENAME = 'sitemap-manifest.json'  # Fingerprints of the shards on disk
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+def _lastmod(value):
+    return value.isoformat(timespec='seconds')
+
+
+def _write_atomic(path, chunks):
+    """ Write `chunks` to a temporary file and move it into place, so readers never see half a file. """
+    temporary = path.with_name(path.name + '.tmp')
+    with open(temporary, 'w', encoding='utf-8') as handle:
+        handle.writelines(chunks)
+    os.replace(temporary, path)
+
+
+class ShardSource:
+    """
+    One kind of URL split into shards by primary-key range (shard n holds pks
+    n*SHARD_SIZE+1 .. (n+1)*SHARD_SIZE), so a change only dirties the shard of its pk.
+    - `fingerprints()` returns {shard: (count, lastmod, ...)} for every shard with one
+      query; `urls(shard)` returns that shard's (location, lastmod) pairs with one pk range scan.
+      Anything after the lastmod must change whenever a URL in the shard changes.
+    """
+    name = None
+
+    def fingerprints(self):
+        raise NotImplementedError
+
+    def urls(self, shard):
+        raise NotImplementedError
+
+    def filename(self, shard):
+        return f'sitemap-{self.name}-{shard}.xml'
+
+    @staticmethod
+    def pk_range(shard):
+        return shard * SHARD_SIZE + 1, (shard + 1) * SHARD_SIZE
+
+
+class PostShards(ShardSource):
+    """ Post pages; lastmod is `updated_at` (edits, comments, tags). """
+    name = 'posts'
+
+    def fingerprints(self):
+        # (id, updated_at) are both in the updated_at index, so SQLite answers this from the index
+        rows = (
+            Post.objects.annotate(shard=(F('id') - 1) / SHARD_SIZE)
+            .values('shard')
+            .annotate(count=Count('id'), lastmod=Max('updated_at'))
+        )
+        return {row['shard']: (row['count'], row['lastmod']) for row in rows}
+
+    def urls(self, shard):
+        rows = Post.objects.filter(pk__range=self.pk_range(shard)).order_by('pk').values_list('pk', 'updated_at')
+        for pk, updated_at in rows.iterator(chunk_size=5000):
+            yield reverse('post-detail', args=[pk]), updated_at
+
+
+class TagShards(ShardSource):
+    """
+    Tag pages of tags in use; lastmod is the tag's newest post (from TagStat).
+    - Tag URLs contain the tag name, so a shard's fingerprint includes a digest of its names:
+      renaming a tag rewrites its shard. Tags are far fewer than posts, so the names are read.
+    """
+    name = 'tags'
+
+    def fingerprints(self):
+        rows = (
+            TagStat.objects.filter(post_count__gt=0)
+            .order_by('tag_id')
+            .values_list('tag_id', 'tag__name', 'latest_post_date')
+        )
+        shards = {}
+        for tag_id, name, latest_post_date in rows.iterator(chunk_size=5000):
+            shard = shards.setdefault((tag_id - 1) // SHARD_SIZE, [0, None, hashlib.md5()])
+            shard[0] += 1
+            if latest_post_date is not None and (shard[1] is None or latest_post_date > shard[1]):
+                shard[1] = latest_post_date
+            shard[2].update(f'{tag_id}\0{name}\0'.encode())
+        return {shard: (count, lastmod, names.hexdigest()) for shard, (count, lastmod, names) in shards.items()}
+
+    def urls(self, shard):
+        first, last = self.pk_range(shard)
+        rows = (
+            TagStat.objects.filter(tag_id__gte=first, tag_id__lte=last, post_count__gt=0)
+            .order_by('tag_id')
+            .values_list('tag__name', 'latest_post_date')
+        )
+        for name, latest_post_date in rows.iterator(chunk_size=5000):
+            yield reverse('tagged-posts', args=[name]), latest_post_date
+
+
+SOURCES = (PostShards(), TagShards())
+
+
+def _shard_document(source, shard, site_url):
+    yield f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_NS}">\n'
+    for path, lastmod in source.urls(shard):
+        entry = f'<url><loc>{escape(site_url + path)}</loc>'
+        if lastmod is not None:
+            entry += f'<lastmod>{_lastmod(lastmod)}</lastmod>'
+        yield entry + '</url>\n'
+    yield '</urlset>\n'
+
+
+def _index_document(entries, site_url):
+    yield f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{SITEMAP_NS}">\n'
+    for filename, lastmod in entries:
+        entry = f'<sitemap><loc>{escape(site_url + "/" + filename)}</loc>'
+        if lastmod:
+            entry += f'<lastmod>{lastmod}</lastmod>'
+        yield entry + '</sitemap>\n'
+    yield '</sitemapindex>\n'
+
+
+def build_sitemaps(root=None, site_url=None, full=False):
+    """
+    Bring the sitemap files under `root` up to date and return the names of the rewritten shards.
+    - Each source's shard fingerprints (URL count, newest lastmod) are compared with the
+      manifest from the previous run; only shards whose fingerprint changed are rewritten,
+      and shards that became empty are deleted. `full=True` rewrites everything.
+    - The index is rewritten whenever a shard changed.
+    """
+    root = Path(root or settings.SITEMAP_ROOT)
+    site_url = (site_url or settings.SITE_URL).rstrip('/')
+    root.mkdir(parents=True, exist_ok=True)
+    manifest_path = root / MANIFEST_FILENAME
+    try:
+        previous = json.loads(manifest_path.read_text())
+    except (FileNotFoundError, ValueError):
+        previous = {}
+    if previous.get('site_url') != site_url:
+        full = True  # Every URL changes with the host
+    old_shards = {} if full else previous.get('shards', {})
+
+    shards = {}
+    index = []  # (filename, lastmod) entries of the sitemap index
+    written = []
+    for source in SOURCES:
+        for shard, (count, lastmod, *extra) in sorted(source.fingerprints().items()):
+            filename = source.filename(shard)
+            fingerprint = [count, lastmod.isoformat() if lastmod else None, *extra]  # Full precision
+            shards[filename] = fingerprint
+            index.append((filename, _lastmod(lastmod) if lastmod else None))
+            if old_shards.get(filename) != fingerprint or not (root / filename).exists():
+                _write_atomic(root / filename, _shard_document(source, shard, site_url))
+                written.append(filename)
+
+    removed = [filename for filename in previous.get('shards', {}) if filename not in shards]
+    for filename in removed:
+        (root / filename).unlink(missing_ok=True)
+
+    if written or removed or not (root / INDEX_FILENAME).exists():
+        _write_atomic(root / INDEX_FILENAME, _index_document(index, site_url))
+        _write_atomic(manifest_path, [json.dumps({'site_url': site_url, 'shards': shards}, indent=1)])
+    return written
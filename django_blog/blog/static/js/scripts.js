@@ -1,4 +1,67 @@
 // Basic example script to demonstrate dynamic behavior
 document.addEventListener('DOMContentLoaded', function() {
     console.log('Blog page loaded');
+
+    // Build the list item for a comment and, recursively, its replies
+    function renderComment(comment) {
+        const item = document.createElement('li');
+        const text = document.createElement('p');
+        text.textContent = comment.content;
+        const meta = document.createElement('small');
+        meta.textContent = 'By ' + comment.author + ' on ' + new Date(comment.created_at).toLocaleString();
+        item.appendChild(text);
+        item.appendChild(meta);
+        if (comment.reply_url) {
+            item.insertAdjacentHTML('beforeend', ' <a href="' + comment.reply_url + '">Reply</a>');
+        }
+        if (comment.edit_url) {
+            item.insertAdjacentHTML('beforeend',
+                ' <a href="' + comment.edit_url + '">Edit</a> <a href="' + comment.delete_url + '">Delete</a>');
+        }
+        if (comment.replies.length) {
+            const replies = document.createElement('ul');
+            comment.replies.forEach(function(reply) { replies.appendChild(renderComment(reply)); });
+            item.appendChild(replies);
+        }
+        if (comment.more_replies_url) {
+            const more = document.createElement('button');
+            more.type = 'button';
+            more.className = 'load-more-replies';
+            more.dataset.url = comment.more_replies_url;
+            more.textContent = 'Show more replies';
+            item.appendChild(more);
+        }
+        return item;
+    }
+
+    // Replace a comment whose thread was cut short with the full thread below it
+    document.addEventListener('click', function(event) {
+        const button = event.target.closest('.load-more-replies');
+        if (!button) {
+            return;
+        }
+        button.disabled = true;
+        fetch(button.dataset.url)
+            .then(function(response) { return response.json(); })
+            .then(function(data) { button.closest('li').replaceWith(renderComment(data.comment)); });
+    });
+
+    // Load further pages of comments from the JSON endpoint (post detail page)
+    const loadMore = document.getElementById('load-more-comments');
+    if (loadMore) {
+        const list = document.getElementById('comment-list');
+        loadMore.addEventListener('click', function() {
+            const url = loadMore.dataset.url + '?cursor=' + encodeURIComponent(loadMore.dataset.cursor);
+            fetch(url)
+                .then(function(response) { return response.json(); })
+                .then(function(data) {
+                    data.comments.forEach(function(comment) { list.appendChild(renderComment(comment)); });
+                    if (data.next_cursor) {
+                        loadMore.dataset.cursor = data.next_cursor;
+                    } else {
+                        loadMore.remove();
+                    }
+                });
+        });
+    }
 });
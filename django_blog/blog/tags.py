@@ -0,0 +1,147 @@
+import math  # Logarithmic scaling of tag cloud weights
+
+from django.core.cache import cache  # Cache for the rendered tag cloud data
+from django.db import connections, router  # Raw connection for the bulk counter update
+from django.db.models import Case, Count, F, Max, OuterRef, Subquery, Value, When  # Update expressions
+from django.db.models.functions import Greatest  # Keeps counters from going negative
+from . import replicas  # The cloud is always built from the primary
+from .models import Post, TagStat  # Posts and the per-tag statistics table
+
+# ----------------------------------------
+# Tag Statistics and Tag Cloud
+# ----------------------------------------
+
+TAG_CLOUD_CACHE_KEY = 'blog:tag-cloud'  # Cache key of the tag cloud
+TAG_CLOUD_SIZE = 50  # Number of tags shown in the cloud
+TAG_CLOUD_TIMEOUT = 60 * 60  # Safety expiry; the cloud is invalidated on every change anyway
+TAG_CLOUD_WEIGHTS = 5  # Cloud entries get a weight from 1 (rare) to 5 (most used)
+
+
+def tags_added(tag_ids, published_date):
+    """
+    Count one more post for each tag in `tag_ids`.
+    - Missing statistics rows are created first; the update itself is one statement.
+    """
+    if not tag_ids:
+        return
+    TagStat.objects.bulk_create([TagStat(tag_id=tag_id) for tag_id in tag_ids], ignore_conflicts=True)
+    TagStat.objects.filter(tag_id__in=tag_ids).update(
+        post_count=F('post_count') + 1,
+        latest_post_date=Case(
+            When(latest_post_date__isnull=True, then=Value(published_date)),
+            When(latest_post_date__lt=published_date, then=Value(published_date)),
+            default=F('latest_post_date'),
+        ),
+    )
+    invalidate_tag_cloud()
+
+
+def tags_counted(counts):
+    """
+    Bulk form of `tags_added` for writers that bypass signals (the importer).
+    - `counts` maps tag ids to (new posts, newest published_date); all rows are updated with
+      one executemany of a prepared statement (a CASE over hundreds of tags in the ORM costs
+      more to compile than to run).
+    """
+    if not counts:
+        return
+    TagStat.objects.bulk_create([TagStat(tag_id=tag_id) for tag_id in counts], ignore_conflicts=True)
+    connection = connections[router.db_for_write(TagStat)]
+    table = connection.ops.quote_name(TagStat._meta.db_table)
+    params = []
+    for tag_id, (posts, newest) in counts.items():
+        newest = connection.ops.adapt_datetimefield_value(newest)
+        params.append([posts, newest, newest, tag_id])
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"UPDATE {table} SET post_count = post_count + %s, latest_post_date = CASE "
+            f"WHEN latest_post_date IS NULL OR latest_post_date < %s THEN %s ELSE latest_post_date END "
+            f"WHERE tag_id = %s",
+            params,
+        )
+    invalidate_tag_cloud()
+
+
+def tags_removed(tag_ids):
+    """
+    Count one post less for each tag in `tag_ids` (called after the tagging rows are deleted).
+    - `latest_post_date` is recomputed from the posts still carrying the tag in the same UPDATE.
+    """
+    if not tag_ids:
+        return
+    latest = Post.objects.filter(tags=OuterRef('tag_id')).order_by('-published_date').values('published_date')[:1]
+    TagStat.objects.filter(tag_id__in=tag_ids).update(
+        post_count=Greatest(F('post_count') - 1, 0),
+        latest_post_date=Subquery(latest),
+    )
+    invalidate_tag_cloud()
+
+
+def rebuild_tag_stats():
+    """
+    Recompute every statistics row from the tagging table with a single grouped query.
+    - Returns the number of tags with at least one post.
+    """
+    rows = (
+        Post.objects.filter(tags__isnull=False)
+        .values('tags')
+        .annotate(post_count=Count('id'), latest_post_date=Max('published_date'))
+    )
+    stats = [
+        TagStat(tag_id=row['tags'], post_count=row['post_count'], latest_post_date=row['latest_post_date'])
+        for row in rows
+    ]
+    TagStat.objects.all().delete()
+    TagStat.objects.bulk_create(stats, batch_size=500)
+    invalidate_tag_cloud()
+    return len(stats)
+
+
+def invalidate_tag_cloud():
+    cache.delete(TAG_CLOUD_CACHE_KEY)
+
+
+def _tag_cloud_stats():
+    return (
+        TagStat.objects.filter(post_count__gt=0)
+        .select_related('tag')
+        .order_by('-post_count', 'tag__name')[:TAG_CLOUD_SIZE]
+    )
+
+
+def _cloud_entries(stats):
+    if not stats:
+        return []
+    top = math.log(stats[0].post_count + 1)
+    cloud = [
+        {
+            'name': stat.tag.name,
+            'post_count': stat.post_count,
+            'weight': 1 + round((TAG_CLOUD_WEIGHTS - 1) * math.log(stat.post_count + 1) / top),
+        }
+        for stat in stats
+    ]
+    return sorted(cloud, key=lambda entry: entry['name'].lower())  # Alphabetical, like most tag clouds
+
+
+def _build_tag_cloud():
+    with replicas.primary_reads():  # Cached for long; must not be refilled from a lagging replica
+        return _cloud_entries(list(_tag_cloud_stats()))
+
+
+def get_tag_cloud():
+    """
+    The most used tags as dicts with `name`, `post_count` and `weight` (1-5), sorted by name.
+    - Served from the cache; rebuilt from TagStat (one query) only after a tag change.
+    """
+    return cache.get_or_set(TAG_CLOUD_CACHE_KEY, _build_tag_cloud, TAG_CLOUD_TIMEOUT)
+
+
+async def aget_tag_cloud():
+    """ Async form of `get_tag_cloud` for the async views. """
+    cloud = await cache.aget(TAG_CLOUD_CACHE_KEY)
+    if cloud is None:
+        with replicas.primary_reads():
+            cloud = _cloud_entries([stat async for stat in _tag_cloud_stats()])
+        await cache.aset(TAG_CLOUD_CACHE_KEY, cloud, TAG_CLOUD_TIMEOUT)
+    return cloud
@@ -1,8 +1,25 @@
-from django.test import TestCase, Client  # Import TestCase for testing and Client for simulating requests
+import gzip  # Reading compressed exports
+import json  # Writing JSON Lines import files and reading exports
+import tempfile  # Scratch directories for generated files
+import threading  # Concurrent readers and writers of in-process indexes
+from io import StringIO  # Capture management command output
+from pathlib import Path  # Paths of generated files
+from datetime import datetime, timedelta  # Fixed dates and shifted event times
+from unittest import mock  # Patch view settings in tests
+from asgiref.sync import sync_to_async  # Calling the sync test client from async tests
+from django.test import TestCase, TransactionTestCase, Client, RequestFactory, override_settings  # Import TestCase for testing and Client for simulating requests
+from django.core.cache import cache  # Clear cached data between tests
+from django.http import HttpResponse  # Minimal views wrapped in tests
+from django.core.management import CommandError, call_command  # Run management commands from tests; their error type
+from django.db import connection, router  # Default database connection (for query inspection); the configured routers
+from django.test.utils import CaptureQueriesContext  # Record the SQL executed by a block
 from django.urls import reverse  # Import reverse for resolving URL patterns
+from django.utils import timezone  # Current time for counter and trending events
 from django.contrib.auth.models import User  # Import the built-in User model
-from .models import Post  # Import the Post model
+from .models import Post, Comment, RelatedPost, TagStat, MonthArchive, EXCERPT_LENGTH, make_excerpt, path_segment  # Import the Post model and excerpt helpers
 from taggit.models import Tag  # Import the Tag model from django-taggit
+from .views import AuthorPostListView, AsyncPostListView, AsyncPostDetailView, AsyncTagPostListView  # Views whose class attributes are patched or inspected in tests
+from . import archive, autocomplete, counters, export, fragments, pagecache, related, replicas, search, sitemaps, tags, threads, trending  # Month archive, autocomplete, sitemaps, counters, trending, post body cache, page cache, related posts, read replicas, search index, tag statistics and thread helpers
 
 class BlogTests(TestCase):
     """
@@ -17,6 +34,9 @@ class BlogTests(TestCase):
         - Create some test blog posts with tags.
         - Initialize Django's test client.
         """
+        # Cached pages and counters outlive the per-test database rollback
+        cache.clear()
+
         # Create a test user
         self.user = User.objects.create_user(username='testuser', password='password123')
 
@@ -144,4 +164,1457 @@ class BlogTests(TestCase):
         self.assertTrue(Post.objects.filter(title="New Post").exists())
 
 
+class SearchIndexTests(TestCase):
+    """
+    Test cases for the FTS5-backed search index:
+    - Ranking, index synchronisation on writes and the rebuild command.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='searcher', password='password123')
+        self.title_match = Post.objects.create(title="Django tips", content="Short notes.", author=self.user)
+        self.content_match = Post.objects.create(
+            title="Weekly notes", content="Some thoughts about django and more.", author=self.user
+        )
+
+    def test_title_matches_rank_first(self):
+        """ BM25 weighting ranks a title match above a content-only match. """
+        self.assertEqual(search.search('django'), [self.title_match.pk, self.content_match.pk])
+
+    def test_prefix_and_operator_characters(self):
+        """ Partial words match, and FTS5 syntax in user input is treated as plain text. """
+        self.assertEqual(search.search('djan'), [self.title_match.pk, self.content_match.pk])
+        self.assertEqual(search.search('"tips" (notes*'), [self.title_match.pk])
+
+    def test_index_follows_edits_tags_and_deletes(self):
+        """ Saving, tagging and deleting a post keeps the index in sync. """
+        self.content_match.title = "Renamed"
+        self.content_match.content = "Nothing to see"
+        self.content_match.save()
+        self.assertEqual(search.search('weekly'), [])
+
+        self.content_match.tags.add('weekly')
+        self.assertEqual(search.search('weekly'), [self.content_match.pk])
+
+        self.content_match.delete()
+        self.assertEqual(search.search('weekly'), [])
+
+    def test_index_follows_tag_renames_and_deletes(self):
+        """ The index stores tag names, so renaming or deleting a tag re-indexes its posts. """
+        self.content_match.tags.add('oldname')
+        self.assertEqual(search.faceted_search('oldname')[0], [self.content_match.pk])  # Cached
+        tag = Tag.objects.get(name='oldname')
+        tag.name = 'newname'
+        with self.captureOnCommitCallbacks(execute=True):  # Cached results are retired on commit
+            tag.save()
+        self.assertEqual(search.search('newname'), [self.content_match.pk])
+        self.assertEqual(search.faceted_search('oldname')[0], [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tag.delete()
+        self.assertEqual(search.search('newname'), [])
+
+    def test_rebuild_command(self):
+        """ The rebuild command recreates the index from the Post table. """
+        search.remove_post(self.title_match.pk)
+        self.assertEqual(search.search('tips'), [])
+        call_command('rebuild_search_index', batch_size=1, stdout=StringIO())
+        self.assertEqual(search.search('tips'), [self.title_match.pk])
+
+
+class KeysetPaginationTests(TestCase):
+    """
+    Test cases for cursor pagination of the post lists.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='pager', password='password123')
+        self.posts = [
+            Post.objects.create(title=f"Paged post {i:02d}", content="Body", author=self.user)
+            for i in range(25)
+        ]
+        # Give every post the same timestamp so ordering falls back to the id tie-breaker
+        Post.objects.update(published_date=self.posts[0].published_date)
+
+    def test_pages_cover_every_post_once(self):
+        """ Following next cursors visits every post exactly once, newest (highest id) first. """
+        first = self.client.get(reverse('post-list'))
+        self.assertEqual(first.status_code, 200)
+        page = first.context['page']
+        self.assertEqual(len(page), 20)
+        self.assertTrue(page.has_next)
+
+        second = self.client.get(reverse('post-list'), {'cursor': page.next_cursor})
+        self.assertFalse(second.context['page'].has_next)
+
+        seen = [post.pk for post in first.context['posts']] + [post.pk for post in second.context['posts']]
+        self.assertEqual(seen, sorted((post.pk for post in self.posts), reverse=True))
+
+    def test_tag_list_is_paginated(self):
+        """ The tag page uses the same cursor pagination. """
+        for post in self.posts:
+            post.tags.add('paged')
+        response = self.client.get(reverse('tagged-posts', args=['paged']))
+        self.assertEqual(len(response.context['posts']), 20)
+        self.assertContains(response, 'Older posts')
+
+    def test_invalid_cursor_returns_404(self):
+        """ A tampered cursor is rejected instead of raising a server error. """
+        response = self.client.get(reverse('post-list'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+
+class ExcerptTests(TestCase):
+    """
+    Test cases for the stored post excerpt and deferred content on lists.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='writer', password='password123')
+        self.post = Post.objects.create(title="Long read", content="word " * 200, author=self.user)
+
+    def test_excerpt_maintained_on_save(self):
+        """ The excerpt is cut on a word boundary and follows content edits. """
+        self.assertLessEqual(len(self.post.excerpt), EXCERPT_LENGTH)
+        self.assertTrue(self.post.excerpt.endswith('…'))
+        self.post.content = "Short   and\nsweet"
+        self.post.save(update_fields=['content'])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.excerpt, "Short and sweet")
+
+    def test_list_does_not_load_content(self):
+        """ The post list selects the excerpt but never the content column. """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('post-list'))
+        self.assertContains(response, self.post.excerpt)
+        post_queries = [q['sql'] for q in queries if 'FROM "blog_post"' in q['sql']]
+        self.assertTrue(post_queries)
+        for sql in post_queries:
+            self.assertNotIn('"blog_post"."content"', sql)
+
+    def test_backfill_command(self):
+        """ backfill_excerpts fills excerpts that are missing. """
+        Post.objects.update(excerpt='')
+        call_command('backfill_excerpts', batch_size=1, stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.excerpt, make_excerpt(self.post.content))
+
+
+class CommentCounterTests(TestCase):
+    """
+    Test cases for the denormalized comment_count / last_comment_at columns.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='commenter', password='password123')
+        self.post = Post.objects.create(title="Discussed", content="Body", author=self.user)
+        self.client.login(username='commenter', password='password123')
+
+    def add_comment(self, text):
+        self.client.post(reverse('comment-create', kwargs={'post_id': self.post.pk}), {'content': text})
+        return Comment.objects.latest('id')
+
+    def test_counters_follow_create_and_delete(self):
+        """ Creating and deleting comments through the views keeps the counters exact. """
+        first = self.add_comment("First!")
+        second = self.add_comment("Second!")
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 2)
+        self.assertEqual(self.post.last_comment_at, second.created_at)
+
+        self.client.post(reverse('comment-delete', args=[second.pk]))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 1)
+        self.assertEqual(self.post.last_comment_at, first.created_at)
+
+    def test_reconcile_command_fixes_drift(self):
+        """ reconcile_comment_counts repairs counters that drifted from the Comment table. """
+        comment = Comment.objects.create(post=self.post, author=self.user, content="Created outside the views")
+        Post.objects.filter(pk=self.post.pk).update(comment_count=7)
+        call_command('reconcile_comment_counts', batch_size=1, stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 1)
+        self.assertEqual(self.post.last_comment_at, comment.created_at)
+
+
+class CommentPaginationTests(TestCase):
+    """
+    Test cases for the first page of comments on post_detail and the JSON comments endpoint.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='reader', password='password123')
+        self.post = Post.objects.create(title="Popular", content="Body", author=self.user)
+        for i in range(60):
+            Comment.objects.create(post=self.post, author=self.user, content=f"Comment {i}")
+
+    def test_detail_renders_first_page_only(self):
+        """ The detail page renders 50 comments and links to the next page. """
+        response = self.client.get(reverse('post-detail', args=[self.post.pk]))
+        self.assertEqual(len(response.context['comments']), 50)
+        self.assertContains(response, 'load-more-comments')
+
+    def test_json_endpoint_pages(self):
+        """ The JSON endpoint continues from the cursor rendered on the detail page. """
+        detail = self.client.get(reverse('post-detail', args=[self.post.pk]))
+        cursor = detail.context['comments'].next_cursor
+        response = self.client.get(reverse('post-comments', args=[self.post.pk]), {'cursor': cursor})
+        data = response.json()
+        self.assertEqual(len(data['comments']), 10)
+        self.assertIsNone(data['next_cursor'])
+        self.assertNotIn('edit_url', data['comments'][0])  # Anonymous users get no edit links
+
+    def test_json_endpoint_rejects_bad_cursor(self):
+        response = self.client.get(reverse('post-comments', args=[self.post.pk]), {'cursor': '!!'})
+        self.assertEqual(response.status_code, 400)
+
+
+class ThreadedCommentTests(TestCase):
+    """
+    Test cases for reply threading with materialized paths.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='threader', password='password123')
+        self.post = Post.objects.create(title="Threads", content="Body", author=self.user)
+        self.root = Comment.objects.create(post=self.post, author=self.user, content="Root")
+        self.reply = Comment.objects.create(post=self.post, author=self.user, parent=self.root, content="Reply")
+        self.nested = Comment.objects.create(post=self.post, author=self.user, parent=self.reply, content="Nested")
+        self.other = Comment.objects.create(post=self.post, author=self.user, content="Other root")
+
+    def test_paths_and_depths(self):
+        self.assertEqual(self.nested.path, path_segment(self.root.pk) + path_segment(self.reply.pk) + path_segment(self.nested.pk))
+        self.assertEqual([self.root.depth, self.reply.depth, self.nested.depth], [0, 1, 2])
+
+    def test_threads_load_in_one_query(self):
+        """ All replies below a page of roots are fetched and assembled with a single query. """
+        with self.assertNumQueries(1):
+            roots = threads.load_threads(self.post.pk, [self.root, self.other])
+        self.assertEqual([root.pk for root in roots], [self.root.pk, self.other.pk])
+        self.assertEqual(roots[0].children[0].children[0].content, "Nested")
+        self.assertEqual(roots[1].children, [])
+
+    def test_depth_limit_marks_cut_threads(self):
+        root, other = threads.load_threads(self.post.pk, [self.root, self.other], max_depth=1)
+        self.assertEqual(root.children, [self.reply])
+        self.assertEqual(root.children[0].children, [])
+        self.assertTrue(root.children[0].more_replies)
+        self.assertFalse(root.more_replies or other.more_replies)
+
+    def test_reply_limit_marks_cut_threads(self):
+        """ Replies past the limit are left out; the comments missing some are marked. """
+        Comment.objects.create(post=self.post, author=self.user, parent=self.other, content="Other reply")
+        third = Comment.objects.create(post=self.post, author=self.user, content="Quiet root")
+        root, other, quiet = threads.load_threads(self.post.pk, [self.root, self.other, third], limit=1)
+        self.assertEqual(root.children, [self.reply])
+        self.assertEqual([root.more_replies, root.children[0].more_replies], [True, True])
+        self.assertEqual([other.children, other.more_replies], [[], True])
+        self.assertEqual([quiet.children, quiet.more_replies], [[], False])
+
+    def test_cut_threads_load_on_demand(self):
+        with mock.patch('blog.views.THREAD_DEPTH', 1):
+            detail = self.client.get(reverse('post-detail', args=[self.post.pk]))
+            data = self.client.get(reverse('post-comments', args=[self.post.pk])).json()
+            self.assertContains(detail, 'load-more-replies')
+            self.assertNotContains(detail, "Nested")
+            reply = data['comments'][0]['replies'][0]
+            self.assertEqual(reply['replies'], [])
+            thread = self.client.get(reply['more_replies_url']).json()['comment']
+        self.assertEqual(thread['id'], self.reply.pk)
+        self.assertEqual(thread['replies'][0]['content'], "Nested")
+        self.assertNotIn('more_replies_url', thread)
+
+    def test_bounded_subtree(self):
+        self.assertEqual(list(threads.subtree(self.root, max_depth=1)), [self.root, self.reply])
+
+    def test_reply_view_and_cascading_delete(self):
+        """ Replies are created through the views, and deleting a parent removes and uncounts its subtree. """
+        self.client.login(username='threader', password='password123')
+        url = reverse('comment-reply', kwargs={'post_id': self.post.pk, 'parent_id': self.nested.pk})
+        self.client.post(url, {'content': "Deepest"})
+        deepest = Comment.objects.latest('id')
+        self.assertEqual(deepest.parent, self.nested)
+        self.assertEqual(deepest.depth, 3)
+
+        Post.objects.filter(pk=self.post.pk).update(comment_count=5)
+        self.client.post(reverse('comment-delete', args=[self.reply.pk]))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 2)
+        self.assertEqual(set(Comment.objects.values_list('content', flat=True)), {"Root", "Other root"})
+
+    def test_detail_and_json_render_threads(self):
+        response = self.client.get(reverse('post-detail', args=[self.post.pk]))
+        self.assertContains(response, "Nested")
+        data = self.client.get(reverse('post-comments', args=[self.post.pk])).json()
+        self.assertEqual(data['comments'][0]['replies'][0]['replies'][0]['content'], "Nested")
+
+
+class TagStatTests(TestCase):
+    """
+    Test cases for the incrementally maintained tag statistics and the cached tag cloud.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='tagger', password='password123')
+        self.old = Post.objects.create(title="Old", content="Body", author=self.user)
+        self.new = Post.objects.create(title="New", content="Body", author=self.user)
+        self.old.tags.add('python', 'django')
+        self.new.tags.add('python')
+
+    def stat(self, name):
+        return TagStat.objects.get(tag__name=name)
+
+    def test_counts_follow_add_remove_and_delete(self):
+        self.assertEqual(self.stat('python').post_count, 2)
+        self.assertEqual(self.stat('python').latest_post_date, self.new.published_date)
+
+        self.new.tags.remove('python')
+        self.assertEqual(self.stat('python').post_count, 1)
+        self.assertEqual(self.stat('python').latest_post_date, self.old.published_date)
+
+        self.old.delete()
+        self.assertEqual(self.stat('python').post_count, 0)
+        self.assertIsNone(self.stat('django').latest_post_date)
+
+    def test_tag_cloud_is_cached_and_invalidated(self):
+        self.assertEqual([entry['name'] for entry in tags.get_tag_cloud()], ['django', 'python'])
+        with self.assertNumQueries(0):
+            tags.get_tag_cloud()
+        self.new.tags.add('rust')
+        self.assertIn('rust', [entry['name'] for entry in tags.get_tag_cloud()])
+
+    def test_tag_cloud_follows_renames_and_deletes(self):
+        """ The cached cloud and the anonymous pages showing it must not link to the old name. """
+        self.assertContains(self.client.get(reverse('post-list')), reverse('tagged-posts', args=['django']))
+        tag = Tag.objects.get(name='django')
+        tag.name = 'web'
+        with self.captureOnCommitCallbacks(execute=True):
+            tag.save()
+        self.assertEqual([entry['name'] for entry in tags.get_tag_cloud()], ['python', 'web'])
+        response = self.client.get(reverse('post-list'))
+        self.assertContains(response, reverse('tagged-posts', args=['web']))
+        self.assertNotContains(response, reverse('tagged-posts', args=['django']))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tag.delete()
+        self.assertEqual([entry['name'] for entry in tags.get_tag_cloud()], ['python'])
+        self.assertNotContains(self.client.get(reverse('post-list')), reverse('tagged-posts', args=['web']))
+
+    def test_rebuild_command(self):
+        TagStat.objects.all().delete()
+        call_command('rebuild_tag_stats', stdout=StringIO())
+        self.assertEqual(self.stat('python').post_count, 2)
+        self.assertEqual(self.stat('django').post_count, 1)
+
+    def test_tag_page_shows_stats(self):
+        response = self.client.get(reverse('tagged-posts', args=['python']))
+        self.assertContains(response, '2 posts')
+
+    def test_tag_names_with_slashes(self):
+        """ A tag like "ci/cd" must not break the tag cloud on every page. """
+        self.new.tags.add('ci/cd')
+        url = reverse('tagged-posts', args=['ci/cd'])
+        self.assertEqual(url, '/tag/ci/cd/')
+        self.assertContains(self.client.get(reverse('post-list')), f'href="{url}"')
+        response = self.client.get(url)
+        self.assertContains(response, 'New')
+        self.assertNotContains(response, 'Old')
+        self.assertEqual(self.client.get(reverse('tag-feed-atom', args=['ci/cd'])).status_code, 200)
+
+
+class RelatedPostTests(TestCase):
+    """
+    Test cases for the precomputed related-posts table.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='relater', password='password123')
+        self.posts = {}
+        for title, tag_names in [
+            ('base', ['a', 'b', 'c']),
+            ('twin', ['a', 'b', 'c']),
+            ('close', ['a', 'b']),
+            ('far', ['c', 'x', 'y', 'z']),
+            ('none', ['q']),
+        ]:
+            post = Post.objects.create(title=title, content="Body", author=self.user)
+            post.tags.add(*tag_names)
+            self.posts[title] = post
+
+    def neighbours(self, title):
+        return [entry.related.title for entry in RelatedPost.objects.filter(post=self.posts[title])]
+
+    def test_matrix_matches_jaccard(self):
+        """ The bitset engine ranks by Jaccard similarity and skips unrelated posts. """
+        matrix = related.TagMatrix.load()
+        result = matrix.top_k(self.posts['base'].pk, k=5)
+        self.assertEqual([post_id for post_id, _ in result],
+                         [self.posts['twin'].pk, self.posts['close'].pk, self.posts['far'].pk])
+        self.assertAlmostEqual(result[1][1], 2 / 3)
+        self.assertAlmostEqual(result[2][1], 1 / 6)
+
+    def test_incremental_refresh(self):
+        """ Only posts whose tags changed (and the lists they touch) are refreshed. """
+        call_command('build_related_posts', stdout=StringIO())
+        self.assertEqual(self.neighbours('base'), ['twin', 'close', 'far'])
+        self.assertFalse(Post.objects.filter(related_dirty=True).exists())
+
+        self.posts['none'].tags.add('a', 'b', 'c')
+        self.assertEqual(related.refresh_related_posts(), 5)  # 'none' plus its four new neighbours
+        self.assertIn('none', self.neighbours('base'))
+
+    def test_post_retagged_during_a_refresh_stays_flagged(self):
+        """ A list computed from tags loaded before a change must be computed again. """
+        related.refresh_related_posts(full=True)
+        self.posts['base'].tags.add('d')
+        load = related.TagMatrix.load
+
+        def load_then_retag():
+            matrix = load()
+            self.posts['base'].tags.add('e')  # Lands after the tags were read
+            return matrix
+
+        with mock.patch.object(related.TagMatrix, 'load', side_effect=load_then_retag):
+            related.refresh_related_posts()
+        self.assertTrue(Post.objects.get(pk=self.posts['base'].pk).related_dirty)
+
+    def test_detail_page_shows_related_posts(self):
+        related.refresh_related_posts(full=True)
+        response = self.client.get(reverse('post-detail', args=[self.posts['base'].pk]))
+        self.assertContains(response, 'Related posts')
+        self.assertContains(response, reverse('post-detail', args=[self.posts['twin'].pk]))
+
+    def test_renamed_related_post_is_shown_to_logged_in_users(self):
+        """ The shared body (cached for logged-in users) embeds the related posts' titles. """
+        related.refresh_related_posts(full=True)
+        self.client.login(username='relater', password='password123')
+        url = reverse('post-detail', args=[self.posts['base'].pk])
+        self.assertContains(self.client.get(url), 'twin')
+        self.posts['twin'].title = 'renamed twin'
+        self.posts['twin'].save()
+        self.assertContains(self.client.get(url), 'renamed twin')
+
+
+class ConditionalGetTests(TestCase):
+    """
+    Test cases for ETag / Last-Modified revalidation of the blog pages.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='revalidator', password='password123')
+        self.post = Post.objects.create(title="Cached", content="Body", author=self.user)
+        self.post.tags.add('http')
+        self.urls = [
+            reverse('post-list'),
+            reverse('post-detail', args=[self.post.pk]),
+            reverse('tagged-posts', args=['http']),
+        ]
+
+    def test_if_none_match_returns_304(self):
+        for url in self.urls:
+            first = self.client.get(url)
+            self.assertEqual(first.status_code, 200)
+            second = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+            self.assertEqual(second.status_code, 304, url)
+            self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_if_modified_since_returns_304(self):
+        first = self.client.get(self.urls[1])
+        second = self.client.get(self.urls[1], HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(second.status_code, 304)
+
+    def test_comment_changes_the_validator(self):
+        """ Adding a comment bumps the post's updated_at, so stale copies are re-rendered. """
+        etags = {url: self.client.get(url)['ETag'] for url in self.urls}
+        with self.captureOnCommitCallbacks(execute=True):  # Cached pages are purged on commit
+            Comment.objects.create(post=self.post, author=self.user, content="New comment")
+        for url in self.urls[:2]:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            self.assertEqual(response.status_code, 200, url)
+        # Tag pages show no comments, so their cached copy (and its ETag) stays valid
+        self.assertEqual(self.client.get(self.urls[2], HTTP_IF_NONE_MATCH=etags[self.urls[2]]).status_code, 304)
+
+    def test_list_validator_follows_deletes_without_counting_posts(self):
+        """ Deleting an older post leaves Max(updated_at) as it was; the archive total changes. """
+        Post.objects.filter(pk=self.post.pk).update(updated_at=timezone.now() - timedelta(days=1))
+        Post.objects.create(title="Newer", content="Body", author=self.user)
+        with CaptureQueriesContext(connection) as queries:
+            first = self.client.get(self.urls[0])
+        self.assertFalse(any('COUNT(' in query['sql'] for query in queries.captured_queries))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.delete()
+        self.assertEqual(self.client.get(self.urls[0], HTTP_IF_NONE_MATCH=first['ETag']).status_code, 200)
+
+    def test_related_post_rename_changes_the_detail_validator(self):
+        """ The detail page shows its related posts' titles. """
+        other = Post.objects.create(title="Neighbour", content="Body", author=self.user)
+        RelatedPost.objects.create(post=self.post, related=other, score=1.0, rank=0)
+        first = self.client.get(self.urls[1])
+        other.title = "Renamed neighbour"
+        with self.captureOnCommitCallbacks(execute=True):
+            other.save()
+        response = self.client.get(self.urls[1], HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Renamed neighbour")
+
+    def test_tag_validator_ignores_posts_outside_the_tag(self):
+        other = Post.objects.create(title="Untagged", content="Body", author=self.user)
+        first = self.client.get(self.urls[2])
+        Comment.objects.create(post=other, author=self.user, content="Elsewhere")
+        other.title = "Still untagged"
+        other.save()
+        self.assertEqual(self.client.get(self.urls[2], HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+    def test_tag_validator_follows_the_tag_cloud(self):
+        first = self.client.get(self.urls[2])
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(title="Styled", content="Body", author=self.user).tags.add('css')
+        response = self.client.get(self.urls[2], HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'css')
+
+    def test_tag_page_resolves_the_tag_once(self):
+        self.client.login(username='revalidator', password='password123')  # Past the anonymous page cache
+        self.client.get(self.urls[2])  # Fill the tag cloud cache
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.urls[2])
+        self.assertEqual(sum('"taggit_tag"' in query['sql'] for query in queries.captured_queries), 1)
+
+    def test_etag_varies_by_user(self):
+        anonymous = self.client.get(self.urls[0])
+        self.client.login(username='revalidator', password='password123')
+        logged_in = self.client.get(self.urls[0], HTTP_IF_NONE_MATCH=anonymous['ETag'])
+        self.assertEqual(logged_in.status_code, 200)
+        self.assertIn('Cookie', logged_in['Vary'])
+
+    def test_missing_post_still_404s(self):
+        self.assertEqual(self.client.get(reverse('post-detail', args=[999])).status_code, 404)
+
+
+class PageCacheTests(TestCase):
+    """
+    Test cases for the anonymous full-page cache and its surrogate-key purges.
+    """
+
+    def setUp(self):
+        cache.clear()
+        counters.flush_views()  # Start with an empty view buffer and a fresh flush interval
+        self.user = User.objects.create_user(username='cacher', password='password123')
+        self.post = Post.objects.create(title="Cached page", content="Body", author=self.user)
+        self.post.tags.add('caching')
+        self.detail_url = reverse('post-detail', args=[self.post.pk])
+        self.tag_url = reverse('tagged-posts', args=['caching'])
+
+    def test_second_anonymous_request_is_a_hit(self):
+        first = self.client.get(self.detail_url)
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertIn(pagecache.post_key(self.post.pk), first['Surrogate-Key'].split())
+        with self.assertNumQueries(0):
+            second = self.client.get(self.detail_url)
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.content, first.content)
+
+    def test_hit_still_honours_if_none_match(self):
+        first = self.client.get(self.detail_url)
+        second = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 304)
+
+    def test_logged_in_users_bypass_the_cache(self):
+        self.client.get(self.detail_url)  # Warm the anonymous copy
+        self.client.login(username='cacher', password='password123')
+        response = self.client.get(self.detail_url)
+        self.assertNotIn('X-Cache', response)
+
+    def test_editing_a_post_purges_its_pages(self):
+        self.client.get(self.detail_url)
+        self.client.get(self.tag_url)
+        self.post.title = "Renamed page"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.save()
+        detail = self.client.get(self.detail_url)
+        self.assertEqual(detail['X-Cache'], 'MISS')
+        self.assertContains(detail, "Renamed page")
+        self.assertContains(self.client.get(self.tag_url), "Renamed page")
+
+    def test_comment_purges_the_post_only(self):
+        other = Post.objects.create(title="Untouched", content="Body", author=self.user)
+        other_url = reverse('post-detail', args=[other.pk])
+        self.client.get(self.detail_url)
+        self.client.get(other_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(post=self.post, author=self.user, content="Fresh comment")
+        self.assertContains(self.client.get(self.detail_url), "Fresh comment")
+        self.assertEqual(self.client.get(other_url)['X-Cache'], 'HIT')
+
+    def test_purge_waits_for_the_commit(self):
+        """ A page cached while the comment's transaction is open must not survive the commit. """
+        self.client.login(username='cacher', password='password123')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('comment-create', args=[self.post.pk]), {'content': "Committed comment"})
+            self.client.logout()
+            self.client.get(self.detail_url)  # Cached before the purge runs
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertContains(response, "Committed comment")
+
+    def test_tag_change_purges_the_tag_page(self):
+        self.client.get(self.tag_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.tags.remove('caching')
+        self.assertNotContains(self.client.get(self.tag_url), "Cached page")
+
+
+class PostBodyFragmentTests(TestCase):
+    """
+    Test cases for the shared post body cache and its per-user links.
+    """
+
+    def setUp(self):
+        cache.clear()
+        counters.flush_views()  # Start with an empty view buffer and a fresh flush interval
+        self.author = User.objects.create_user(username='writer', password='password123')
+        self.reader = User.objects.create_user(username='reader', password='password123')
+        self.post = Post.objects.create(title="Shared body", content="Body", author=self.author)
+        self.comment = Comment.objects.create(post=self.post, author=self.author, content="Author note")
+        self.url = reverse('post-detail', args=[self.post.pk])
+        self.edit_url = reverse('comment-update', args=[self.comment.pk])
+
+    def test_body_is_rendered_once_for_all_users(self):
+        self.client.login(username='writer', password='password123')
+        with CaptureQueriesContext(connection) as first:
+            self.client.get(self.url)
+        self.client.login(username='reader', password='password123')
+        with CaptureQueriesContext(connection) as second:
+            response = self.client.get(self.url)
+        self.assertContains(response, "Author note")
+        self.assertLess(len(second), len(first))
+        self.assertFalse(any('blog_comment' in query['sql'] for query in second.captured_queries))
+
+    def test_links_are_filled_in_per_user(self):
+        self.client.login(username='writer', password='password123')
+        self.assertContains(self.client.get(self.url), self.edit_url)
+        self.client.login(username='reader', password='password123')
+        response = self.client.get(self.url)
+        self.assertNotContains(response, self.edit_url)
+        self.assertContains(response, "Reply")
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertNotContains(response, "Reply</a>")
+        self.assertNotContains(response, "comment-actions")
+
+    def test_new_comment_switches_to_a_new_body(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(post=self.post, author=self.reader, content="Reader reply")
+        self.assertContains(self.client.get(self.url), "Reader reply")
+
+    def test_placeholders_cannot_be_injected_through_content(self):
+        Comment.objects.create(post=self.post, author=self.reader, content="<!--comment-actions 1 1 1-->")
+        self.client.login(username='writer', password='password123')
+        response = self.client.get(self.url)
+        self.assertContains(response, self.edit_url, count=1)
+        self.assertEqual(fragments.punch_holes('<!--comment-actions 1 2 3-->', None), '')
+
+
+class SearchResultCacheTests(TestCase):
+    """
+    Test cases for the cached search results and their generation counter.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='seeker', password='password123')
+        self.post = Post.objects.create(title="Django caching guide", content="Body", author=self.user)
+        self.url = reverse('search-posts')
+
+    def test_queries_are_normalized(self):
+        self.assertEqual(search.normalize_query("  Guide   DJANGO guide "), "django guide")
+        self.assertEqual(search.normalize_query("?!"), "")
+
+    def test_equivalent_queries_share_one_result_list(self):
+        self.assertEqual(search.cached_search("django guide"), [self.post.pk])
+        with self.assertNumQueries(0):
+            self.assertEqual(search.cached_search("GUIDE  django"), [self.post.pk])
+
+    def test_post_and_tag_writes_start_a_new_generation(self):
+        self.assertEqual(search.cached_search("tutorial"), [])
+        generation = search.search_generation()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.tags.add('tutorial')
+        self.assertNotEqual(search.search_generation(), generation)
+        self.assertEqual(search.cached_search("tutorial"), [self.post.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            other = Post.objects.create(title="Another tutorial", content="Body", author=self.user)
+        self.assertEqual(set(search.cached_search("tutorial")), {self.post.pk, other.pk})
+
+    def test_generation_moves_only_when_the_write_commits(self):
+        """ A search between the index write and the commit must not cache under the new generation. """
+        generation = search.search_generation()
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(title="Uncommitted tutorial", content="Body", author=self.user)
+            self.assertEqual(search.search_generation(), generation)  # Still inside the transaction
+        self.assertNotEqual(search.search_generation(), generation)
+
+    def test_pages_load_only_their_posts(self):
+        for number in range(25):
+            Post.objects.create(title=f"Paged result {number}", content="Body", author=self.user)
+        first = self.client.get(self.url, {'q': 'paged'})
+        self.assertEqual(len(first.context['posts']), 20)
+        self.assertContains(first, "Page 1 of 2")
+        second = self.client.get(self.url, {'q': 'paged', 'page': 2})
+        self.assertEqual(len(second.context['posts']), 5)
+        self.assertFalse({post.pk for post in first.context['posts']} & {post.pk for post in second.context['posts']})
+
+
+class AutocompleteTests(TestCase):
+    """
+    Test cases for the prefix index and the search-as-you-type endpoint.
+    """
+
+    def setUp(self):
+        cache.clear()
+        autocomplete.reset_index()
+        self.user = User.objects.create_user(username='typist', password='password123')
+        self.post = Post.objects.create(title="Django Signals Explained", content="Body", author=self.user)
+        self.post.tags.add('django')
+        self.url = reverse('search-autocomplete')
+
+    def tearDown(self):
+        autocomplete.reset_index()
+
+    def test_prefix_index_orders_replaces_and_evicts(self):
+        index = autocomplete.PrefixIndex(max_entries=3)
+        index.load([(1, "Beta"), (2, "alpha two"), (3, "Alpha one")])
+        self.assertEqual(index.search("AL"), [(3, "Alpha one"), (2, "alpha two")])
+        index.add(2, "Gamma")
+        self.assertEqual(index.search("al"), [(3, "Alpha one")])
+        index.add(4, "Alpine")  # Evicts the oldest entry (1)
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index.search("b"), [])
+        self.assertEqual(index.search("al", limit=1), [(3, "Alpha one")])
+
+    def test_endpoint_suggests_titles_and_tags(self):
+        data = self.client.get(self.url, {'q': 'dja'}).json()  # First lookup builds the index
+        self.assertEqual([post['title'] for post in data['posts']], ["Django Signals Explained"])
+        self.assertEqual(data['posts'][0]['url'], reverse('post-detail', args=[self.post.pk]))
+        self.assertEqual([tag['name'] for tag in data['tags']], ['django'])
+        with self.assertNumQueries(0):
+            self.client.get(self.url, {'q': 'djan'})
+
+    def test_writes_update_the_loaded_index(self):
+        self.client.get(self.url, {'q': 'x'})  # Build the index
+        self.post.title = "Renamed signals"
+        self.post.save()
+        Post.objects.create(title="Django forms", content="Body", author=self.user)
+        data = self.client.get(self.url, {'q': 'django'}).json()
+        self.assertEqual([post['title'] for post in data['posts']], ["Django forms"])
+        self.post.delete()
+        self.assertEqual(self.client.get(self.url, {'q': 'renamed'}).json()['posts'], [])
+
+    def test_refresh_picks_up_writes_from_other_processes(self):
+        index = autocomplete.get_index()
+        index.reload()
+        Post.objects.filter(pk=self.post.pk).update(title="Edited elsewhere", updated_at=self.post.updated_at.replace(year=2100))
+        index.refresh()
+        self.assertEqual(index.titles.search("edited"), [(self.post.pk, "Edited elsewhere")])
+
+    def test_bad_limit_is_rejected(self):
+        self.assertEqual(self.client.get(self.url, {'q': 'd', 'limit': 'many'}).status_code, 400)
+
+    def test_tag_with_slash_is_suggested(self):
+        self.post.tags.add('ci/cd')
+        data = self.client.get(self.url, {'q': 'ci'}).json()
+        self.assertEqual(data['tags'], [{'name': 'ci/cd', 'url': reverse('tagged-posts', args=['ci/cd'])}])
+
+    def test_lookups_during_reloads_and_writes(self):
+        """ Lookups never see half-written state while another thread loads or writes. """
+        index = autocomplete.PrefixIndex()
+        pairs = [(number, f"Title {number}") for number in range(2000)]
+        index.load(pairs)
+        errors = []
+        stop = threading.Event()
+
+        def writer():
+            while not stop.is_set():
+                index.load(pairs)
+                index.add(7, "Title 7 renamed")
+                index.remove(8)
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            for _ in range(2000):
+                try:
+                    results = index.search("title 1", limit=20)
+                except Exception as error:  # pragma: no cover - the failure being guarded against
+                    errors.append(error)
+                    break
+                self.assertTrue(all(text.casefold().startswith("title 1") for _, text in results))
+        finally:
+            stop.set()
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_only_one_thread_reloads_a_stale_index(self):
+        index = autocomplete.get_index()
+        index.reload()
+        index.loaded_at -= autocomplete.FULL_RELOAD_INTERVAL + 1
+        with index.lock:  # Another thread is reloading: keep answering from the loaded index
+            with self.assertNumQueries(0):
+                index.ensure_fresh()
+        with self.assertNumQueries(4):
+            index.ensure_fresh()
+        with self.assertNumQueries(0):  # Fresh again: no second reload
+            index.ensure_fresh()
+
+
+class FacetedSearchTests(TestCase):
+    """
+    Test cases for tag and author facets on the search page.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username='alice', password='password123')
+        self.bob = User.objects.create_user(username='bob', password='password123')
+        first = Post.objects.create(title="Cache basics", content="Body", author=self.alice)
+        first.tags.add('python', 'web')
+        second = Post.objects.create(title="Cache internals", content="Body", author=self.alice)
+        second.tags.add('python')
+        third = Post.objects.create(title="Cache at scale", content="Body", author=self.bob)
+        third.tags.add('web')
+        self.posts = (first, second, third)
+        self.url = reverse('search-posts')
+
+    def test_counts_cover_all_matches(self):
+        post_ids, counts = search.faceted_search("cache")
+        self.assertEqual(len(post_ids), 3)
+        self.assertEqual(counts['tags'], [('python', 2), ('web', 2)])
+        self.assertEqual(counts['authors'], [('alice', 2), ('bob', 1)])
+
+    def test_selecting_facets_narrows_without_rerunning_the_match(self):
+        search.faceted_search("cache")  # Warm the cached ids and memberships
+        with self.assertNumQueries(0):
+            post_ids, counts = search.faceted_search("CACHE", tags=['web'], author='alice')
+        self.assertEqual(post_ids, [self.posts[0].pk])
+        self.assertEqual(counts['authors'], [('alice', 1)])
+
+    def test_page_links_toggle_facets(self):
+        response = self.client.get(self.url, {'q': 'cache', 'tag': 'python'})
+        self.assertEqual(len(response.context['posts']), 2)
+        entries = {entry['value']: entry for entry in response.context['facets']['tags']}
+        self.assertTrue(entries['python']['selected'])
+        self.assertEqual(entries['python']['query'], 'q=cache')  # Clicking a selected tag removes it
+        self.assertIn('tag=python&tag=web', entries['web']['query'])
+
+
+class ViewCounterTests(TestCase):
+    """
+    Test cases for the buffered (write-behind) post view counters.
+    """
+
+    def setUp(self):
+        cache.clear()
+        counters.flush_views()
+        self.user = User.objects.create_user(username='viewer', password='password123')
+        self.post = Post.objects.create(title="Popular", content="Body", author=self.user)
+        self.other = Post.objects.create(title="Less popular", content="Body", author=self.user)
+        self.url = reverse('post-detail', args=[self.post.pk])
+
+    def test_views_are_buffered_until_flushed(self):
+        self.client.get(self.url)
+        self.client.get(self.url)  # Served by the page cache, still counted
+        self.client.get(reverse('post-detail', args=[self.other.pk]))
+        self.assertEqual(counters.pending_views(), {self.post.pk: 2, self.other.pk: 1})
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.view_count, 0)
+
+        with self.assertNumQueries(1):  # One UPDATE ... CASE for every buffered post
+            self.assertEqual(counters.flush_views(), 2)
+        self.post.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual((self.post.view_count, self.other.view_count), (2, 1))
+        self.assertEqual(counters.pending_views(), {})
+
+    def test_flush_does_not_touch_updated_at(self):
+        updated_at = self.post.updated_at
+        counters.record_view(self.post.pk)
+        counters.flush_views()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.updated_at, updated_at)
+
+    def test_missing_posts_are_not_counted(self):
+        self.client.get(reverse('post-detail', args=[999]))
+        self.assertEqual(counters.pending_views(), {})
+
+
+
+class ViewCounterBenchmarkTests(TransactionTestCase):
+    """
+    Test cases for the view counter benchmark, whose worker threads need committed rows.
+    """
+
+    def setUp(self):
+        cache.clear()
+        counters.flush_views()
+        self.user = User.objects.create_user(username='benchviewer', password='password123')
+        Post.objects.create(title="Real post", content="Body", author=self.user)
+
+    def test_benchmark_leaves_derived_data_alone(self):
+        archive_before = list(MonthArchive.objects.values_list('year', 'month', 'post_count'))
+        out, err = StringIO(), StringIO()
+        call_command('benchmark_view_counters', views=20, posts=3, threads=2, stdout=out, stderr=err)
+        self.assertIn('Speed-up', out.getvalue())
+        self.assertEqual(err.getvalue(), '')
+        self.assertEqual(list(MonthArchive.objects.values_list('year', 'month', 'post_count')), archive_before)
+        self.assertEqual(Post.objects.count(), 1)
+
+
+class TrendingTests(TestCase):
+    """
+    Test cases for the incrementally maintained trending score.
+    """
+
+    def setUp(self):
+        cache.clear()
+        counters.flush_views()
+        self.user = User.objects.create_user(username='trendsetter', password='password123')
+        self.quiet = Post.objects.create(title="Quiet post", content="Body", author=self.user)
+        self.busy = Post.objects.create(title="Busy post", content="Body", author=self.user)
+        self.url = reverse('trending-posts')
+
+    def test_events_accumulate_in_log_space(self):
+        now = timezone.now()
+        counters.comment_added(self.busy.pk, now)
+        counters.comment_added(self.busy.pk, now)
+        self.busy.refresh_from_db()
+        expected = trending.event_score(2 * trending.COMMENT_WEIGHT, now)
+        self.assertAlmostEqual(self.busy.trending_score, expected, places=6)
+        self.assertAlmostEqual(trending.current_activity(self.busy.trending_score, now), 20.0, places=3)
+
+    def test_older_activity_decays(self):
+        now = timezone.now()
+        one_half_life_ago = now - timedelta(seconds=trending.TRENDING_HALF_LIFE)
+        old = trending.event_score(trending.COMMENT_WEIGHT, one_half_life_ago)
+        self.assertAlmostEqual(trending.current_activity(old, now), trending.COMMENT_WEIGHT / 2)
+
+    def test_views_feed_the_score_and_the_page_is_one_query(self):
+        counters.comment_added(self.quiet.pk, timezone.now())
+        for _ in range(20):
+            counters.record_view(self.busy.pk)
+        counters.flush_views()
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual([post.pk for post in response.context['posts']], [self.busy.pk, self.quiet.pk])
+
+    def test_posts_without_activity_are_not_listed(self):
+        self.assertContains(self.client.get(self.url), "Nothing is trending yet.")
+
+
+class MonthArchiveTests(TestCase):
+    """
+    Test cases for the month archive pages and the rollup table behind the sidebar.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='archivist', password='password123')
+        self.november = Post.objects.create(title="November post", content="Body", author=self.user)
+        self.october = Post.objects.create(title="October post", content="Body", author=self.user)
+        # published_date is auto_now_add, so older dates are set with an update (as an import would)
+        Post.objects.filter(pk=self.november.pk).update(published_date=timezone.make_aware(datetime(2024, 11, 30, 23, 59)))
+        Post.objects.filter(pk=self.october.pk).update(published_date=timezone.make_aware(datetime(2024, 10, 1)))
+        archive.rebuild_archive()
+
+    def test_buckets_follow_creates_and_deletes(self):
+        now = timezone.localtime()
+        post = Post.objects.create(title="Fresh", content="Body", author=self.user)
+        bucket = MonthArchive.objects.get(year=now.year, month=now.month)
+        self.assertEqual(bucket.post_count, 1)
+        post.delete()
+        self.assertFalse(MonthArchive.objects.filter(year=now.year, month=now.month).exists())
+
+    def test_sidebar_is_cached(self):
+        self.assertEqual(
+            [(bucket['label'], bucket['post_count']) for bucket in archive.get_archive_months()],
+            [('November 2024', 1), ('October 2024', 1)],
+        )
+        with self.assertNumQueries(0):
+            archive.get_archive_months()
+
+    def test_month_page_lists_only_that_month(self):
+        response = self.client.get(reverse('post-archive-month', args=[2024, 11]))
+        self.assertEqual([post.pk for post in response.context['posts']], [self.november.pk])
+        self.assertContains(response, "Posts from November 2024")
+        self.assertContains(response, reverse('post-archive-month', args=[2024, 10]))
+
+    def test_invalid_month_is_404(self):
+        self.assertEqual(self.client.get(reverse('post-archive-month', args=[2024, 13])).status_code, 404)
+
+
+class AuthorPageTests(TestCase):
+    """
+    Test cases for the per-author post listing and its header statistics.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='prolific', password='password123')
+        self.other = User.objects.create_user(username='occasional', password='password123')
+        self.posts = [
+            Post.objects.create(title=f"Prolific post {number}", content="Body", author=self.author)
+            for number in range(3)
+        ]
+        Post.objects.create(title="Someone else", content="Body", author=self.other)
+        self.url = reverse('author-posts', args=['prolific'])
+
+    def test_lists_only_the_authors_posts_newest_first(self):
+        response = self.client.get(self.url)
+        self.assertEqual([post.pk for post in response.context['posts']], [post.pk for post in reversed(self.posts)])
+
+    def test_header_statistics_come_from_one_query(self):
+        self.client.force_login(self.other)
+        for post in self.posts[:2]:
+            self.client.post(reverse('comment-create', args=[post.pk]), {'content': "Nice"})
+        self.client.logout()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        author = response.context['author']
+        self.assertEqual((author.post_count, author.comments_received), (3, 2))
+        self.assertEqual(response.context['latest_activity'], author.latest_comment_at)
+        self.assertContains(response, "2 comments received")
+        self.assertEqual(sum('auth_user' in query['sql'] for query in queries.captured_queries), 1)
+
+    def test_pages_use_keyset_cursors(self):
+        with mock.patch.object(AuthorPostListView, 'page_size', 2):
+            first = self.client.get(self.url)
+            self.assertTrue(first.context['page'].has_next)
+            second = self.client.get(self.url, {'cursor': first.context['page'].next_cursor})
+        self.assertEqual([post.pk for post in second.context['posts']], [self.posts[0].pk])
+
+    def test_unknown_author_is_404(self):
+        self.assertEqual(self.client.get(reverse('author-posts', args=['nobody'])).status_code, 404)
+
+
+class FeedTests(TestCase):
+    """
+    Test cases for the streamed, cached Atom and RSS feeds.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='syndicator', password='password123')
+        self.post = Post.objects.create(title="Feed & friends", content="Feed body", author=self.user)
+        self.post.tags.add('feeds')
+        Post.objects.create(title="Untagged", content="Body", author=self.user)
+
+    def test_atom_and_rss_are_streamed_from_one_query(self):
+        for name, marker in (('feed-atom', b'<feed'), ('feed-rss', b'<rss')):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse(name))
+                body = b''.join(response.streaming_content)
+            self.assertTrue(response.streaming)
+            self.assertIn(marker, body)
+            self.assertIn(b'Feed &amp; friends', body)
+            self.assertIn(b'http://testserver' + self.post.get_absolute_url().encode(), body)
+            self.assertEqual(len(queries), 2)  # Validators, then the single .only() query
+            cache.clear()
+
+    def test_second_request_is_served_from_the_cache(self):
+        first = b''.join(self.client.get(reverse('feed-atom')).streaming_content)
+        with self.assertNumQueries(1):  # Only the validator query
+            second = self.client.get(reverse('feed-atom'))
+        self.assertFalse(second.streaming)
+        self.assertEqual(second.content, first)
+
+    def test_conditional_get_and_invalidation(self):
+        response = self.client.get(reverse('feed-rss'))
+        b''.join(response.streaming_content)
+        self.assertEqual(self.client.get(reverse('feed-rss'), HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        Post.objects.create(title="Newest", content="Body", author=self.user)
+        fresh = self.client.get(reverse('feed-rss'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(fresh.status_code, 200)
+        self.assertIn(b'Newest', b''.join(fresh.streaming_content))
+
+    def test_tag_feed_only_has_tagged_posts(self):
+        body = b''.join(self.client.get(reverse('tag-feed-atom', args=['feeds'])).streaming_content)
+        self.assertIn(b'Feed &amp; friends', body)
+        self.assertNotIn(b'Untagged', body)
+        self.assertEqual(self.client.get(reverse('tag-feed-atom', args=['missing'])).status_code, 404)
+
+
+class SitemapTests(TestCase):
+    """
+    Test cases for the sharded, incrementally rebuilt sitemap files.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.root = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        self.user = User.objects.create_user(username='mapper', password='password123')
+        self.post = Post.objects.create(title="Mapped", content="Body", author=self.user)
+        self.post.tags.add('maps')
+
+    def build(self, **kwargs):
+        return sitemaps.build_sitemaps(root=self.root, site_url='https://blog.example', **kwargs)
+
+    def test_index_and_shards_are_written(self):
+        self.assertEqual(self.build(), ['sitemap-posts-0.xml', 'sitemap-tags-0.xml'])
+        index = (self.root / 'sitemap.xml').read_text()
+        self.assertIn('<loc>https://blog.example/sitemap-posts-0.xml</loc>', index)
+        shard = (self.root / 'sitemap-posts-0.xml').read_text()
+        self.assertIn(f'<loc>https://blog.example/post/{self.post.pk}/</loc><lastmod>', shard)
+        self.assertIn('https://blog.example/tag/maps/', (self.root / 'sitemap-tags-0.xml').read_text())
+
+    def test_only_changed_shards_are_rewritten(self):
+        self.build()
+        self.assertEqual(self.build(), [])
+        with mock.patch.object(sitemaps, 'SHARD_SIZE', 1):  # One post per shard
+            self.build(full=True)
+            other = Post.objects.create(title="Second", content="Body", author=self.user)
+            shard = f'sitemap-posts-{other.pk - 1}.xml'
+            self.assertEqual(self.build(), [shard])
+            other.delete()
+            self.assertEqual(self.build(), [])
+            self.assertFalse((self.root / shard).exists())
+            self.assertNotIn(shard, (self.root / 'sitemap.xml').read_text())
+
+    def test_tag_names_with_slashes_and_renames(self):
+        self.post.tags.add('ci/cd')
+        self.build()
+        self.assertIn('https://blog.example/tag/ci/cd/', (self.root / 'sitemap-tags-0.xml').read_text())
+        Tag.objects.filter(name='ci/cd').update(name='devops')  # Same count and lastmod, new URL
+        self.assertEqual(self.build(), ['sitemap-tags-0.xml'])
+        shard = (self.root / 'sitemap-tags-0.xml').read_text()
+        self.assertIn('https://blog.example/tag/devops/', shard)
+        self.assertNotIn('ci/cd', shard)
+
+    def test_command_reports_the_rewritten_shards(self):
+        out = StringIO()
+        call_command('build_sitemaps', root=str(self.root), stdout=out)
+        self.assertIn('Rewrote 2 sitemap shards', out.getvalue())
+
+
+
+class ImportPostsTests(TestCase):
+    """
+    Test cases for the streamed, chunked bulk importer.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.root = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        self.user = User.objects.create_user(username='writer', password='password123')
+        Tag.objects.create(name='django')
+
+    def run_import(self, filename, text, *args):
+        path = self.root / filename
+        path.write_text(text, encoding='utf-8')
+        out = StringIO()
+        call_command('import_posts', str(path), *args, stdout=out)
+        return out.getvalue()
+
+    def test_jsonl_rows_become_posts_with_tags_and_derived_data(self):
+        rows = [
+            {'title': 'Imported one', 'content': 'First body', 'author': 'writer', 'tags': ['django', 'bulk'],
+             'published_date': '2023-05-04T10:00:00'},
+            {'title': 'Imported two', 'content': 'Second body', 'author': 'writer', 'tags': ['bulk']},
+            {'title': '', 'content': 'No title', 'author': 'writer'},
+            {'title': 'Stranger', 'content': 'Unknown author', 'author': 'nobody'},
+        ]
+        out = self.run_import('posts.jsonl', '\n'.join(json.dumps(row) for row in rows), '--batch-size', '1')
+        self.assertIn('Imported 2 posts', out)
+        self.assertIn('skipped 2 rows', out)
+        self.assertIn('rows/s', out)
+
+        first = Post.objects.get(title='Imported one')
+        self.assertEqual(first.published_date, timezone.make_aware(datetime(2023, 5, 4, 10)))
+        self.assertEqual(first.excerpt, 'First body')
+        self.assertEqual(set(first.tags.names()), {'django', 'bulk'})
+        self.assertEqual(Tag.objects.filter(name='django').count(), 1)
+        self.assertEqual(TagStat.objects.get(tag__name='bulk').post_count, 2)
+        self.assertEqual(MonthArchive.objects.get(year=2023, month=5).post_count, 1)
+        self.assertEqual(set(search.search('bulk')), {first.pk, Post.objects.get(title='Imported two').pk})
+
+    def test_jsonl_line_that_is_not_an_object_stops_with_its_line_number(self):
+        text = json.dumps({'title': 'Kept', 'content': 'Body', 'author': 'writer'}) + '\n\n[1, 2]\n'
+        with self.assertRaisesMessage(CommandError, 'line 3: expected a JSON object, got list'):
+            self.run_import('posts.jsonl', text, '--batch-size', '1')
+        self.assertTrue(Post.objects.filter(title='Kept').exists())  # Earlier chunks stay committed
+
+    def test_csv_with_created_authors(self):
+        text = 'title,content,author,tags\r\nFrom CSV,"Body, with comma",newcomer,"csv, import"\r\n'
+        self.run_import('posts.csv', text, '--create-authors')
+        post = Post.objects.get(title='From CSV')
+        self.assertEqual(post.author.username, 'newcomer')
+        self.assertFalse(post.author.has_usable_password())
+        self.assertEqual(set(post.tags.names()), {'csv', 'import'})
+
+    def test_chunks_use_a_fixed_number_of_queries(self):
+        rows = '\n'.join(
+            json.dumps({'title': f'Post {number}', 'content': 'Body', 'author': 'writer', 'tags': ['django']})
+            for number in range(50)
+        )
+        path = self.root / 'many.jsonl'
+        path.write_text(rows, encoding='utf-8')
+        with CaptureQueriesContext(connection) as queries:
+            call_command('import_posts', str(path), '--batch-size', '50', stdout=StringIO())
+        self.assertEqual(Post.objects.filter(title__startswith='Post ').count(), 50)
+        self.assertLess(len(queries.captured_queries), 20)  # Not several per post
+
+
+class NdjsonExportTests(TestCase):
+    """
+    Test cases for the streamed NDJSON export (command and staff endpoint).
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.root = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        self.user = User.objects.create_user(username='exporter', password='password123')
+        self.posts = [Post.objects.create(title=f"Export {number}", content="Body", author=self.user) for number in range(5)]
+        self.posts[0].tags.add('backup', 'data')
+        self.comment = Comment.objects.create(post=self.posts[0], author=self.user, content="Exported comment")
+
+    def test_command_writes_posts_with_tags_and_comments(self):
+        path = self.root / 'export.ndjson'
+        out = StringIO()
+        call_command('export_ndjson', str(path), stdout=out)
+        records = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+        self.assertEqual([record['type'] for record in records], ['post'] * 5 + ['comment'])
+        self.assertEqual(records[0]['id'], self.posts[0].pk)
+        self.assertEqual(sorted(records[0]['tags']), ['backup', 'data'])
+        self.assertEqual(records[0]['author'], 'exporter')
+        self.assertEqual(records[1]['tags'], [])
+        self.assertEqual(records[5]['content'], 'Exported comment')
+        self.assertIn('Exported 5 posts, 1 comments.', out.getvalue())
+
+    def test_command_compresses_gz_output(self):
+        path = self.root / 'export.ndjson.gz'
+        call_command('export_ndjson', str(path), '--only', 'comments', stdout=StringIO())
+        lines = gzip.decompress(path.read_bytes()).decode().splitlines()
+        self.assertEqual([json.loads(line)['id'] for line in lines], [self.comment.pk])
+
+    def test_tags_are_fetched_once_per_chunk(self):
+        with CaptureQueriesContext(connection) as queries:
+            records = list(export.export_records(['posts'], chunk_size=2))
+        self.assertEqual(len(records), 5)
+        self.assertEqual(len(queries.captured_queries), 1 + 3)  # Posts, then tags for 3 chunks
+
+    def test_endpoint_is_staff_only_and_streams(self):
+        client = Client()
+        client.login(username='exporter', password='password123')
+        self.assertEqual(client.get(reverse('export-ndjson')).status_code, 302)
+
+        User.objects.filter(pk=self.user.pk).update(is_staff=True)
+        response = client.get(reverse('export-ndjson'), {'only': 'posts', 'gzip': '1'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        lines = gzip.decompress(b''.join(response.streaming_content)).decode().splitlines()
+        self.assertEqual(len(lines), 5)
+
+
+@override_settings(ROOT_URLCONF='blog.async_urls')
+class AsyncReadViewTests(TestCase):
+    """
+    Test cases for the async versions of the post list, post, tag and search pages.
+    """
+
+    def setUp(self):
+        cache.clear()
+        counters.flush_views()
+        self.user = User.objects.create_user(username='asyncwriter', password='password123')
+        self.post = Post.objects.create(title="Async Post", content="Served from the event loop", author=self.user)
+        self.post.tags.add('asgi')
+        self.comment = Comment.objects.create(post=self.post, author=self.user, content="Async comment")
+
+    def test_views_are_async(self):
+        for view in (AsyncPostListView, AsyncPostDetailView, AsyncTagPostListView):
+            self.assertTrue(view.view_is_async)
+
+    async def test_pages_render_like_the_sync_views(self):
+        pages = [
+            (reverse('post-list'), 'Async Post'),
+            (reverse('post-detail', args=[self.post.pk]), 'Async comment'),
+            (reverse('tagged-posts', args=['asgi']), 'Async Post'),
+            (reverse('search-posts') + '?q=event', 'Async Post'),
+        ]
+        for url, text in pages:
+            response = await self.async_client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            self.assertContains(response, text)
+            with self.settings(ROOT_URLCONF='blog.urls'):
+                sync_response = await sync_to_async(self.client.get)(url)
+            self.assertEqual(response.get('ETag'), sync_response.get('ETag'), url)
+
+    async def test_conditional_get_and_errors(self):
+        url = reverse('post-detail', args=[self.post.pk])
+        etag = (await self.async_client.get(url))['ETag']
+        self.assertEqual((await self.async_client.get(url, headers={'if-none-match': etag})).status_code, 304)
+        self.assertEqual((await self.async_client.get(reverse('tagged-posts', args=['missing']))).status_code, 404)
+        self.assertEqual((await self.async_client.get(reverse('post-list') + '?cursor=bogus')).status_code, 404)
+
+    async def test_page_cache_and_view_counting(self):
+        url = reverse('post-detail', args=[self.post.pk])
+        self.assertEqual((await self.async_client.get(url))['X-Cache'], 'MISS')
+        self.assertEqual((await self.async_client.get(url))['X-Cache'], 'HIT')
+        self.assertEqual(counters.pending_views()[self.post.pk], 2)
+
+    async def test_logged_in_user_gets_own_comment_links(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('post-detail', args=[self.post.pk]))
+        self.assertContains(response, reverse('comment-update', args=[self.comment.pk]))
+        self.assertNotIn('X-Cache', response)
+
+
+class ReadReplicaTests(TestCase):
+    """
+    Test cases for the read-replica router and read-your-writes stickiness.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    @staticmethod
+    def routed(request=None):
+        """ Aliases chosen for reads and writes inside a view wrapped with reads_from_replica. """
+        def view(request):
+            response = HttpResponse()
+            response.aliases = (
+                router.db_for_read(Post), router.db_for_read(Tag), router.db_for_read(User), router.db_for_write(Post),
+            )
+            replica_post = Post()
+            replica_post._state.db = replicas.current_replica()
+            response.author_alias = router.db_for_read(User, instance=replica_post)  # Lookup of post.author
+            return response
+        return replicas.reads_from_replica(view)(request)
+
+    def test_without_replicas_everything_uses_the_primary(self):
+        response = self.routed(self.factory.get('/'))
+        self.assertEqual(response.aliases, ('default',) * 4)
+        self.assertFalse(response.read_from_replica)
+
+    @override_settings(BLOG_READ_REPLICAS=['replica'])
+    def test_blog_reads_go_to_the_replica_and_writes_to_the_primary(self):
+        response = self.routed(self.factory.get('/'))
+        self.assertEqual(response.aliases, ('replica', 'replica', 'default', 'default'))
+        self.assertEqual(response.author_alias, 'replica')
+        self.assertTrue(response.read_from_replica)
+        self.assertIsNone(replicas.current_replica())  # Only inside the wrapped view
+        self.assertEqual(router.db_for_read(Post), 'default')
+
+    @override_settings(BLOG_READ_REPLICAS=['replica'])
+    async def test_async_views_read_from_the_replica(self):
+        async def view(request):
+            response = HttpResponse()
+            response.alias = await sync_to_async(router.db_for_read)(Post)  # As the async ORM does
+            return response
+        response = await replicas.reads_from_replica(view)(self.factory.get('/'))
+        self.assertEqual(response.alias, 'replica')
+
+    @override_settings(BLOG_READ_REPLICAS=['replica'])
+    def test_writes_keep_the_writer_on_the_primary(self):
+        User.objects.create_user(username='replicauser', password='password123')
+        self.assertNotIn(replicas.STICKY_COOKIE, self.client.get(reverse('login')).cookies)
+        response = self.client.post(reverse('login'), {'username': 'replicauser', 'password': 'password123'})
+        self.assertEqual(response.cookies[replicas.STICKY_COOKIE]['max-age'], 30)
+
+        sticky = self.factory.get('/')
+        sticky.COOKIES[replicas.STICKY_COOKIE] = '1'
+        self.assertEqual(self.routed(sticky).aliases, ('default',) * 4)
+
+    @override_settings(BLOG_READ_REPLICAS=['replica'])
+    def test_long_lived_caches_are_not_filled_from_the_replica(self):
+        Post.objects.create(title="Sidebar", content="Body", author=User.objects.create_user(username='sidebar'))
+
+        def view(request):
+            # The 'replica' alias does not exist here, so any query sent to it would fail
+            response = HttpResponse()
+            response.cloud, response.months = tags.get_tag_cloud(), archive.get_archive_months()
+            with mock.patch.object(search, 'search', return_value=[1]), mock.patch.object(search.cache, 'set') as store:
+                search.cached_search('sidebar')
+            response.search_timeout = store.call_args.args[2]
+            return response
+
+        response = replicas.reads_from_replica(view)(self.factory.get('/'))
+        self.assertEqual(response.months[0]['post_count'], 1)
+        self.assertEqual(response.search_timeout, 30)  # Capped to BLOG_REPLICA_STICKY_SECONDS
+        self.assertEqual(replicas.replica_timeout(search.SEARCH_CACHE_TIMEOUT), search.SEARCH_CACHE_TIMEOUT)
+
+    def test_replica_is_never_migrated(self):
+        with self.settings(BLOG_READ_REPLICAS=['replica']):
+            self.assertFalse(router.allow_migrate('replica', 'blog'))
+            self.assertTrue(router.allow_migrate('default', 'blog'))
+
+
+
+class CrudQueryCountTests(TestCase):
+    """
+    Test cases pinning the number of queries run by each create/update/delete view, so that
+    a view fetching objects it already has (or a signal handler growing) fails loudly.
+    - Every logged-in request starts with two queries: the session and the user.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='crudwriter', password='password123')
+        self.other = User.objects.create_user(username='crudreader', password='password123')
+        self.post = Post.objects.create(title="Counted Post", content="Counted content", author=self.user)
+        self.post.tags.add('django')
+        self.comment = Comment.objects.create(post=self.post, author=self.user, content="Counted comment")
+        self.reply = Comment.objects.create(post=self.post, author=self.user, content="Counted reply", parent=self.comment)
+        self.client.force_login(self.user)
+
+    def assertQueries(self, count, method, url, data=None, status=200):
+        with self.assertNumQueries(count):
+            response = self.client.post(url, data or {}) if method == 'post' else self.client.get(url)
+        self.assertEqual(response.status_code, status)
+        return response
+
+    def test_post_create(self):
+        self.assertQueries(2, 'get', reverse('post-create'))
+        self.assertQueries(22, 'post', reverse('post-create'), {'title': "New", 'content': "New content", 'tags': 'django'}, 302)
+
+    def test_post_update(self):
+        url = reverse('post-update', args=[self.post.pk])
+        self.assertQueries(4, 'get', url)  # Session, user, post and its tags for the form
+        self.assertQueries(16, 'post', url, {'title': "Renamed", 'content': "Counted content", 'tags': 'django'}, 302)
+
+    def test_post_delete(self):
+        url = reverse('post-delete', args=[self.post.pk])
+        self.assertQueries(3, 'get', url)
+        self.assertQueries(23, 'post', url, status=302)  # Cascades and the search, tag and archive updates
+
+    def test_comment_create_and_reply(self):
+        self.assertQueries(3, 'get', reverse('comment-create', args=[self.post.pk]))
+        self.assertQueries(9, 'post', reverse('comment-create', args=[self.post.pk]), {'content': "Another"}, 302)
+        self.assertQueries(10, 'post', reverse('comment-reply', args=[self.post.pk, self.comment.pk]), {'content': "Re"}, 302)
+
+    def test_comment_update(self):
+        url = reverse('comment-update', args=[self.comment.pk])
+        self.assertQueries(3, 'get', url)
+        response = self.assertQueries(5, 'post', url, {'content': "Edited"}, 302)
+        self.assertRedirects(response, reverse('post-detail', args=[self.post.pk]), fetch_redirect_response=False)
+
+    def test_comment_delete(self):
+        url = reverse('comment-delete', args=[self.comment.pk])
+        self.assertQueries(3, 'get', url)
+        response = self.assertQueries(12, 'post', url, status=302)
+        self.assertRedirects(response, reverse('post-detail', args=[self.post.pk]), fetch_redirect_response=False)
 
+    def test_other_users_are_refused_after_one_lookup(self):
+        self.client.force_login(self.other)
+        for name, obj in [('post-update', self.post), ('post-delete', self.post),
+                          ('comment-update', self.comment), ('comment-delete', self.comment)]:
+            self.assertQueries(3, 'get', reverse(name, args=[obj.pk]), status=403)
@@ -0,0 +1,90 @@
+from .models import Comment, PATH_SEGMENT_DIGITS  # Comments and the materialized-path layout
+
+# ----------------------------------------
+# Threaded Comments (Materialized Path)
+# ----------------------------------------
+
+def path_upper_bound(path):
+    """
+    Smallest string greater than every path starting with `path`.
+    - Paths end with '/', and '/' sorts just before '0', so replacing the trailing
+      '/' with '0' bounds the subtree: path <= descendant < bound.
+    """
+    return path[:-1] + chr(ord(path[-1]) + 1)
+
+
+def root_id(path):
+    """ Id of the thread root encoded in the first path segment. """
+    return int(path[:PATH_SEGMENT_DIGITS])
+
+
+def subtree(comment, max_depth=None):
+    """
+    Queryset of `comment` and its descendants, in thread order.
+    - One indexed range scan on (post, path); `max_depth` limits levels below `comment`.
+    """
+    queryset = Comment.objects.filter(
+        post_id=comment.post_id, path__gte=comment.path, path__lt=path_upper_bound(comment.path)
+    )
+    if max_depth is not None:
+        queryset = queryset.filter(depth__lte=comment.depth + max_depth)
+    return queryset.order_by('path')
+
+
+def ancestor_id(path, depth):
+    """ Id of the comment at `depth` on the way to the comment with this path. """
+    start = depth * (PATH_SEGMENT_DIGITS + 1)
+    return int(path[start:start + PATH_SEGMENT_DIGITS])
+
+
+def load_threads(post_id, roots, max_depth=None, limit=None):
+    """
+    Load the threads below a page of comments (top-level comments, or a single comment).
+    - The roots are contiguous in path order, so their replies are fetched with a single
+      range query from the first root's path to the last root's subtree bound.
+    - `max_depth` limits the reply levels below the roots and `limit` the number of replies;
+      comments with replies left out get `more_replies = True`, so they can be loaded on
+      demand (see `post_comments` / `comment_replies`).
+    - Returns the roots (in the given order) with their `children` populated.
+    """
+    roots = list(roots)
+    if not roots:
+        return []
+    depth = roots[0].depth  # All roots of a page are at the same level
+    paths = sorted(root.path for root in roots)
+    queryset = Comment.objects.filter(
+        post_id=post_id, path__gt=paths[0], path__lt=path_upper_bound(paths[-1]), depth__gt=depth
+    ).select_related('author').order_by('path')
+    if max_depth is not None:
+        queryset = queryset.filter(depth__lte=depth + max_depth + 1)  # One level more, only to see what is left out
+    if limit is not None:
+        queryset = queryset[:limit + 1]  # One more, only to see whether the replies are complete
+
+    nodes = {}
+    for root in roots:
+        root.children, root.more_replies = [], False
+        nodes[root.pk] = root
+    replies = list(queryset)
+    first_left_out = replies.pop() if limit is not None and len(replies) > limit else None
+    for reply in replies:
+        parent = nodes.get(reply.parent_id)
+        if parent is None:
+            continue  # In the range, but below a root of another page
+        if max_depth is not None and reply.depth > depth + max_depth:
+            parent.more_replies = True  # Below the depth limit: only marks its parent
+            continue
+        reply.children, reply.more_replies = [], False
+        nodes[reply.pk] = reply
+        parent.children.append(reply)
+
+    if first_left_out is not None:
+        # Replies are fetched in path order: the comments missing some are the ancestors of
+        # the first reply left out, and the roots after it (those that have replies at all)
+        for ancestor_depth in range(depth, first_left_out.depth):
+            ancestor = nodes.get(ancestor_id(first_left_out.path, ancestor_depth))
+            if ancestor is not None:
+                ancestor.more_replies = True
+        unreached = [root.pk for root in roots if root.path > first_left_out.path]
+        for parent_id in Comment.objects.filter(parent_id__in=unreached).values_list('parent_id', flat=True).distinct():
+            nodes[parent_id].more_replies = True
+    return roots
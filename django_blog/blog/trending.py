@@ -0,0 +1,54 @@
+import math  # Logarithms of event weights and the decay rate
+from datetime import datetime, timezone as dt_timezone  # The fixed reference timestamp
+
+from django.db.models import Case, F, FloatField, Value, When  # Score update expressions
+from django.db.models.functions import Abs, Exp, Greatest, Ln  # log-sum-exp inside the UPDATE
+from django.utils import timezone  # Current time for events and display
+
+# ----------------------------------------
+# Trending Score (exponential time decay)
+# ----------------------------------------
+#
+# A post's trending value at time t is the sum over its events of
+#     weight * exp(-(t - event_time) / tau)
+# Every post decays by the same factor, so ranking by it is the same as ranking by
+#     sum(weight * exp((event_time - TRENDING_EPOCH) / tau))
+# which never changes once written. Post.trending_score stores the log of that sum, so a new
+# event is one `score = log(exp(score) + exp(x))` in the UPDATE, nothing is ever re-scored,
+# and the values grow only linearly with time (no overflow).
+
+TRENDING_EPOCH = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)  # Stored reference timestamp
+TRENDING_HALF_LIFE = 24 * 60 * 60  # Seconds after which an event counts half as much
+TRENDING_TAU = TRENDING_HALF_LIFE / math.log(2)
+VIEW_WEIGHT = 1.0  # Weight of one page view
+COMMENT_WEIGHT = 10.0  # Weight of one new comment
+TRENDING_PAGE_SIZE = 20  # Posts listed on the trending page
+
+
+def event_score(weight, when=None):
+    """ log(weight * exp((when - TRENDING_EPOCH) / tau)) for an event of `weight` at `when`. """
+    when = when or timezone.now()
+    return math.log(weight) + (when - TRENDING_EPOCH).total_seconds() / TRENDING_TAU
+
+
+def add_to_score(event):
+    """
+    Expression adding `event` (log-space, a number or an expression) to Post.trending_score.
+    - Computed as max(s, x) + ln(1 + exp(-|s - x|)), the numerically stable log-sum-exp.
+    - Posts without activity (NULL score) simply take the event's value.
+    """
+    event = event if hasattr(event, 'resolve_expression') else Value(float(event))
+    score = F('trending_score')
+    return Case(
+        When(trending_score__isnull=True, then=event),
+        default=Greatest(score, event) + Ln(Value(1.0) + Exp(-Abs(score - event))),
+        output_field=FloatField(),
+    )
+
+
+def current_activity(score, now=None):
+    """ Decayed activity a stored score stands for at `now` (for display; 0 without activity). """
+    if score is None:
+        return 0.0
+    now = now or timezone.now()
+    return math.exp(score - (now - TRENDING_EPOCH).total_seconds() / TRENDING_TAU)
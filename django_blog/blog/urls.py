@@ -1,16 +1,27 @@
 from django.urls import path  # Import the path function to define URL patterns
 from django.contrib.auth.views import LoginView, LogoutView  # Import built-in authentication views
+from .replicas import reads_from_replica  # Send a view's reads to a read replica (when configured)
 from .views import (  # Import views for posts, comments, tagging, and search
     PostListView,         # View to list all blog posts
+    TrendingPostListView, # View to list the posts with the most recent activity
+    MonthArchiveView,     # View to list the posts published in a given month
+    AuthorPostListView,   # View to list one author's posts
     PostDetailView,       # View to display details of a single blog post
     PostCreateView,       # View to create a new blog post (LoginRequiredMixin applied in views.py)
     PostUpdateView,       # View to update an existing blog post
     PostDeleteView,       # View to delete a blog post
     CommentCreateView,    # View to create a new comment
+    post_comments,        # JSON endpoint returning a page of a post's comments
+    comment_replies,      # JSON endpoint returning the replies below one comment
     CommentUpdateView,    # View to update an existing comment
     CommentDeleteView,    # View to delete an existing comment
-    TaggedPostListView,   # View to display posts filtered by tags
-    PostSearchView,       # View to handle search functionality
+    TagPostListView,      # View to display posts filtered by tags
+    search_posts,         # View to handle search functionality
+    search_autocomplete,  # JSON endpoint with search-as-you-type suggestions
+    post_feed,            # Atom / RSS feeds of the newest posts
+    export_ndjson,        # Staff-only NDJSON export of posts and comments
+    register,             # View to handle user registration
+    profile,              # View to display and update the user's profile
 )
 
 # URL patterns for the blog app
@@ -25,14 +36,33 @@ urlpatterns = [
     path('logout/', LogoutView.as_view(template_name='blog/logout.html'), name='logout'),
     # Logout page using Django's built-in LogoutView and a custom template
 
+    path('register/', register, name='register'),
+    # Registration page for new users
+
+    path('profile/', profile, name='profile'),
+    # Profile page for logged-in users
+
     # ----------------------------------------
     # Blog Post Management URLs (CRUD)
     # ----------------------------------------
 
-    path('', PostListView.as_view(), name='post-list'),
-    # List all blog posts at the root URL using PostListView
+    path('', reads_from_replica(PostListView.as_view()), name='post-list'),
+    # List all blog posts at the root URL using PostListView (read from a replica when configured)
+
+    path('trending/', TrendingPostListView.as_view(), name='trending-posts'),
+    # Posts ranked by recent (time-decayed) views and comments
+
+    path('feed/atom/', post_feed, {'feed_format': 'atom'}, name='feed-atom'),
+    path('feed/rss/', post_feed, {'feed_format': 'rss'}, name='feed-rss'),
+    # Atom and RSS feeds of the newest posts
 
-    path('post/<int:pk>/', PostDetailView.as_view(), name='post-detail'),
+    path('archive/<int:year>/<int:month>/', MonthArchiveView.as_view(), name='post-archive-month'),
+    # Posts published in a given month, e.g. /archive/2024/11/
+
+    path('author/<str:username>/', AuthorPostListView.as_view(), name='author-posts'),
+    # Posts by one author, with post and comment statistics
+
+    path('post/<int:pk>/', reads_from_replica(PostDetailView.as_view()), name='post-detail'),
     # View details of a single post using PostDetailView. <int:pk> captures the post ID
 
     path('post/new/', PostCreateView.as_view(), name='post-create'),
@@ -48,9 +78,18 @@ urlpatterns = [
     # Comment Management URLs (CRUD)
     # ----------------------------------------
 
-    path('post/<int:pk>/comments/new/', CommentCreateView.as_view(), name='comment-create'),
+    path('post/<int:post_id>/comments/new/', CommentCreateView.as_view(), name='comment-create'),
     # Add a new comment to a specific post using CommentCreateView
-    # <int:pk> identifies the post for which the comment is being created
+    # <int:post_id> identifies the post for which the comment is being created
+
+    path('post/<int:post_id>/comments/<int:parent_id>/reply/', CommentCreateView.as_view(), name='comment-reply'),
+    # Reply to an existing comment. <int:parent_id> identifies the comment being answered
+
+    path('post/<int:pk>/comments/', post_comments, name='post-comments'),
+    # JSON page of a post's comments. Pass ?cursor=<next_cursor> for the following page
+
+    path('comment/<int:pk>/replies/', comment_replies, name='comment-replies'),
+    # JSON thread below one comment, for the replies left out of the page (`more_replies_url`)
 
     path('comment/<int:pk>/update/', CommentUpdateView.as_view(), name='comment-update'),
     # Edit an existing comment using CommentUpdateView
@@ -64,11 +103,25 @@ urlpatterns = [
     # Tagging and Search URLs
     # ----------------------------------------
 
-    path('tag/<str:tag>/', TaggedPostListView.as_view(), name='tagged-posts'),
-    # Filter posts by tags. <str:tag> captures the tag name
+    path('tag/<path:tag>/feed/atom/', post_feed, {'feed_format': 'atom'}, name='tag-feed-atom'),
+    path('tag/<path:tag>/feed/rss/', post_feed, {'feed_format': 'rss'}, name='tag-feed-rss'),
+    # Feeds of the newest posts carrying a tag (matched before the tag page, whose pattern also covers them)
+
+    path('tag/<path:tag>/', reads_from_replica(TagPostListView.as_view()), name='tagged-posts'),
+    # Filter posts by tags. <path:tag> captures the tag name, which may contain slashes (e.g. "ci/cd")
 
-    path('search/', PostSearchView.as_view(), name='search-posts'),
+    path('search/', reads_from_replica(search_posts), name='search-posts'),
     # Search functionality. Handles search queries passed via GET parameters
+
+    path('search/autocomplete/', search_autocomplete, name='search-autocomplete'),
+    # Title and tag suggestions for the prefix passed as ?q=
+
+    # ----------------------------------------
+    # Data Export
+    # ----------------------------------------
+
+    path('export/ndjson/', export_ndjson, name='export-ndjson'),
+    # Staff-only NDJSON download of posts and comments (?only=posts|comments, ?gzip=1)
 ]
 
 
@@ -1,15 +1,29 @@
-from django.shortcuts import render, redirect, get_object_or_404  # Utilities for rendering and retrieving objects
+from asgiref.sync import sync_to_async  # Sync helpers called from the async views
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404  # Utilities for rendering and retrieving objects
 from django.contrib.auth.views import LoginView, LogoutView  # Built-in authentication views
 from django.contrib.auth.decorators import login_required  # Restrict access to logged-in users
+from django.contrib.admin.views.decorators import staff_member_required  # Restrict access to staff users
 from django.contrib.auth.models import User  # The built-in User model
-from django.http import HttpResponse  # For sending plain HTTP responses
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse  # Plain, JSON, streamed and 404 HTTP responses
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView  # Class-based views for CRUD
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin  # Mixins for access control
-from django.urls import reverse_lazy  # Utility for lazy URL reversing
-from django.db.models import Q  # For advanced query lookups
+from django.urls import reverse, reverse_lazy  # Utilities for URL reversing
+from django.core.paginator import Paginator  # Pages over cached search result ids
+from django.db import transaction  # Keep comment writes and counter updates atomic
+from django.db.models import Count, Max, Sum  # Aggregates for validators and author statistics
+from django.template.loader import render_to_string  # Renders the cacheable post body
+from django.utils.cache import get_conditional_response  # 304 responses for feeds
+from django.utils import timezone  # Timestamp in export file names
+from django.utils.http import http_date  # Last-Modified header formatting
+from django.utils.safestring import mark_safe  # The post body is already-escaped template output
 from taggit.models import Tag  # Import Tag model from django-taggit
 from .forms import CustomUserCreationForm, CommentForm  # Import custom forms
-from .models import Post, Comment  # Import models for posts and comments
+from .models import Post, Comment, RelatedPost, TagStat, MonthArchive, MAX_THREAD_DEPTH  # Import models for posts and comments
+from . import archive, autocomplete, counters, export, feeds, fragments, search, tags, threads, trending  # Month archive, autocomplete, counters, NDJSON export, feeds, post body cache, search index, tag statistics, comment threads and trending
+from .conditional import AsyncConditionalGetMixin, ConditionalGetMixin, http_timestamp, make_etag  # ETag / Last-Modified handling
+from . import pagecache  # Surrogate keys for the anonymous page cache
+from .pagecache import SurrogateKeyMixin  # Tags responses with surrogate keys
+from .pagination import KeysetPaginationMixin, InvalidCursor, apaginate, paginate  # Cursor-based pagination
 
 # ----------------------------------------
 # User Authentication Views
@@ -48,18 +62,218 @@ def profile(request):
 # Blog Post Management Views (CRUD)
 # ----------------------------------------
 
-class PostListView(ListView):
-    """ View to list all blog posts. """
+class PostListView(ConditionalGetMixin, SurrogateKeyMixin, KeysetPaginationMixin, ListView):
+    """ View to list all blog posts, newest first, one keyset page at a time. """
     model = Post
     template_name = 'blog/post_list.html'
     context_object_name = 'posts'
-    ordering = ['-published_date']  # Display posts in descending order of published date
+    keyset_ordering = ('-published_date', '-id')  # Display posts in descending order of published date
 
-class PostDetailView(DetailView):
-    """ View to display a single blog post with its details. """
+    def get_validators(self):
+        """
+        Newest change and post count (the count catches deletions), without scanning posts:
+        - MAX over the indexed `updated_at` is a single index lookup;
+        - the count is the sum of the month archive's buckets, maintained on create and delete.
+        """
+        last_modified = Post.objects.aggregate(last_modified=Max('updated_at'))['last_modified']
+        count = MonthArchive.objects.aggregate(count=Sum('post_count'))['count']
+        return last_modified, (last_modified, count)
+
+    def get_surrogate_keys(self, context):
+        return [pagecache.LIST_KEY, pagecache.TAG_CLOUD_KEY]
+
+    def get_queryset(self):
+        """ Skip the full content (lists only show the excerpt) and join the author. """
+        return super().get_queryset().defer('content').select_related('author')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['tag_cloud'] = tags.get_tag_cloud()  # Cached; rebuilt only after tag changes
+        context['archive_months'] = archive.get_archive_months()  # Cached month buckets for the sidebar
+        return context
+
+class MonthArchiveView(SurrogateKeyMixin, KeysetPaginationMixin, ListView):
+    """
+    View to list the posts published in one calendar month, newest first.
+    - Filters `published_date` on a [start, end) range, an index range scan on the
+      (published_date, id) index that also serves the keyset pagination.
+    """
+    model = Post
+    template_name = 'blog/archive_month.html'
+    context_object_name = 'posts'
+
+    def get_surrogate_keys(self, context):
+        return [pagecache.LIST_KEY]  # Purged by every post create, edit and delete
+
+    def get_queryset(self):
+        year, month = self.kwargs['year'], self.kwargs['month']
+        if not 1 <= month <= 12 or not 1 <= year <= 9998:
+            raise Http404('No such month.')
+        start, end = archive.month_range(year, month)
+        self.start = start  # First moment of the month, for the page heading
+        return (
+            Post.objects.filter(published_date__gte=start, published_date__lt=end)
+            .defer('content')  # Only the excerpt is rendered
+            .select_related('author')
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['month'] = self.start
+        context['archive_months'] = archive.get_archive_months()
+        return context
+
+class AuthorPostListView(SurrogateKeyMixin, KeysetPaginationMixin, ListView):
+    """
+    View to list one author's posts, newest first, with statistics in the header.
+    - Posts come from keyset pages over the (author, published_date, id) index.
+    - The statistics are one annotated query over the author's posts, reading the maintained
+      comment counters instead of counting comments.
+    """
+    model = Post
+    template_name = 'blog/author_posts.html'
+    context_object_name = 'posts'
+
+    def get_surrogate_keys(self, context):
+        return [pagecache.LIST_KEY]  # Purged by every post and comment write
+
+    def get_queryset(self):
+        self.author = get_object_or_404(
+            User.objects.annotate(
+                post_count=Count('post'),
+                comments_received=Sum('post__comment_count'),
+                latest_post_at=Max('post__published_date'),
+                latest_comment_at=Max('post__last_comment_at'),
+            ),
+            username=self.kwargs['username'],
+        )
+        return (
+            Post.objects.filter(author_id=self.author.pk)
+            .defer('content')  # Only the excerpt is rendered
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        activity = [when for when in (self.author.latest_post_at, self.author.latest_comment_at) if when]
+        context['author'] = self.author
+        context['latest_activity'] = max(activity) if activity else None
+        return context
+
+class TrendingPostListView(ListView):
+    """
+    View to list the posts with the most recent activity (views and comments, decayed over time).
+    - Scores are maintained incrementally (blog.trending), so the page is one indexed
+      `ORDER BY trending_score DESC LIMIT n` query.
+    """
+    model = Post
+    template_name = 'blog/trending.html'
+    context_object_name = 'posts'
+
+    def get_queryset(self):
+        return (
+            Post.objects.filter(trending_score__isnull=False)
+            .order_by('-trending_score', '-id')
+            .defer('content')
+            .select_related('author')[:trending.TRENDING_PAGE_SIZE]
+        )
+
+COMMENT_ORDERING = ('created_at', 'id')  # Oldest comments first, id breaks ties
+COMMENTS_PAGE_SIZE = 50  # Comments rendered with the post; the rest are loaded from post_comments
+THREAD_DEPTH = 3  # Reply levels loaded below a comment; deeper ones are loaded from comment_replies
+THREAD_REPLY_LIMIT = 200  # Replies loaded with a page of comments (or below one comment)
+
+class PostDetailView(ConditionalGetMixin, SurrogateKeyMixin, DetailView):
+    """
+    View to display a single blog post with its details.
+    - Only the first page of top-level comments is rendered; their reply threads are loaded
+      with one range query (authors joined), and later pages come from `post_comments`.
+    - Views (including 304 revalidations) are counted through the write-behind buffer.
+    """
     model = Post
     template_name = 'blog/post_detail.html'
 
+    def get(self, request, *args, **kwargs):
+        response = super().get(request, *args, **kwargs)
+        counters.record_view(self.kwargs['pk'])
+        response.view_post_id = self.kwargs['pk']  # Lets the page cache count its hits too
+        return response
+
+    def validators_query(self):
+        """
+        The post's `updated_at` (bumped by edits, tag and comment changes), the newest
+        related-posts row id (rows are rewritten whenever the neighbour list is refreshed) and
+        the newest `updated_at` of the related posts (their titles are shown), in one query.
+        """
+        return (
+            Post.objects.filter(pk=self.kwargs['pk'])
+            .annotate(related_version=Max('related_entries__id'), related_updated=Max('related_entries__related__updated_at'))
+            .values_list('updated_at', 'related_version', 'related_updated')
+        )
+
+    @staticmethod
+    def validators_from_row(row):
+        if row is None:
+            return None  # Let the view raise its 404
+        updated_at, _, related_updated = row
+        return max(updated_at, related_updated) if related_updated else updated_at, row
+
+    def get_validators(self):
+        return self.validators_from_row(self.validators_query().first())
+
+    def get_surrogate_keys(self, context):
+        """ The post itself and the related posts whose titles are shown. """
+        return [pagecache.post_key(self.object.pk)] + [
+            pagecache.post_key(related_id) for related_id in context['related_ids']
+        ]
+
+    def render_body(self):
+        """
+        Render the part of the page shared by all visitors: the post, related posts and the
+        first page of comment threads. Per-user comment links are left as placeholders.
+        """
+        page = paginate(
+            self.object.comments.filter(parent__isnull=True).select_related('author'),
+            COMMENT_ORDERING,
+            page_size=COMMENTS_PAGE_SIZE,
+        )
+        related_posts = list(
+            RelatedPost.objects.filter(post=self.object)
+            .select_related('related')
+            .only('score', 'related__id', 'related__title')  # Precomputed by build_related_posts
+        )
+        html = render_to_string(fragments.POST_BODY_TEMPLATE, {
+            'post': self.object,
+            'comments': page,
+            'threads': threads.load_threads(  # Roots with nested `children`
+                self.object.pk, page, max_depth=THREAD_DEPTH, limit=THREAD_REPLY_LIMIT
+            ),
+            'related_posts': related_posts,
+        })
+        return {'html': html, 'related_ids': [entry.related_id for entry in related_posts]}
+
+    def get_body(self):
+        """ The shared body fragment: from the cache, or rendered and cached on a miss. """
+        version = self.validators[1] if self.validators else self.object.updated_at
+        fragment = fragments.get_post_body(self.object.pk, version)
+        if fragment is None:
+            fragment = self.render_body()
+            fragments.set_post_body(self.object.pk, version, fragment)
+        return fragment
+
+    def get_context_data(self, **kwargs):
+        """
+        - The body is cached under a key versioned by this view's validators, so any change
+          that would alter it (edits, comments, tags, related posts or their titles) switches
+          to a new key.
+        - Only the per-user links are filled in per request, from the author ids in the body.
+        """
+        context = super().get_context_data(**kwargs)
+        fragment = self.get_body()
+        context['body'] = mark_safe(fragments.punch_holes(fragment['html'], self.request.user.id))
+        context['related_ids'] = fragment['related_ids']
+        context['form'] = CommentForm()  # Empty form for adding a new comment
+        return context
+
 class PostCreateView(LoginRequiredMixin, CreateView):
     """ View to create a new blog post. """
     model = Post
@@ -70,7 +284,25 @@ class PostCreateView(LoginRequiredMixin, CreateView):
         form.instance.author = self.request.user  # Set the post author to the logged-in user
         return super().form_valid(form)
 
-class PostUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class AuthorRequiredMixin(LoginRequiredMixin, UserPassesTestMixin):
+    """
+    Mixin for update/delete views restricted to the object's author.
+    - The object is fetched once per request: `test_func` and the view share it.
+    - Authorship is checked on `author_id`, without loading the author.
+    """
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_object'):
+            self._object = super().get_object()
+        return self._object
+
+    def test_func(self):
+        """ Restrict access to the object's author only. """
+        return self.get_object().author_id == self.request.user.pk
+
+class PostUpdateView(AuthorRequiredMixin, UpdateView):
     """ View to update an existing blog post. """
     model = Post
     fields = ['title', 'content', 'tags']
@@ -80,113 +312,448 @@ class PostUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
         form.instance.author = self.request.user  # Ensure the post remains associated with the logged-in user
         return super().form_valid(form)
 
-    def test_func(self):
-        """ Restrict access to the post's author only. """
-        post = self.get_object()
-        return self.request.user == post.author
-
-class PostDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+class PostDeleteView(AuthorRequiredMixin, DeleteView):
     """ View to delete a blog post. """
     model = Post
     template_name = 'blog/post_confirm_delete.html'
     success_url = reverse_lazy('post-list')
 
-    def test_func(self):
-        """ Restrict deletion access to the post's author only. """
-        post = self.get_object()
-        return self.request.user == post.author
-
 # ----------------------------------------
 # Tagging and Search Functionality
 # ----------------------------------------
 
-class TagPostListView(ListView):
+class TagPostListView(ConditionalGetMixin, SurrogateKeyMixin, KeysetPaginationMixin, ListView):
     """
     View to display all blog posts filtered by a specific tag.
     - Retrieves posts associated with the tag provided in the URL.
+    - Results are keyset-paginated, newest first.
     """
     model = Post
     template_name = 'blog/tag_post_list.html'
     context_object_name = 'posts'
+    tag = None  # Resolved once per request, by the validators or the queryset
+
+    def tag_validators(self, stats, cloud):
+        """
+        Newest change to a post carrying this tag, their number (catches untagging and
+        deletions) and the tag cloud shown beside them (cached, so comparing it is cheap).
+        - Posts outside the tag do not change the page, so their writes keep its ETag.
+        """
+        return stats['last_modified'], (stats['last_modified'], stats['count'], cloud)
+
+    def get_validators(self):
+        self.tag = Tag.objects.filter(name=self.kwargs.get('tag')).first()  # Resolved once, reused below
+        if self.tag is None:
+            return None  # Unknown tag: render normally (404)
+        stats = Post.objects.filter(tags=self.tag.pk).aggregate(last_modified=Max('updated_at'), count=Count('id'))
+        return self.tag_validators(stats, tags.get_tag_cloud())
+
+    def get_surrogate_keys(self, context):
+        return [pagecache.tag_key(self.tag.name), pagecache.TAG_CLOUD_KEY]
+
+    def get_tag(self):
+        """ The tag resolved by the validators, or the one named in the URL (404 if unknown). """
+        if self.tag is None:
+            self.tag = get_object_or_404(Tag, name=self.kwargs.get('tag'))
+        return self.tag
 
     def get_queryset(self):
         """
-        Fetch the tag from the URL and retrieve associated posts.
-        - Uses `get_object_or_404` for proper error handling.
+        Retrieve the posts associated with the tag.
+        - Filters on the tag id, so the tagging table is joined without joining tag names.
         """
-        tag = get_object_or_404(Tag, name=self.kwargs.get('tag'))  # Get tag from the URL
-        return Post.objects.filter(tags__name__in=[tag])  # Filter posts by tag
+        return (
+            Post.objects.filter(tags=self.get_tag().pk)  # Filter posts by tag id
+            .defer('content')  # Only the excerpt is rendered
+        )
 
     def get_context_data(self, **kwargs):
         """
-        Add the tag name to the context for use in the template.
+        Add the tag name, its statistics and the tag cloud to the context for use in the template.
         """
         context = super().get_context_data(**kwargs)
-        context['tag'] = self.kwargs.get('tag')  # Include the tag name in the context
+        context['tag'] = self.tag.name  # Include the tag name in the context
+        context['tag_stat'] = TagStat.objects.filter(tag=self.tag).first()
+        context['tag_cloud'] = tags.get_tag_cloud()
         return context
 
+SEARCH_PAGE_SIZE = 20  # Results per search page
+
+def _facet_links(params, name, counts, selected):
+    """
+    Facet entries for the template, each with the query string that toggles it.
+    - Toggling resets the page; tags combine (AND), the author is a single choice.
+    """
+    links = []
+    for value, count in counts:
+        toggled = params.copy()
+        toggled.pop('page', None)
+        if name == 'tag':
+            chosen = [tag for tag in toggled.getlist('tag') if tag != value]
+            toggled.setlist('tag', chosen if value in selected else chosen + [value])
+        elif value in selected:
+            toggled.pop('author', None)
+        else:
+            toggled['author'] = value
+        links.append({'value': value, 'count': count, 'selected': value in selected, 'query': toggled.urlencode()})
+    return links
+
+def _search_params(request):
+    """ (query, selected tags, selected author) of a search request. """
+    return request.GET.get('q', '').strip(), request.GET.getlist('tag'), request.GET.get('author') or None
+
+def _search_page(request, post_ids):
+    return Paginator(post_ids, SEARCH_PAGE_SIZE).get_page(request.GET.get('page'))
+
+def _search_response(request, query, page=None, posts_by_id=None, counts=None, selected_tags=(), selected_author=None):
+    """ Render the results page from the already-loaded page, posts and facet counts. """
+    posts = []  # Default to no results
+    facets = {}
+    if page is not None:
+        posts = [posts_by_id[pk] for pk in page.object_list if pk in posts_by_id]  # Preserve ranking order
+        facets = {
+            'tags': _facet_links(request.GET, 'tag', counts['tags'], set(selected_tags)),
+            'authors': _facet_links(request.GET, 'author', counts['authors'], {selected_author}),
+        }
+    page_params = request.GET.copy()
+    page_params.pop('page', None)
+    response = render(request, 'blog/search_results.html', {
+        'posts': posts,
+        'query': query,
+        'page_obj': page,
+        'facets': facets,
+        'page_query': page_params.urlencode(),  # Current query and facets, for the page links
+    })
+    return pagecache.add_surrogate_keys(response, pagecache.SEARCH_KEY)
+
 def search_posts(request):
     """
     View to handle search queries for blog posts.
-    - Filters posts based on title, content, or tags.
+    - Matches title, content and tags through the full-text index, ranked by relevance.
+    - The ranked id list comes from the search result cache; only the ids of the requested
+      page are loaded, in one query.
+    - Tag and author facets (`tag`, `author` GET parameters) narrow the cached ids without
+      re-running the text match; their counts come from the same cached memberships.
+    """
+    query, selected_tags, selected_author = _search_params(request)  # Retrieve the search term from the request
+    if not query:
+        return _search_response(request, query)
+    post_ids, counts = search.faceted_search(query, selected_tags, selected_author)  # Cached per normalized query
+    page = _search_page(request, post_ids)
+    posts_by_id = Post.objects.defer('content').in_bulk(page.object_list)  # Only this page's posts
+    return _search_response(request, query, page, posts_by_id, counts, selected_tags, selected_author)
+
+def search_autocomplete(request):
+    """
+    JSON endpoint suggesting post titles and tags that start with `q` (search-as-you-type).
+    - Served from the in-process prefix index, so a keystroke costs no database query.
+    """
+    query = request.GET.get('q', '')
+    try:
+        limit = min(int(request.GET.get('limit', autocomplete.AUTOCOMPLETE_LIMIT)), autocomplete.AUTOCOMPLETE_MAX_LIMIT)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid limit.'}, status=400)
+    suggestions = autocomplete.get_index().suggest(query, max(limit, 1))
+    return JsonResponse({'query': query, **suggestions})
+
+# ----------------------------------------
+# Feeds
+# ----------------------------------------
+
+def post_feed(request, feed_format, tag=None):
+    """
+    Atom or RSS feed of the newest posts, optionally limited to a tag.
+    - One aggregate query yields the validators: unchanged feeds get a 304, and the
+      rendered document is cached under a key derived from them.
+    - On a cache miss the feed is streamed from a single `.only()` query and cached once complete.
+    - Feeds are the same for every user, so the ETag does not vary by user.
+    """
+    tag_object = get_object_or_404(Tag, name=tag) if tag is not None else None
+    posts = feeds.feed_posts(tag_object)
+    last_modified, count = feeds.feed_validators(posts)
+    etag = make_etag('feed', feed_format, tag, last_modified, count)
+    timestamp = http_timestamp(last_modified)
+
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        feed_class = feeds.FEED_FORMATS[feed_format]
+        cache_key = feeds.feed_cache_key(feed_format, tag, request.get_host(), (last_modified, count))
+        content = feeds.get_cached_feed(cache_key)
+        if content is not None:
+            response = HttpResponse(content, content_type=feed_class.content_type)
+        else:
+            if tag_object is None:
+                title, link = 'Django Blog', reverse('post-list')
+            else:
+                title, link = f'Django Blog: posts tagged {tag_object.name}', reverse('tagged-posts', args=[tag_object.name])
+            response = StreamingHttpResponse(
+                feeds.render_feed(
+                    feed_format,
+                    title=title,
+                    link=request.build_absolute_uri(link),
+                    description=f'The {feeds.FEED_ITEMS} newest posts.',
+                    last_modified=last_modified,
+                    entries=feeds.feed_entries(posts, request.build_absolute_uri),
+                    cache_key=cache_key,
+                ),
+                content_type=feed_class.content_type,
+            )
+    response.headers.setdefault('ETag', etag)
+    if timestamp is not None:
+        response.headers.setdefault('Last-Modified', http_date(timestamp))
+    return response
+
+# ----------------------------------------
+# Async Read Views (ASGI)
+# ----------------------------------------
+#
+# Async versions of the busiest read pages, routed by blog/async_urls.py (BLOG_ASYNC_VIEWS).
+# They run on the event loop and query through the async ORM, so a request only occupies a
+# thread while one of its queries runs. Pages are rendered with `render()` into a plain
+# HttpResponse (the handler would render a TemplateResponse in a thread); everything the
+# templates read is loaded beforehand, so rendering itself runs no queries.
+
+async def _akeyset_page(view, queryset):
+    try:
+        return await apaginate(
+            queryset, view.keyset_ordering, cursor=view.request.GET.get(view.cursor_param), page_size=view.page_size,
+        )
+    except InvalidCursor:
+        raise Http404('Invalid page cursor.')
+
+def _render_with_keys(view, context):
+    response = render(view.request, view.template_name, context)
+    return pagecache.add_surrogate_keys(response, *view.get_surrogate_keys(context))
+
+class AsyncPostListView(AsyncConditionalGetMixin, PostListView):
+    """ Async PostListView: same validators, page, surrogate keys and template. """
+
+    async def aget_validators(self):
+        last_modified = (await Post.objects.aaggregate(last_modified=Max('updated_at')))['last_modified']
+        count = (await MonthArchive.objects.aaggregate(count=Sum('post_count')))['count']
+        return last_modified, (last_modified, count)
+
+    async def arender(self):
+        page = await _akeyset_page(self, self.get_queryset())
+        return _render_with_keys(self, {
+            'posts': page.object_list,
+            'page': page,
+            'tag_cloud': await tags.aget_tag_cloud(),
+            'archive_months': await archive.aget_archive_months(),
+        })
+
+class AsyncPostDetailView(AsyncConditionalGetMixin, PostDetailView):
+    """
+    Async PostDetailView.
+    - The shared body comes from the fragment cache; a miss renders it with the sync
+      `render_body()` in a thread (comment threads and related posts are several queries).
+    """
+
+    async def get(self, request, *args, **kwargs):
+        response = await super().get(request, *args, **kwargs)
+        await counters.arecord_view(self.kwargs['pk'])
+        response.view_post_id = self.kwargs['pk']  # Lets the page cache count its hits too
+        return response
+
+    async def aget_validators(self):
+        return self.validators_from_row(await self.validators_query().afirst())
+
+    async def arender(self):
+        self.object = await aget_object_or_404(Post, pk=self.kwargs['pk'])
+        fragment = await sync_to_async(self.get_body)()  # One thread hop for the cache lookup
+        return _render_with_keys(self, {
+            'post': self.object,
+            'object': self.object,
+            'body': mark_safe(fragments.punch_holes(fragment['html'], self.request.user.id)),
+            'related_ids': fragment['related_ids'],
+            'form': CommentForm(),
+        })
+
+class AsyncTagPostListView(AsyncConditionalGetMixin, TagPostListView):
+    """ Async TagPostListView: same validators, page, surrogate keys and template. """
+
+    async def aget_validators(self):
+        self.tag = await Tag.objects.filter(name=self.kwargs.get('tag')).afirst()
+        if self.tag is None:
+            return None  # Unknown tag: render normally (404)
+        stats = await Post.objects.filter(tags=self.tag.pk).aaggregate(last_modified=Max('updated_at'), count=Count('id'))
+        return self.tag_validators(stats, await tags.aget_tag_cloud())
+
+    async def arender(self):
+        if self.tag is None:
+            self.tag = await aget_object_or_404(Tag, name=self.kwargs.get('tag'))
+        page = await _akeyset_page(self, Post.objects.filter(tags=self.tag.pk).defer('content'))
+        return _render_with_keys(self, {
+            'posts': page.object_list,
+            'page': page,
+            'tag': self.tag.name,
+            'tag_stat': await TagStat.objects.filter(tag=self.tag).afirst(),
+            'tag_cloud': await tags.aget_tag_cloud(),
+        })
+
+async def async_search_posts(request):
+    """
+    Async search_posts.
+    - The ranked ids and facet counts come from the search cache; a miss runs the FTS query
+      (raw SQL, which has no async API) in a thread. The page's posts use the async ORM.
     """
-    query = request.GET.get('q')  # Retrieve the search term from the request
-    results = Post.objects.none()  # Default to no results
+    request.user = await request.auser()
+    query, selected_tags, selected_author = _search_params(request)
+    if not query:
+        return _search_response(request, query)
+    post_ids, counts = await sync_to_async(search.faceted_search)(query, selected_tags, selected_author)
+    page = _search_page(request, post_ids)
+    posts_by_id = await Post.objects.defer('content').ain_bulk(page.object_list)
+    return _search_response(request, query, page, posts_by_id, counts, selected_tags, selected_author)
 
-    if query:
-        # Filter posts that match the query in title, content, or tags
-        results = Post.objects.filter(
-            Q(title__icontains=query) |
-            Q(content__icontains=query) |
-            Q(tags__name__icontains=query)
-        ).distinct()  # Remove duplicate results
+# ----------------------------------------
+# Data Export
+# ----------------------------------------
 
-    return render(request, 'blog/search_results.html', {'results': results, 'query': query})
+@staff_member_required
+def export_ndjson(request):
+    """
+    Staff-only download of posts (with tags) and comments as NDJSON.
+    - ?only=posts or ?only=comments limits the export; ?gzip=1 compresses it.
+    - The response is streamed from chunked database reads, so memory use stays constant
+      however large the tables are.
+    """
+    kinds = [kind for kind in export.EXPORT_KINDS if kind in (request.GET.getlist('only') or export.EXPORT_KINDS)]
+    if not kinds:
+        return HttpResponse('Unknown export kind.', status=400)
+    compress = request.GET.get('gzip') in ('1', 'true')
+    filename = f'blog-export-{timezone.now():%Y%m%d-%H%M%S}.ndjson' + ('.gz' if compress else '')
+    response = StreamingHttpResponse(
+        export.export_stream(export.export_records(kinds), compress),
+        content_type='application/gzip' if compress else 'application/x-ndjson',
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['Cache-Control'] = 'private, no-store'
+    return response
 
 # ----------------------------------------
 # Comment Management Views (CRUD)
 # ----------------------------------------
 
 class CommentCreateView(LoginRequiredMixin, CreateView):
-    """ View to create a new comment on a blog post. """
+    """
+    View to create a new comment on a blog post, or a reply to an existing comment.
+    - Replies are addressed by `parent_id` in the URL and must belong to the same post.
+    """
     model = Comment
     form_class = CommentForm
-    template_name = 'blog/comment_form.html'
+    template_name = 'blog/add_comment.html'
+
+    def get_post(self):
+        return get_object_or_404(Post, id=self.kwargs['post_id'])
+
+    def get_parent(self):
+        """
+        The comment being replied to, or None for a top-level comment.
+        - Replies to comments at the maximum depth attach to that comment's parent instead.
+        """
+        parent_id = self.kwargs.get('parent_id')
+        if parent_id is None:
+            return None
+        parent = get_object_or_404(Comment, pk=parent_id, post_id=self.kwargs['post_id'])
+        if parent.depth >= MAX_THREAD_DEPTH:
+            parent = parent.parent
+        return parent
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['post'] = self.get_post()
+        context['parent'] = self.get_parent()
+        return context
 
     def form_valid(self, form):
         form.instance.author = self.request.user  # Set the comment's author to the logged-in user
-        form.instance.post = get_object_or_404(Post, id=self.kwargs['post_id'])  # Link comment to post
-        return super().form_valid(form)
+        form.instance.post = self.get_post()  # Link comment to post
+        form.instance.parent = self.get_parent()  # Link reply to the comment it answers
+        with transaction.atomic():
+            response = super().form_valid(form)
+            counters.comment_added(self.object.post_id, self.object.created_at)  # Bump the post's counters
+        return response
 
     def get_success_url(self):
         return reverse_lazy('post-detail', kwargs={'pk': self.kwargs['post_id']})  # Redirect to post details
 
-class CommentUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+def serialize_comment(comment, user_id):
+    """
+    JSON representation of a comment and its loaded replies.
+    - Edit/delete URLs are included only for comments written by `user_id`.
+    - `more_replies_url` is included when some of the comment's replies were left out.
+    """
+    data = {
+        'id': comment.id,
+        'author': comment.author.username,
+        'content': comment.content,
+        'created_at': comment.created_at.isoformat(),
+        'reply_url': reverse('comment-reply', kwargs={'post_id': comment.post_id, 'parent_id': comment.id}),
+        'replies': [serialize_comment(reply, user_id) for reply in getattr(comment, 'children', [])],
+    }
+    if getattr(comment, 'more_replies', False):
+        data['more_replies_url'] = reverse('comment-replies', args=[comment.id])
+    if comment.author_id == user_id:
+        data['edit_url'] = reverse('comment-update', args=[comment.id])
+        data['delete_url'] = reverse('comment-delete', args=[comment.id])
+    return data
+
+def post_comments(request, pk):
+    """
+    JSON endpoint returning one page of a post's top-level comments with their reply threads.
+    - Pages are addressed by the opaque `cursor` returned as `next_cursor`.
+    """
+    get_object_or_404(Post.objects.only('id'), pk=pk)
+    try:
+        page = paginate(
+            Comment.objects.filter(post_id=pk, parent__isnull=True).select_related('author'),
+            COMMENT_ORDERING,
+            cursor=request.GET.get('cursor'),
+            page_size=COMMENTS_PAGE_SIZE,
+        )
+    except InvalidCursor:
+        return JsonResponse({'error': 'Invalid cursor.'}, status=400)
+
+    roots = threads.load_threads(pk, page, max_depth=THREAD_DEPTH, limit=THREAD_REPLY_LIMIT)
+    comments = [serialize_comment(root, request.user.id) for root in roots]
+    response = JsonResponse({'comments': comments, 'next_cursor': page.next_cursor})
+    return pagecache.add_surrogate_keys(response, pagecache.post_key(pk))
+
+def comment_replies(request, pk):
+    """
+    JSON endpoint returning a comment with the replies left out of its thread on the page.
+    - Loads THREAD_DEPTH levels (at most THREAD_REPLY_LIMIT replies) below the comment;
+      comments with more replies carry a `more_replies_url` pointing back here.
+    """
+    comment = get_object_or_404(Comment.objects.select_related('author'), pk=pk)
+    root, = threads.load_threads(comment.post_id, [comment], max_depth=THREAD_DEPTH, limit=THREAD_REPLY_LIMIT)
+    response = JsonResponse({'comment': serialize_comment(root, request.user.id)})
+    return pagecache.add_surrogate_keys(response, pagecache.post_key(comment.post_id))
+
+class CommentUpdateView(AuthorRequiredMixin, UpdateView):
     """ View to update an existing comment. """
     model = Comment
     form_class = CommentForm
     template_name = 'blog/comment_form.html'
 
-    def test_func(self):
-        """ Restrict update access to the comment's author only. """
-        comment = self.get_object()
-        return self.request.user == comment.author
-
     def get_success_url(self):
-        return reverse_lazy('post-detail', kwargs={'pk': self.object.post.id})  # Redirect to post details
+        return reverse_lazy('post-detail', kwargs={'pk': self.object.post_id})  # Redirect to post details (without loading the post)
 
-class CommentDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+class CommentDeleteView(AuthorRequiredMixin, DeleteView):
     """ View to delete an existing comment. """
     model = Comment
     template_name = 'blog/comment_confirm_delete.html'
 
-    def test_func(self):
-        """ Restrict delete access to the comment's author only. """
-        comment = self.get_object()
-        return self.request.user == comment.author
+    def form_valid(self, form):
+        with transaction.atomic():
+            removed = threads.subtree(self.object).count()  # The comment plus its replies (deleted by cascade)
+            response = super().form_valid(form)
+            counters.comment_removed(self.object.post_id, removed)  # Decrement the post's counters
+        return response
 
     def get_success_url(self):
-        return reverse_lazy('post-detail', kwargs={'pk': self.object.post.id})  # Redirect to post details
+        return reverse_lazy('post-detail', kwargs={'pk': self.object.post_id})  # Redirect to post details (without loading the post)
 
 
 
@@ -49,6 +49,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'blog.replicas.ReplicaStickinessMiddleware',  # Reads stay on the primary right after a write
+    'blog.pagecache.AnonymousPageCacheMiddleware',  # Full-page cache for logged-out visitors
 ]
 
 ROOT_URLCONF = 'django_blog.urls'
@@ -81,6 +83,34 @@ DATABASES = {
         'NAME': BASE_DIR / 'db.sqlite3',         # Database name and location
         'USER': '',                              # Placeholder for USER (not required for SQLite)
         'PORT': '',                              # Placeholder for PORT (not required for SQLite)
+    },
+    # Read replicas are extra aliases listed in BLOG_READ_REPLICAS, e.g. a local copy kept
+    # up to date with `python manage.py sync_replica --interval 5`:
+    # 'replica': {
+    #     'ENGINE': 'django.db.backends.sqlite3',
+    #     'NAME': BASE_DIR / 'db-replica.sqlite3',
+    #     'TEST': {'MIRROR': 'default'},  # Tests read the primary test database
+    # },
+}
+
+# Reads of the post list, post, tag and search pages go to one of these aliases (none: all
+# reads use `default`); writes always go to `default`
+DATABASE_ROUTERS = ['blog.replicas.ReadReplicaRouter']
+BLOG_READ_REPLICAS = []
+# After a write, the writer's reads stay on the primary for this many seconds; must be
+# longer than the replicas can lag behind
+BLOG_REPLICA_STICKY_SECONDS = 30
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Local memory is per process; use a shared backend (Redis, Memcached) with several workers
+# so page-cache purges reach every process.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'django-blog',
     }
 }
 
@@ -127,6 +157,16 @@ STATICFILES_DIRS = [
 ]
 
 
+# Sitemaps (written by `python manage.py build_sitemaps`, served as static files)
+SITE_URL = 'http://localhost:8000'  # Scheme and host used for the absolute URLs in the sitemaps
+SITEMAP_ROOT = BASE_DIR / 'sitemaps'  # Directory the sitemap files are written to
+
+# Serve the post list, post, tag and search pages with async views (blog/async_urls.py).
+# Only worth enabling under an ASGI server (django_blog/asgi.py); under WSGI every async
+# view is run through an event loop per request.
+BLOG_ASYNC_VIEWS = False
+
+
 # Templates directory
 TEMPLATES = [
     {
@@ -14,9 +14,19 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path
+from django.urls import include, path, re_path
+from django.views.static import serve
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    # Async read views under ASGI (see BLOG_ASYNC_VIEWS in settings.py)
+    path('', include('blog.async_urls' if settings.BLOG_ASYNC_VIEWS else 'blog.urls')),
 ]
+
+if settings.DEBUG:
+    # In production the web server serves the files written by `build_sitemaps` directly
+    urlpatterns += [
+        re_path(r'^(?P<path>sitemap[\w-]*\.xml)$', serve, {'document_root': settings.SITEMAP_ROOT}),
+    ]